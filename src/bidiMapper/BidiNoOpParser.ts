@@ -18,6 +18,7 @@
 import type {
   BrowsingContext,
   Cdp,
+  Goog,
   Input,
   Script,
   Session,
@@ -33,8 +34,8 @@ export class BidiNoOpParser implements IBidiParser {
   }
   parseCaptureScreenshotParams(
     params: unknown
-  ): BrowsingContext.CaptureScreenshotParameters {
-    return params as BrowsingContext.CaptureScreenshotParameters;
+  ): Goog.CaptureScreenshotParameters {
+    return params as Goog.CaptureScreenshotParameters;
   }
   parseCloseParams(params: unknown): BrowsingContext.CloseParameters {
     return params as BrowsingContext.CloseParameters;
@@ -76,6 +77,35 @@ export class BidiNoOpParser implements IBidiParser {
   }
   // keep-sorted end
 
+  // Goog domain
+  // keep-sorted start block=yes
+  parseBatchParams(params: unknown): Goog.BatchParameters {
+    return params as Goog.BatchParameters;
+  }
+  parseDisownGroupParams(params: unknown): Goog.ScriptDisownGroupParameters {
+    return params as Goog.ScriptDisownGroupParameters;
+  }
+  parseIoCloseParams(params: unknown): Goog.IoCloseParameters {
+    return params as Goog.IoCloseParameters;
+  }
+  parseIoReadParams(params: unknown): Goog.IoReadParameters {
+    return params as Goog.IoReadParameters;
+  }
+  parsePrintToStreamParams(params: unknown): Goog.PrintToStreamParameters {
+    return params as Goog.PrintToStreamParameters;
+  }
+  parseSetEventBufferingParams(
+    params: unknown
+  ): Goog.SessionSetEventBufferingParameters {
+    return params as Goog.SessionSetEventBufferingParameters;
+  }
+  parseSetPendingMessageLimitsParams(
+    params: unknown
+  ): Goog.SessionSetPendingMessageLimitsParameters {
+    return params as Goog.SessionSetPendingMessageLimitsParameters;
+  }
+  // keep-sorted end
+
   // Script domain
   // keep-sorted start block=yes
   parseAddPreloadScriptParams(
@@ -83,14 +113,14 @@ export class BidiNoOpParser implements IBidiParser {
   ): Script.AddPreloadScriptParameters {
     return params as Script.AddPreloadScriptParameters;
   }
-  parseCallFunctionParams(params: unknown): Script.CallFunctionParameters {
-    return params as Script.CallFunctionParameters;
+  parseCallFunctionParams(params: unknown): Goog.CallFunctionParameters {
+    return params as Goog.CallFunctionParameters;
   }
   parseDisownParams(params: unknown): Script.DisownParameters {
     return params as Script.DisownParameters;
   }
-  parseEvaluateParams(params: unknown): Script.EvaluateParameters {
-    return params as Script.EvaluateParameters;
+  parseEvaluateParams(params: unknown): Goog.EvaluateParameters {
+    return params as Goog.EvaluateParameters;
   }
   parseGetRealmsParams(params: unknown): Script.GetRealmsParameters {
     return params as Script.GetRealmsParameters;
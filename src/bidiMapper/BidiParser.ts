@@ -18,6 +18,7 @@
 import type {
   BrowsingContext,
   Cdp,
+  Goog,
   Input,
   Script,
   Session,
@@ -29,7 +30,7 @@ export interface IBidiParser {
   parseActivateParams(params: unknown): BrowsingContext.ActivateParameters;
   parseCaptureScreenshotParams(
     params: unknown
-  ): BrowsingContext.CaptureScreenshotParameters;
+  ): Goog.CaptureScreenshotParameters;
   parseCloseParams(params: unknown): BrowsingContext.CloseParameters;
   parseCreateParams(params: unknown): BrowsingContext.CreateParameters;
   parseGetTreeParams(params: unknown): BrowsingContext.GetTreeParameters;
@@ -50,6 +51,21 @@ export interface IBidiParser {
   parseSendCommandParams(params: unknown): Cdp.SendCommandParameters;
   // keep-sorted end
 
+  // Goog domain
+  // keep-sorted start block=yes
+  parseBatchParams(params: unknown): Goog.BatchParameters;
+  parseDisownGroupParams(params: unknown): Goog.ScriptDisownGroupParameters;
+  parseIoCloseParams(params: unknown): Goog.IoCloseParameters;
+  parseIoReadParams(params: unknown): Goog.IoReadParameters;
+  parsePrintToStreamParams(params: unknown): Goog.PrintToStreamParameters;
+  parseSetEventBufferingParams(
+    params: unknown
+  ): Goog.SessionSetEventBufferingParameters;
+  parseSetPendingMessageLimitsParams(
+    params: unknown
+  ): Goog.SessionSetPendingMessageLimitsParameters;
+  // keep-sorted end
+
   // Input domain
   // keep-sorted start block=yes
   parsePerformActionsParams(params: unknown): Input.PerformActionsParameters;
@@ -61,9 +77,9 @@ export interface IBidiParser {
   parseAddPreloadScriptParams(
     params: unknown
   ): Script.AddPreloadScriptParameters;
-  parseCallFunctionParams(params: unknown): Script.CallFunctionParameters;
+  parseCallFunctionParams(params: unknown): Goog.CallFunctionParameters;
   parseDisownParams(params: unknown): Script.DisownParameters;
-  parseEvaluateParams(params: unknown): Script.EvaluateParameters;
+  parseEvaluateParams(params: unknown): Goog.EvaluateParameters;
   parseGetRealmsParams(params: unknown): Script.GetRealmsParameters;
   parseRemovePreloadScriptParams(
     params: unknown
@@ -16,10 +16,14 @@
  */
 
 import type {ICdpConnection} from '../cdp/cdpConnection.js';
-import type {ChromiumBidi} from '../protocol/protocol.js';
+import {ChromiumBidi} from '../protocol/protocol.js';
 import {EventEmitter} from '../utils/EventEmitter.js';
 import {LogType, type LoggerFn} from '../utils/log.js';
-import {ProcessingQueue} from '../utils/processingQueue.js';
+import {
+  type EntryOptions,
+  ProcessingQueue,
+  type ProcessingQueueMetrics,
+} from '../utils/processingQueue.js';
 import type {Result} from '../utils/result.js';
 
 import type {IBidiParser} from './BidiParser.js';
@@ -30,6 +34,26 @@ import {BrowsingContextStorage} from './domains/context/browsingContextStorage.j
 import {EventManager} from './domains/events/EventManager.js';
 import {RealmStorage} from './domains/script/realmStorage.js';
 
+export type MapperOptions = {
+  /**
+   * If set, screenshot and PDF data is not fetched by the Mapper. Instead, the
+   * result carries a `goog:deferredData` reference to be resolved by the
+   * server relay on its own CDP connection, so that large payloads do not
+   * pass through the Mapper.
+   *
+   * The data is fetched only after the Mapper has responded, so the relay must
+   * not deliver the commands following the deferring one before the data is
+   * fetched, otherwise they could change the page before it is captured. The
+   * commands of `goog:batch` are never deferred for the same reason.
+   */
+  deferBinaryData?: boolean;
+  /**
+   * Maximum number of the handles retained per realm. Once exceeded, the least
+   * recently used handles are disowned. Unlimited by default.
+   */
+  maxHandlesPerRealm?: number;
+};
+
 type BidiServerEvent = {
   message: ChromiumBidi.Command;
 };
@@ -38,6 +62,7 @@ export class BidiServer extends EventEmitter<BidiServerEvent> {
   #messageQueue: ProcessingQueue<OutgoingBidiMessage>;
   #transport: IBidiTransport;
   #commandProcessor: CommandProcessor;
+  #eventManager: EventManager;
   #browsingContextStorage = new BrowsingContextStorage();
   #logger?: LoggerFn;
 
@@ -57,36 +82,52 @@ export class BidiServer extends EventEmitter<BidiServerEvent> {
     await this.#transport.sendMessage(message);
   };
 
+  #reportDroppedMessages = (droppedCounts: Map<string, number>) => {
+    this.#eventManager.registerEvent(
+      {
+        type: 'event',
+        method: ChromiumBidi.Session.EventNames.MessagesDroppedEvent,
+        params: {
+          dropped: Object.fromEntries(droppedCounts),
+        },
+      },
+      null
+    );
+  };
+
   private constructor(
     bidiTransport: IBidiTransport,
     cdpConnection: ICdpConnection,
     selfTargetId: string,
     parser?: IBidiParser,
-    logger?: LoggerFn
+    logger?: LoggerFn,
+    options?: MapperOptions
   ) {
     super();
     this.#logger = logger;
     this.#messageQueue = new ProcessingQueue<OutgoingBidiMessage>(
       this.#processOutgoingMessage,
-      this.#logger
+      this.#logger,
+      this.#reportDroppedMessages
     );
     this.#transport = bidiTransport;
     this.#transport.setOnMessage(this.#handleIncomingMessage);
+    this.#eventManager = new EventManager(this);
     this.#commandProcessor = new CommandProcessor(
       cdpConnection,
-      new EventManager(this),
+      this.#eventManager,
       selfTargetId,
       this.#browsingContextStorage,
-      new RealmStorage(),
+      new RealmStorage(options?.maxHandlesPerRealm),
       parser,
-      this.#logger
-    );
-    this.#commandProcessor.on(
-      'response',
-      (response: Promise<Result<OutgoingBidiMessage>>) => {
-        this.emitOutgoingMessage(response);
-      }
+      this.#logger,
+      options
     );
+    this.#commandProcessor.on('response', ({message, channel}) => {
+      // The response is sent after the events of its channel emitted before,
+      // e.g. the log entries of the evaluated script.
+      this.emitOutgoingMessage(message, {scope: channel ?? ''});
+    });
   }
 
   static async createAndStart(
@@ -94,14 +135,16 @@ export class BidiServer extends EventEmitter<BidiServerEvent> {
     cdpConnection: ICdpConnection,
     selfTargetId: string,
     parser?: IBidiParser,
-    logger?: LoggerFn
+    logger?: LoggerFn,
+    options?: MapperOptions
   ): Promise<BidiServer> {
     const server = new BidiServer(
       bidiTransport,
       cdpConnection,
       selfTargetId,
       parser,
-      logger
+      logger,
+      options
     );
     const cdpClient = cdpConnection.browserClient();
 
@@ -120,12 +163,31 @@ export class BidiServer extends EventEmitter<BidiServerEvent> {
   }
 
   /**
-   * Sends BiDi message.
+   * Sends BiDi message. Messages with the same ordering key are sent in the
+   * order they are emitted. Messages without an ordering key, like command
+   * responses, are sent once resolved and once the messages of their scope
+   * emitted before are sent. Messages without a group, like command
+   * responses, are never dropped.
    */
   emitOutgoingMessage(
-    messageEntry: Promise<Result<OutgoingBidiMessage>>
+    messageEntry: Promise<Result<OutgoingBidiMessage>>,
+    options?: EntryOptions
   ): void {
-    this.#messageQueue.add(messageEntry);
+    this.#messageQueue.add(messageEntry, options);
+  }
+
+  /**
+   * Sets the number of the outgoing messages pending in the Mapper from which
+   * the drop policies apply, and the number to which the messages have to fall
+   * for them to stop applying. Messages already passed to the transport are not
+   * counted.
+   */
+  setOutgoingMessageWatermarks(highWatermark: number, lowWatermark: number) {
+    this.#messageQueue.setWatermarks(highWatermark, lowWatermark);
+  }
+
+  get outgoingMessageMetrics(): Readonly<ProcessingQueueMetrics> {
+    return this.#messageQueue.metrics;
   }
 
   close() {
@@ -18,16 +18,22 @@
 import type {ICdpConnection} from '../cdp/cdpConnection.js';
 import {
   Exception,
+  InvalidArgumentException,
   UnknownCommandException,
   UnknownErrorException,
   type ChromiumBidi,
+  type ErrorResponse,
+  type Goog,
 } from '../protocol/protocol.js';
+import {DefaultMap} from '../utils/DefaultMap.js';
 import {EventEmitter} from '../utils/EventEmitter.js';
+import {Histogram} from '../utils/histogram.js';
 import {LogType, type LoggerFn} from '../utils/log.js';
 import type {Result} from '../utils/result.js';
 
 import {BidiNoOpParser} from './BidiNoOpParser.js';
 import type {IBidiParser} from './BidiParser.js';
+import type {MapperOptions} from './BidiServer.js';
 import {OutgoingBidiMessage} from './OutgoingBidiMessage.js';
 import {BrowserProcessor} from './domains/browser/BrowserProcessor.js';
 import {CdpProcessor} from './domains/cdp/CdpProcessor.js';
@@ -35,23 +41,45 @@ import {BrowsingContextProcessor} from './domains/context/browsingContextProcess
 import type {BrowsingContextStorage} from './domains/context/browsingContextStorage.js';
 import type {EventManager} from './domains/events/EventManager.js';
 import {InputProcessor} from './domains/input/InputProcessor.js';
+import {IoProcessor} from './domains/io/IoProcessor.js';
+import {StreamStorage} from './domains/io/StreamStorage.js';
 import {PreloadScriptStorage} from './domains/script/PreloadScriptStorage.js';
 import {ScriptProcessor} from './domains/script/ScriptProcessor.js';
 import type {RealmStorage} from './domains/script/realmStorage.js';
 import {SessionProcessor} from './domains/session/SessionProcessor.js';
 
 type CommandProcessorEvents = {
-  response: Promise<Result<OutgoingBidiMessage>>;
+  response: {
+    message: Promise<Result<OutgoingBidiMessage>>;
+    channel: ChromiumBidi.Command['channel'];
+  };
+};
+
+type CommandMetrics = Omit<Goog.CommandMetrics, 'latency'> & {
+  latency: Histogram;
 };
 
 export class CommandProcessor extends EventEmitter<CommandProcessorEvents> {
   #browserProcessor: BrowserProcessor;
   #browsingContextProcessor: BrowsingContextProcessor;
   #inputProcessor: InputProcessor;
+  #ioProcessor: IoProcessor;
   #scriptProcessor: ScriptProcessor;
   #sessionProcessor: SessionProcessor;
   #cdpProcessor: CdpProcessor;
 
+  #cdpConnection: ICdpConnection;
+  #eventManager: EventManager;
+  #browsingContextStorage: BrowsingContextStorage;
+  #realmStorage: RealmStorage;
+  /** Maps command method to its metrics. */
+  #commandMetrics = new DefaultMap<string, CommandMetrics>(() => ({
+    count: 0,
+    errors: 0,
+    cdpCommands: 0,
+    latency: new Histogram(),
+  }));
+
   #parser: IBidiParser;
   #logger?: LoggerFn;
 
@@ -62,12 +90,18 @@ export class CommandProcessor extends EventEmitter<CommandProcessorEvents> {
     browsingContextStorage: BrowsingContextStorage,
     realmStorage: RealmStorage,
     parser: IBidiParser = new BidiNoOpParser(),
-    logger?: LoggerFn
+    logger?: LoggerFn,
+    options: MapperOptions = {}
   ) {
     super();
+    this.#cdpConnection = cdpConnection;
+    this.#eventManager = eventManager;
+    this.#browsingContextStorage = browsingContextStorage;
+    this.#realmStorage = realmStorage;
     this.#parser = parser;
     this.#logger = logger;
     const preloadScriptStorage = new PreloadScriptStorage();
+    const streamStorage = new StreamStorage();
     this.#browserProcessor = new BrowserProcessor(cdpConnection);
     this.#browsingContextProcessor = new BrowsingContextProcessor(
       cdpConnection,
@@ -76,9 +110,12 @@ export class CommandProcessor extends EventEmitter<CommandProcessorEvents> {
       browsingContextStorage,
       realmStorage,
       preloadScriptStorage,
+      streamStorage,
+      options.deferBinaryData ?? false,
       logger
     );
     this.#inputProcessor = InputProcessor.create(browsingContextStorage);
+    this.#ioProcessor = new IoProcessor(streamStorage);
     this.#scriptProcessor = new ScriptProcessor(
       browsingContextStorage,
       realmStorage,
@@ -91,8 +128,14 @@ export class CommandProcessor extends EventEmitter<CommandProcessorEvents> {
     );
   }
 
+  /**
+   * @param inBatch Whether the command is a command of `goog:batch`. The data
+   *   of such commands is never deferred, as the commands following it in the
+   *   batch could change the page before the data is fetched.
+   */
   async #processCommand(
-    command: ChromiumBidi.Command
+    command: ChromiumBidi.Command,
+    inBatch: boolean
   ): Promise<ChromiumBidi.ResultData> {
     switch (command.method) {
       case 'session.end':
@@ -114,7 +157,8 @@ export class CommandProcessor extends EventEmitter<CommandProcessorEvents> {
         );
       case 'browsingContext.captureScreenshot':
         return this.#browsingContextProcessor.captureScreenshot(
-          this.#parser.parseCaptureScreenshotParams(command.params)
+          this.#parser.parseCaptureScreenshotParams(command.params),
+          !inBatch
         );
       case 'browsingContext.close':
         return this.#browsingContextProcessor.close(
@@ -138,7 +182,8 @@ export class CommandProcessor extends EventEmitter<CommandProcessorEvents> {
         );
       case 'browsingContext.print':
         return this.#browsingContextProcessor.print(
-          this.#parser.parsePrintParams(command.params)
+          this.#parser.parsePrintParams(command.params),
+          !inBatch
         );
       case 'browsingContext.reload':
         return this.#browsingContextProcessor.reload(
@@ -162,6 +207,43 @@ export class CommandProcessor extends EventEmitter<CommandProcessorEvents> {
         );
       // keep-sorted end
 
+      // Goog domain
+      // keep-sorted start block=yes
+      case 'goog:batch':
+        return this.#processBatch(
+          this.#parser.parseBatchParams(command.params),
+          command.channel
+        );
+      case 'goog:browsingContext.printToStream':
+        return this.#browsingContextProcessor.printToStream(
+          this.#parser.parsePrintToStreamParams(command.params)
+        );
+      case 'goog:io.close':
+        return this.#ioProcessor.close(
+          this.#parser.parseIoCloseParams(command.params)
+        );
+      case 'goog:io.read':
+        return this.#ioProcessor.read(
+          this.#parser.parseIoReadParams(command.params)
+        );
+      case 'goog:script.disownGroup':
+        return this.#scriptProcessor.disownGroup(
+          this.#parser.parseDisownGroupParams(command.params)
+        );
+      case 'goog:session.getEventBuffering':
+        return this.#sessionProcessor.getEventBuffering();
+      case 'goog:session.getMetrics':
+        return this.#getMetrics();
+      case 'goog:session.setEventBuffering':
+        return this.#sessionProcessor.setEventBuffering(
+          this.#parser.parseSetEventBufferingParams(command.params)
+        );
+      case 'goog:session.setPendingMessageLimits':
+        return this.#sessionProcessor.setPendingMessageLimits(
+          this.#parser.parseSetPendingMessageLimitsParams(command.params)
+        );
+      // keep-sorted end
+
       // Input domain
       // keep-sorted start block=yes
       case 'input.performActions':
@@ -225,44 +307,96 @@ export class CommandProcessor extends EventEmitter<CommandProcessorEvents> {
     throw new UnknownCommandException(`Unknown command '${command.method}'.`);
   }
 
-  async processCommand(command: ChromiumBidi.Command): Promise<void> {
+  async #processBatch(
+    params: Goog.BatchParameters,
+    channel: ChromiumBidi.Command['channel']
+  ): Promise<Goog.BatchResult> {
+    const getResponse = (command: ChromiumBidi.Command) => {
+      if (command.method === 'goog:batch') {
+        return Promise.resolve(
+          new InvalidArgumentException(
+            'Batches cannot be nested.'
+          ).toErrorResponse(command.id)
+        );
+      }
+      return this.#getResponse({...command, channel}, true);
+    };
+
+    if (params.sequential) {
+      const responses: Goog.BatchResult['responses'] = [];
+      for (const command of params.commands) {
+        responses.push(await getResponse(command));
+      }
+      return {responses};
+    }
+    return {responses: await Promise.all(params.commands.map(getResponse))};
+  }
+
+  #getMetrics(): Goog.SessionGetMetricsResult {
+    const commands: Record<string, Goog.CommandMetrics> = {};
+    for (const [method, metrics] of this.#commandMetrics) {
+      commands[method] = {...metrics, latency: metrics.latency.toJSON()};
+    }
+    const cdpMetrics = this.#cdpConnection.metrics;
+    const {processed, ...outgoingMessageMetrics} =
+      this.#eventManager.outgoingMessageMetrics;
+    return {
+      commands,
+      cdp:
+        cdpMetrics === undefined
+          ? null
+          : {...cdpMetrics, latency: cdpMetrics.latency.toJSON()},
+      events: this.#eventManager.getMetrics(),
+      outgoingMessages: {...outgoingMessageMetrics, sent: processed},
+      storage: {
+        contexts: this.#browsingContextStorage.getAllContexts().length,
+        realms: this.#realmStorage.realmCount,
+        handles: this.#realmStorage.handleCount,
+      },
+    };
+  }
+
+  async #getResponse(
+    command: ChromiumBidi.Command,
+    inBatch = false
+  ): Promise<ChromiumBidi.CommandResponse | ErrorResponse> {
+    const metrics = this.#commandMetrics.get(command.method);
+    const startTime = performance.now();
+    const cdpCommandsBefore = this.#cdpConnection.metrics?.commands ?? 0;
     try {
-      const result = await this.#processCommand(command);
+      const result = await this.#processCommand(command, inBatch);
 
-      const response = {
+      return {
         type: 'success',
         id: command.id,
         result,
       } satisfies ChromiumBidi.CommandResponse;
-
-      this.emit(
-        'response',
-        OutgoingBidiMessage.createResolved(response, command.channel)
-      );
     } catch (e) {
+      metrics.errors++;
       if (e instanceof Exception) {
-        const errorResponse = e;
-        this.emit(
-          'response',
-          OutgoingBidiMessage.createResolved(
-            errorResponse.toErrorResponse(command.id),
-            command.channel
-          )
-        );
-      } else {
-        const error = e as Error;
-        this.#logger?.(LogType.bidi, error);
-        this.emit(
-          'response',
-          OutgoingBidiMessage.createResolved(
-            new UnknownErrorException(
-              error.message,
-              error.stack
-            ).toErrorResponse(command.id),
-            command.channel
-          )
-        );
+        return e.toErrorResponse(command.id);
       }
+      const error = e as Error;
+      this.#logger?.(LogType.bidi, error);
+      return new UnknownErrorException(
+        error.message,
+        error.stack
+      ).toErrorResponse(command.id);
+    } finally {
+      metrics.count++;
+      metrics.cdpCommands +=
+        (this.#cdpConnection.metrics?.commands ?? 0) - cdpCommandsBefore;
+      metrics.latency.record(performance.now() - startTime);
     }
   }
+
+  async processCommand(command: ChromiumBidi.Command): Promise<void> {
+    this.emit('response', {
+      message: OutgoingBidiMessage.createResolved(
+        await this.#getResponse(command),
+        command.channel
+      ),
+      channel: command.channel,
+    });
+  }
 }
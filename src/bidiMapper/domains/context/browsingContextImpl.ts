@@ -20,15 +20,19 @@ import type {Protocol} from 'devtools-protocol';
 import {
   BrowsingContext,
   ChromiumBidi,
+  NoSuchElementException,
+  UnableToCaptureScreenException,
   UnknownErrorException,
   UnsupportedOperationException,
   type EmptyResult,
+  type Goog,
   InvalidArgumentException,
 } from '../../../protocol/protocol.js';
 import {Deferred} from '../../../utils/deferred.js';
 import {LogType, type LoggerFn} from '../../../utils/log.js';
 import {inchesFromCm} from '../../../utils/unitConversions.js';
 import type {EventManager} from '../events/EventManager.js';
+import type {StreamStorage} from '../io/StreamStorage.js';
 import {Realm} from '../script/realm.js';
 import type {RealmStorage} from '../script/realmStorage.js';
 import type {Result} from '../../../utils/result.js';
@@ -67,6 +71,7 @@ export class BrowsingContextImpl {
   #url = 'about:blank';
   readonly #eventManager: EventManager;
   readonly #realmStorage: RealmStorage;
+  readonly #streamStorage: StreamStorage;
   #loaderId?: Protocol.Network.LoaderId;
   #cdpTarget: CdpTarget;
   #maybeDefaultRealm?: Realm;
@@ -75,6 +80,7 @@ export class BrowsingContextImpl {
   private constructor(
     cdpTarget: CdpTarget,
     realmStorage: RealmStorage,
+    streamStorage: StreamStorage,
     id: BrowsingContext.BrowsingContext,
     parentId: BrowsingContext.BrowsingContext | null,
     eventManager: EventManager,
@@ -83,6 +89,7 @@ export class BrowsingContextImpl {
   ) {
     this.#cdpTarget = cdpTarget;
     this.#realmStorage = realmStorage;
+    this.#streamStorage = streamStorage;
     this.#id = id;
     this.#parentId = parentId;
     this.#eventManager = eventManager;
@@ -93,6 +100,7 @@ export class BrowsingContextImpl {
   static create(
     cdpTarget: CdpTarget,
     realmStorage: RealmStorage,
+    streamStorage: StreamStorage,
     id: BrowsingContext.BrowsingContext,
     parentId: BrowsingContext.BrowsingContext | null,
     eventManager: EventManager,
@@ -102,6 +110,7 @@ export class BrowsingContextImpl {
     const context = new BrowsingContextImpl(
       cdpTarget,
       realmStorage,
+      streamStorage,
       id,
       parentId,
       eventManager,
@@ -163,6 +172,8 @@ export class BrowsingContextImpl {
       },
       this.id
     );
+    this.#eventManager.clearBufferedEvents(this.id);
+    this.#streamStorage.deleteContextStreams(this.id);
     this.#browsingContextStorage.deleteContextById(this.id);
   }
 
@@ -701,61 +712,227 @@ export class BrowsingContextImpl {
     await this.#cdpTarget.cdpClient.sendCommand('Page.bringToFront');
   }
 
-  async captureScreenshot(): Promise<BrowsingContext.CaptureScreenshotResult> {
-    // XXX: Focus the original tab after the screenshot is taken.
-    // This is needed because the screenshot gets blocked until the active tab gets focus.
-    await this.#cdpTarget.cdpClient.sendCommand('Page.bringToFront');
+  async captureScreenshot(
+    params: Goog.CaptureScreenshotParameters
+  ): Promise<BrowsingContext.CaptureScreenshotResult> {
+    const result = await this.#cdpTarget.cdpClient.sendCommand(
+      'Page.captureScreenshot',
+      await this.prepareCaptureScreenshot(params)
+    );
+    return {
+      data: result.data,
+    };
+  }
+
+  /**
+   * Prepares the page for `captureScreenshot` and returns the parameters of
+   * the `Page.captureScreenshot` CDP command.
+   */
+  async prepareCaptureScreenshot(
+    params: Goog.CaptureScreenshotParameters
+  ): Promise<Protocol.Page.CaptureScreenshotRequest> {
+    const [clip] = await Promise.all([
+      this.#getClipRect(params.clip),
+      // XXX: Focus the original tab after the screenshot is taken.
+      // This is needed because the screenshot gets blocked until the active tab gets focus.
+      this.#bringToFrontIfHidden(),
+    ]);
+    // Getting the element clip may scroll the page, so the viewport is read
+    // afterwards.
+    const viewport = await this.#getViewportRect();
+
+    // The clip is relative to the viewport.
+    const rect =
+      clip === undefined
+        ? viewport
+        : getIntersectionRect(viewport, {
+            ...clip,
+            x: viewport.x + clip.x,
+            y: viewport.y + clip.y,
+          });
+    if (rect.width === 0 || rect.height === 0) {
+      throw new UnableToCaptureScreenException(
+        `Unable to capture screenshot with zero dimensions: width=${rect.width}, height=${rect.height}`
+      );
+    }
 
-    let clip: Protocol.DOM.Rect;
+    const cdpParams: Protocol.Page.CaptureScreenshotRequest = {
+      clip: {
+        ...rect,
+        scale: 1.0,
+      },
+    };
+    const format = params['goog:format'];
+    if (format !== undefined) {
+      cdpParams.format = BrowsingContextImpl.#getCdpImageFormat(format.type);
+      if (format.quality !== undefined && format.type !== 'image/png') {
+        cdpParams.quality = Math.round(format.quality * 100);
+      }
+    }
+    if (params['goog:optimizeForSpeed'] !== undefined) {
+      cdpParams.optimizeForSpeed = params['goog:optimizeForSpeed'];
+    }
+    return cdpParams;
+  }
 
+  async #bringToFrontIfHidden(): Promise<void> {
+    const {result} = await this.#cdpTarget.cdpClient.sendCommand(
+      'Runtime.evaluate',
+      {
+        expression: 'document.visibilityState',
+        contextId: this.#defaultRealm.executionContextId,
+      }
+    );
+    if (result.value !== 'visible') {
+      await this.#cdpTarget.cdpClient.sendCommand('Page.bringToFront');
+    }
+  }
+
+  /**
+   * Returns the viewport rectangle in the coordinates of the screenshot clip,
+   * which are relative to the document for top-level contexts.
+   */
+  async #getViewportRect(): Promise<Protocol.DOM.Rect> {
     if (this.isTopLevelContext()) {
-      const {cssContentSize, cssLayoutViewport} =
-        await this.#cdpTarget.cdpClient.sendCommand('Page.getLayoutMetrics');
-      clip = {
-        x: cssContentSize.x,
-        y: cssContentSize.y,
+      const {cssLayoutViewport} = await this.#cdpTarget.cdpClient.sendCommand(
+        'Page.getLayoutMetrics'
+      );
+      // The page may be scrolled.
+      return {
+        x: cssLayoutViewport.pageX,
+        y: cssLayoutViewport.pageY,
         width: cssLayoutViewport.clientWidth,
         height: cssLayoutViewport.clientHeight,
       };
-    } else {
-      const {
-        result: {value: iframeDocRect},
-      } = await this.#cdpTarget.cdpClient.sendCommand(
-        'Runtime.callFunctionOn',
-        {
-          functionDeclaration: String(() => {
-            const docRect =
-              globalThis.document.documentElement.getBoundingClientRect();
-            return JSON.stringify({
-              x: docRect.x,
-              y: docRect.y,
-              width: docRect.width,
-              height: docRect.height,
-            });
-          }),
-          executionContextId: this.#defaultRealm.executionContextId,
+    }
+
+    const {
+      result: {value: iframeDocRect},
+    } = await this.#cdpTarget.cdpClient.sendCommand('Runtime.callFunctionOn', {
+      functionDeclaration: String(() => {
+        const docRect =
+          globalThis.document.documentElement.getBoundingClientRect();
+        return JSON.stringify({
+          x: docRect.x,
+          y: docRect.y,
+          width: docRect.width,
+          height: docRect.height,
+        });
+      }),
+      executionContextId: this.#defaultRealm.executionContextId,
+    });
+    return JSON.parse(iframeDocRect);
+  }
+
+  /** Returns the clip rectangle relative to the viewport. */
+  async #getClipRect(
+    clip: BrowsingContext.ClipRectangle | undefined
+  ): Promise<Protocol.DOM.Rect | undefined> {
+    if (clip === undefined) {
+      return undefined;
+    }
+    if (clip.type === 'viewport') {
+      return normalizeRect(clip);
+    }
+
+    const result = await this.#defaultRealm.callFunction(
+      String((element: unknown, scrollIntoView: boolean) => {
+        if (!(element instanceof Element)) {
+          throw new Error('Value is not an Element');
+        }
+        if (scrollIntoView) {
+          element.scrollIntoView();
         }
+        const rect = element.getBoundingClientRect();
+        return JSON.stringify({
+          x: rect.x,
+          y: rect.y,
+          width: rect.width,
+          height: rect.height,
+        });
+      }),
+      {type: 'undefined'},
+      [clip.element, {type: 'boolean', value: clip.scrollIntoView ?? false}],
+      false,
+      'none',
+      {}
+    );
+    if (result.type === 'exception' || result.result.type !== 'string') {
+      throw new NoSuchElementException(
+        `Could not get the rectangle of the element '${clip.element.sharedId}'`
       );
-      clip = JSON.parse(iframeDocRect);
     }
+    return JSON.parse(result.result.value);
+  }
 
-    const result = await this.#cdpTarget.cdpClient.sendCommand(
-      'Page.captureScreenshot',
-      {
-        clip: {
-          ...clip,
-          scale: 1.0,
-        },
-      }
+  static #getCdpImageFormat(
+    type: Goog.ImageFormat['type']
+  ): Protocol.Page.CaptureScreenshotRequestFormat {
+    switch (type) {
+      case 'image/jpeg':
+        return 'jpeg';
+      case 'image/png':
+        return 'png';
+      case 'image/webp':
+        return 'webp';
+    }
+  }
+
+  async print(
+    params: BrowsingContext.PrintParameters
+  ): Promise<BrowsingContext.PrintResult> {
+    const result = await this.#printToPdf(
+      BrowsingContextImpl.getPrintToPdfParams(params)
     );
     return {
       data: result.data,
     };
   }
 
-  async print(
+  /**
+   * Prints the page into a CDP stream, so that the PDF can be read in chunks
+   * instead of being held in memory at once.
+   */
+  async printToStream(
     params: BrowsingContext.PrintParameters
-  ): Promise<BrowsingContext.PrintResult> {
+  ): Promise<Protocol.IO.StreamHandle> {
+    const result = await this.#printToPdf({
+      ...BrowsingContextImpl.getPrintToPdfParams(params),
+      transferMode: 'ReturnAsStream',
+    });
+    if (result.stream === undefined) {
+      throw new UnknownErrorException('No stream returned by the browser');
+    }
+    return result.stream;
+  }
+
+  async #printToPdf(
+    cdpParams: Protocol.Page.PrintToPDFRequest
+  ): Promise<Protocol.Page.PrintToPDFResponse> {
+    try {
+      return await this.#cdpTarget.cdpClient.sendCommand(
+        'Page.printToPDF',
+        cdpParams
+      );
+    } catch (error: any) {
+      // Effectively zero dimensions.
+      if (
+        (error as Error).message ===
+        'invalid print parameters: content area is empty'
+      ) {
+        throw new UnsupportedOperationException(error.message);
+      }
+      throw error;
+    }
+  }
+
+  /**
+   * Returns the parameters of the `Page.printToPDF` CDP command for the given
+   * `browsingContext.print` parameters.
+   */
+  static getPrintToPdfParams(
+    params: BrowsingContext.PrintParameters
+  ): Protocol.Page.PrintToPDFRequest {
     const cdpParams: Protocol.Page.PrintToPDFRequest = {};
 
     if (params.background !== undefined) {
@@ -825,24 +1002,7 @@ export class BrowsingContextImpl {
       cdpParams.preferCSSPageSize = !params.shrinkToFit;
     }
 
-    try {
-      const result = await this.#cdpTarget.cdpClient.sendCommand(
-        'Page.printToPDF',
-        cdpParams
-      );
-      return {
-        data: result.data,
-      };
-    } catch (error: any) {
-      // Effectively zero dimensions.
-      if (
-        (error as Error).message ===
-        'invalid print parameters: content area is empty'
-      ) {
-        throw new UnsupportedOperationException(error.message);
-      }
-      throw error;
-    }
+    return cdpParams;
   }
 
   async close(): Promise<void> {
@@ -850,6 +1010,41 @@ export class BrowsingContextImpl {
   }
 }
 
+/** Returns the rectangle with non-negative width and height. */
+function normalizeRect(rect: Protocol.DOM.Rect): Protocol.DOM.Rect {
+  return {
+    ...(rect.width < 0
+      ? {x: rect.x + rect.width, width: -rect.width}
+      : {x: rect.x, width: rect.width}),
+    ...(rect.height < 0
+      ? {y: rect.y + rect.height, height: -rect.height}
+      : {y: rect.y, height: rect.height}),
+  };
+}
+
+/** Returns the intersection of the rectangles, which may be empty. */
+function getIntersectionRect(
+  first: Protocol.DOM.Rect,
+  second: Protocol.DOM.Rect
+): Protocol.DOM.Rect {
+  first = normalizeRect(first);
+  second = normalizeRect(second);
+  const x = Math.max(first.x, second.x);
+  const y = Math.max(first.y, second.y);
+  return {
+    x,
+    y,
+    width: Math.max(
+      Math.min(first.x + first.width, second.x + second.width) - x,
+      0
+    ),
+    height: Math.max(
+      Math.min(first.y + first.height, second.y + second.height) - y,
+      0
+    ),
+  };
+}
+
 function parseInteger(value: string) {
   value = value.trim();
   if (!/^[0-9]+$/.test(value)) {
@@ -22,9 +22,11 @@ import {
   BrowsingContext,
   InvalidArgumentException,
   type EmptyResult,
+  type Goog,
 } from '../../../protocol/protocol.js';
 import {LogType, type LoggerFn} from '../../../utils/log.js';
 import type {EventManager} from '../events/EventManager.js';
+import type {StreamStorage} from '../io/StreamStorage.js';
 import type {RealmStorage} from '../script/realmStorage.js';
 import type {PreloadScriptStorage} from '../script/PreloadScriptStorage.js';
 
@@ -40,6 +42,10 @@ export class BrowsingContextProcessor {
   readonly #browsingContextStorage: BrowsingContextStorage;
   readonly #preloadScriptStorage: PreloadScriptStorage;
   readonly #realmStorage: RealmStorage;
+  readonly #streamStorage: StreamStorage;
+
+  // If set, screenshot and PDF data is fetched by the server relay.
+  readonly #deferBinaryData: boolean;
 
   readonly #logger?: LoggerFn;
 
@@ -50,6 +56,8 @@ export class BrowsingContextProcessor {
     browsingContextStorage: BrowsingContextStorage,
     realmStorage: RealmStorage,
     preloadScriptStorage: PreloadScriptStorage,
+    streamStorage: StreamStorage,
+    deferBinaryData: boolean,
     logger?: LoggerFn
   ) {
     this.#cdpConnection = cdpConnection;
@@ -58,9 +66,31 @@ export class BrowsingContextProcessor {
     this.#browsingContextStorage = browsingContextStorage;
     this.#preloadScriptStorage = preloadScriptStorage;
     this.#realmStorage = realmStorage;
+    this.#streamStorage = streamStorage;
+    this.#deferBinaryData = deferBinaryData;
     this.#logger = logger;
 
     this.#setEventListeners(this.#cdpConnection.browserClient());
+    this.#eventManager.on('requiredEventsChanged', () =>
+      this.#updateNetworkDomains()
+    );
+  }
+
+  /**
+   * Enables or disables the Network domain in the already attached targets
+   * according to the current subscriptions.
+   */
+  #updateNetworkDomains() {
+    const cdpTargets = new Set(
+      this.#browsingContextStorage
+        .getAllContexts()
+        .map((context) => context.cdpTarget)
+    );
+    for (const cdpTarget of cdpTargets) {
+      cdpTarget
+        .toggleNetworkIfNeeded()
+        .catch((error) => this.#logger?.(LogType.debug, error));
+    }
   }
 
   getTree(
@@ -157,20 +187,67 @@ export class BrowsingContextProcessor {
     return {};
   }
 
+  /**
+   * @param allowDeferData Whether the data can be left to the server relay,
+   *   if `deferBinaryData` is set.
+   */
   async captureScreenshot(
-    params: BrowsingContext.CaptureScreenshotParameters
+    params: Goog.CaptureScreenshotParameters,
+    allowDeferData = true
   ): Promise<BrowsingContext.CaptureScreenshotResult> {
     const context = this.#browsingContextStorage.getContext(params.context);
-    return context.captureScreenshot();
+    if (this.#deferBinaryData && allowDeferData) {
+      return BrowsingContextProcessor.#deferData({
+        targetId: context.cdpTarget.targetId,
+        method: 'Page.captureScreenshot',
+        params: await context.prepareCaptureScreenshot(params),
+      });
+    }
+    return context.captureScreenshot(params);
   }
 
+  /**
+   * @param allowDeferData Whether the data can be left to the server relay,
+   *   if `deferBinaryData` is set.
+   */
   async print(
-    params: BrowsingContext.PrintParameters
+    params: BrowsingContext.PrintParameters,
+    allowDeferData = true
   ): Promise<BrowsingContext.PrintResult> {
     const context = this.#browsingContextStorage.getContext(params.context);
+    if (this.#deferBinaryData && allowDeferData) {
+      return BrowsingContextProcessor.#deferData({
+        targetId: context.cdpTarget.targetId,
+        method: 'Page.printToPDF',
+        params: BrowsingContextImpl.getPrintToPdfParams(params),
+      });
+    }
     return context.print(params);
   }
 
+  async printToStream(
+    params: Goog.PrintToStreamParameters
+  ): Promise<Goog.PrintToStreamResult> {
+    const context = this.#browsingContextStorage.getContext(params.context);
+    const handle = await context.printToStream(params);
+    return {
+      stream: this.#streamStorage.addStream({
+        cdpClient: context.cdpTarget.cdpClient,
+        handle,
+        contextId: context.id,
+      }),
+    };
+  }
+
+  static #deferData(
+    deferredData: Goog.DeferredData
+  ): {data: string} & Goog.DeferredDataResult {
+    return {
+      data: '',
+      'goog:deferredData': deferredData,
+    };
+  }
+
   async setViewport(
     params: BrowsingContext.SetViewportParameters
   ): Promise<EmptyResult> {
@@ -281,6 +358,7 @@ export class BrowsingContextProcessor {
       BrowsingContextImpl.create(
         parentBrowsingContext.cdpTarget,
         this.#realmStorage,
+        this.#streamStorage,
         params.frameId,
         params.parentFrameId,
         this.#eventManager,
@@ -347,6 +425,7 @@ export class BrowsingContextProcessor {
       BrowsingContextImpl.create(
         cdpTarget,
         this.#realmStorage,
+        this.#streamStorage,
         targetInfo.targetId,
         null,
         this.#eventManager,
@@ -19,6 +19,7 @@ import type {ProtocolMapping} from 'devtools-protocol/types/protocol-mapping.js'
 import type Protocol from 'devtools-protocol';
 
 import type {ICdpClient} from '../../../cdp/cdpClient.js';
+import {ChromiumBidi} from '../../../protocol/protocol.js';
 import {Deferred} from '../../../utils/deferred.js';
 import type {EventManager} from '../events/EventManager.js';
 import {LogManager} from '../log/logManager.js';
@@ -36,6 +37,7 @@ export class CdpTarget {
   readonly #preloadScriptStorage: PreloadScriptStorage;
 
   readonly #targetUnblocked = new Deferred<Result<void>>();
+  #networkDomainEnabled = false;
 
   static create(
     targetId: Protocol.Target.TargetID,
@@ -114,9 +116,7 @@ export class CdpTarget {
         this.#cdpClient.sendCommand('Page.setLifecycleEventsEnabled', {
           enabled: true,
         }),
-        // XXX: #1080: Do not always enable the network domain globally.
-        // TODO: enable Network domain for OOPiF targets.
-        this.#cdpClient.sendCommand('Network.enable'),
+        this.toggleNetworkIfNeeded(),
         this.#cdpClient.sendCommand('Target.setAutoAttach', {
           autoAttach: true,
           waitForDebuggerOnStart: true,
@@ -141,6 +141,34 @@ export class CdpTarget {
     });
   }
 
+  /**
+   * Enables the Network domain if any network event is subscribed to in this
+   * target or buffered, and disables it when it is not needed anymore.
+   */
+  async toggleNetworkIfNeeded(): Promise<void> {
+    const networkEvents = Object.values(ChromiumBidi.Network.EventNames);
+    const enabled =
+      this.#eventManager.isBufferedAny(networkEvents) ||
+      this.#eventManager.isSubscribedToAny(networkEvents, this.#targetId);
+    if (enabled === this.#networkDomainEnabled) {
+      return;
+    }
+    // Update the state before sending the command, so that the commands are
+    // sent in the order of the subscription changes.
+    this.#networkDomainEnabled = enabled;
+
+    try {
+      await this.#cdpClient.sendCommand(
+        enabled ? 'Network.enable' : 'Network.disable'
+      );
+    } catch (error: any) {
+      // The target might have been closed.
+      if (!this.#cdpClient.isCloseError(error)) {
+        throw error;
+      }
+    }
+  }
+
   #setEventListeners() {
     this.#cdpClient.on('*', (event, params) => {
       // We may encounter uses for EventEmitter other than CDP events,
@@ -148,10 +176,15 @@ export class CdpTarget {
       if (typeof event !== 'string') {
         return;
       }
+      const method = `cdp.${event}` as const;
+      // Most of the CDP events are not subscribed to. Avoid building them.
+      if (!this.#eventManager.isSubscribedOrBuffered(method, null)) {
+        return;
+      }
       this.#eventManager.registerEvent(
         {
           type: 'event',
-          method: `cdp.${event}`,
+          method,
           params: {
             event,
             params: params as ProtocolMapping.Events[typeof event],
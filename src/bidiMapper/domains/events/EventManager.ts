@@ -18,21 +18,33 @@
 import {
   ChromiumBidi,
   type BrowsingContext,
+  type Goog,
   InvalidArgumentException,
 } from '../../../protocol/protocol.js';
 import {DefaultMap} from '../../../utils/DefaultMap.js';
+import {EventEmitter} from '../../../utils/EventEmitter.js';
 import {Buffer} from '../../../utils/buffer.js';
 import {IdWrapper} from '../../../utils/idWrapper.js';
+import {mergeSorted} from '../../../utils/mergeSorted.js';
+import type {
+  EntryOptions,
+  ProcessingQueueMetrics,
+} from '../../../utils/processingQueue.js';
 import type {Result} from '../../../utils/result.js';
 import type {BidiServer} from '../../BidiServer.js';
 import {OutgoingBidiMessage} from '../../OutgoingBidiMessage.js';
 
-import {SubscriptionManager} from './SubscriptionManager.js';
+import {SubscriptionManager, unrollEvents} from './SubscriptionManager.js';
 
 class EventWrapper {
   readonly #idWrapper = new IdWrapper();
   readonly #contextId: BrowsingContext.BrowsingContext | null;
   readonly #event: Promise<Result<ChromiumBidi.Event>>;
+  /** Whether the event is kept in a buffer. */
+  buffered = false;
+  /** The resolved event, set only if the event is buffered. */
+  #result?: Result<ChromiumBidi.Event>;
+  #size: number | null = null;
 
   constructor(
     event: Promise<Result<ChromiumBidi.Event>>,
@@ -53,40 +65,94 @@ class EventWrapper {
   get event(): Promise<Result<ChromiumBidi.Event>> {
     return this.#event;
   }
+
+  set result(result: Result<ChromiumBidi.Event>) {
+    this.#result = result;
+  }
+
+  /**
+   * Size of the serialized event, computed on first use. `0` until the event
+   * is resolved.
+   */
+  get size(): number {
+    if (this.#result === undefined) {
+      return 0;
+    }
+    this.#size ??=
+      this.#result.kind === 'success'
+        ? JSON.stringify(this.#result.value).length
+        : 0;
+    return this.#size;
+  }
 }
 
 /**
- * Maps event name to a desired buffer length.
+ * Maps event name to a default buffer length.
  */
-const eventBufferLength: ReadonlyMap<ChromiumBidi.EventNames, number> = new Map(
-  [[ChromiumBidi.Log.EventNames.LogEntryAddedEvent, 100]]
-);
+const defaultEventBufferLength: ReadonlyMap<ChromiumBidi.EventNames, number> =
+  new Map([[ChromiumBidi.Log.EventNames.LogEntryAddedEvent, 100]]);
 
-export class EventManager {
+type EventManagerEvents = {
   /**
-   * Maps event name to a set of contexts where this event already happened.
-   * Needed for getting buffered events from all the contexts in case of
-   * subscripting to all contexts.
+   * Emitted after the subscriptions or the buffered events changed, i.e. the
+   * set of events which have to be produced.
    */
-  #eventToContextsMap = new DefaultMap<
-    string,
-    Set<BrowsingContext.BrowsingContext | null>
-  >(() => new Set());
+  requiredEventsChanged: void;
+};
+
+export class EventManager extends EventEmitter<EventManagerEvents> {
   /**
-   * Maps `eventName` + `browsingContext` to buffer. Used to get buffered events
+   * Maps event name to browsing context to buffer. Used to get buffered events
    * during subscription. Channel-agnostic.
    */
-  #eventBuffers = new Map<string, Buffer<EventWrapper>>();
+  #eventBuffers = new Map<
+    ChromiumBidi.EventNames,
+    Map<BrowsingContext.BrowsingContext | null, Buffer<EventWrapper>>
+  >();
   /**
-   * Maps `eventName` + `browsingContext` + `channel` to last sent event id.
+   * Maps event name to browsing context to channel to last sent event id.
    * Used to avoid sending duplicated events when user
    * subscribes -> unsubscribes -> subscribes.
    */
-  #lastMessageSent = new Map<string, number>();
+  #lastMessageSent = new Map<
+    ChromiumBidi.EventNames,
+    Map<BrowsingContext.BrowsingContext | null, Map<string | null, number>>
+  >();
+  /**
+   * Maps event name to a desired buffer length per browsing context. Events
+   * not in the map are not buffered.
+   */
+  #eventBufferLength = new Map(defaultEventBufferLength);
+  /** Limit of the total size of the buffered events, if any. */
+  #maxTotalSize: number | null = null;
+  /**
+   * Total size of the resolved buffered events. Tracked only while
+   * `#maxTotalSize` is set, so that the events are not serialized otherwise.
+   */
+  #bufferedSize = 0;
+  /**
+   * Browsing contexts having buffered events, from the least to the most
+   * recently buffered into. Used to pick the events to drop when the buffered
+   * size exceeds the limit.
+   */
+  #bufferedContexts = new Set<BrowsingContext.BrowsingContext | null>();
+  /**
+   * Maps event name to the number of events which were not constructed, as
+   * nobody was subscribed to them and they are not buffer-able.
+   */
+  #elidedEventCounts = new DefaultMap<string, number>(() => 0);
+  /** Maps event name to the number of registered events. */
+  #emittedEventCounts = new DefaultMap<string, number>(() => 0);
+  /**
+   * Maps event name to the policy applied to its events while the outgoing
+   * message queue is overloaded. Events not in the map are never dropped.
+   */
+  #dropPolicies = new Map<ChromiumBidi.EventNames, Goog.DropPolicy>();
   #subscriptionManager: SubscriptionManager;
   #bidiServer: BidiServer;
 
   constructor(bidiServer: BidiServer) {
+    super();
     this.#bidiServer = bidiServer;
 
     this.#subscriptionManager = new SubscriptionManager(
@@ -95,14 +161,85 @@ export class EventManager {
   }
 
   /**
-   * Returns consistent key to be used to access value maps.
+   * Returns the key ordering the events sent to the channel from the context.
+   * Events of other channels or contexts are not delayed by slow to resolve
+   * events, e.g. log entries waiting for the arguments serialization.
    */
-  static #getMapKey(
+  static #getOrderingKey(
+    channel: string | null,
+    contextId: BrowsingContext.BrowsingContext | null
+  ): string {
+    return `${channel ?? ''}\n${contextId ?? ''}`;
+  }
+
+  /**
+   * Returns true if the event would be either sent to a subscribed channel or
+   * buffered. Event producers should check it before building expensive
+   * events. Events reported as not needed are counted as elided.
+   */
+  isSubscribedOrBuffered(
     eventName: ChromiumBidi.EventNames,
-    browsingContext: BrowsingContext.BrowsingContext | null,
-    channel?: string | null
-  ) {
-    return JSON.stringify({eventName, browsingContext, channel});
+    contextId: BrowsingContext.BrowsingContext | null
+  ): boolean {
+    if (
+      this.#eventBufferLength.has(eventName) ||
+      this.#subscriptionManager.isSubscribedTo(eventName, contextId)
+    ) {
+      return true;
+    }
+    this.#elidedEventCounts.set(
+      eventName,
+      this.#elidedEventCounts.get(eventName) + 1
+    );
+    return false;
+  }
+
+  /**
+   * Returns true if any channel is subscribed to any of the given events in
+   * the given context.
+   */
+  isSubscribedToAny(
+    eventNames: ChromiumBidi.EventNames[],
+    contextId: BrowsingContext.BrowsingContext | null
+  ): boolean {
+    return eventNames.some((eventName) =>
+      this.#subscriptionManager.isSubscribedTo(eventName, contextId)
+    );
+  }
+
+  /** Returns true if any of the given events is buffered. */
+  isBufferedAny(eventNames: ChromiumBidi.EventNames[]): boolean {
+    return eventNames.some((eventName) =>
+      this.#eventBufferLength.has(eventName)
+    );
+  }
+
+  /** Number of elided events per event name. */
+  get elidedEventCounts(): ReadonlyMap<string, number> {
+    return this.#elidedEventCounts;
+  }
+
+  /** Metrics of the queue the events are sent through. */
+  get outgoingMessageMetrics(): Readonly<ProcessingQueueMetrics> {
+    return this.#bidiServer.outgoingMessageMetrics;
+  }
+
+  getMetrics(): Goog.EventMetrics {
+    let buffered = 0;
+    for (const contextToBuffer of this.#eventBuffers.values()) {
+      for (const buffer of contextToBuffer.values()) {
+        buffered += buffer.length;
+      }
+    }
+    return {
+      emitted: Object.fromEntries(this.#emittedEventCounts),
+      elided: Object.fromEntries(this.#elidedEventCounts),
+      buffered,
+      bufferedSize:
+        this.#maxTotalSize === null
+          ? this.#computeBufferedSize()
+          : this.#bufferedSize,
+    };
   }
 
   registerEvent(
@@ -124,6 +261,10 @@ export class EventManager {
     contextId: BrowsingContext.BrowsingContext | null,
     eventName: ChromiumBidi.EventNames
   ): void {
+    this.#emittedEventCounts.set(
+      eventName,
+      this.#emittedEventCounts.get(eventName) + 1
+    );
     const eventWrapper = new EventWrapper(event, contextId);
     const sortedChannels =
       this.#subscriptionManager.getChannelsSubscribedToEvent(
@@ -134,7 +275,8 @@ export class EventManager {
     // Send events to channels in the subscription priority.
     for (const channel of sortedChannels) {
       this.#bidiServer.emitOutgoingMessage(
-        OutgoingBidiMessage.createFromPromise(event, channel)
+        OutgoingBidiMessage.createFromPromise(event, channel),
+        this.#getEntryOptions(eventName, channel, contextId)
       );
       this.#markEventSent(eventWrapper, channel, eventName);
     }
@@ -167,12 +309,15 @@ export class EventManager {
         )) {
           // The order of the events is important.
           this.#bidiServer.emitOutgoingMessage(
-            OutgoingBidiMessage.createFromPromise(eventWrapper.event, channel)
+            OutgoingBidiMessage.createFromPromise(eventWrapper.event, channel),
+            this.#getEntryOptions(eventName, channel, eventWrapper.contextId)
           );
           this.#markEventSent(eventWrapper, channel, eventName);
         }
       }
     }
+
+    this.emit('requiredEventsChanged', undefined);
   }
 
   unsubscribe(
@@ -184,29 +329,235 @@ export class EventManager {
       checkEventName(name);
     }
     this.#subscriptionManager.unsubscribeAll(eventNames, contextIds, channel);
+
+    this.emit('requiredEventsChanged', undefined);
+  }
+
+  /**
+   * Sets the buffer lengths of the given events and the limit of the total
+   * buffered size. Existing buffers are resized, keeping the newest events.
+   */
+  setEventBuffering(params: Goog.SessionSetEventBufferingParameters) {
+    const events = Object.entries(params.events ?? {});
+    // Assert all the event names are valid before changing anything.
+    for (const [name] of events) {
+      checkEventName(name);
+    }
+
+    for (const [name, length] of events) {
+      for (const eventName of unrollEvents([name as ChromiumBidi.EventNames])) {
+        this.#setEventBufferLength(eventName, length);
+      }
+    }
+    if (params.maxTotalSize !== undefined) {
+      if (this.#maxTotalSize === null && params.maxTotalSize !== null) {
+        this.#bufferedSize = this.#computeBufferedSize();
+      }
+      this.#maxTotalSize = params.maxTotalSize;
+    }
+    this.#dropLeastRecentlyBufferedEvents();
+
+    this.emit('requiredEventsChanged', undefined);
+  }
+
+  getEventBuffering(): Goog.SessionGetEventBufferingResult {
+    const buffers: Goog.EventBufferInfo[] = [];
+    let totalSize = 0;
+    for (const [event, contextToBuffer] of this.#eventBuffers) {
+      for (const [context, buffer] of contextToBuffer) {
+        let size = 0;
+        for (const wrapper of buffer) {
+          size += wrapper.size;
+        }
+        buffers.push({event, context, count: buffer.length, size});
+        totalSize += size;
+      }
+    }
+    return {
+      events: Object.fromEntries(this.#eventBufferLength),
+      maxTotalSize: this.#maxTotalSize,
+      totalSize,
+      buffers,
+    };
+  }
+
+  #computeBufferedSize(): number {
+    let size = 0;
+    for (const contextToBuffer of this.#eventBuffers.values()) {
+      for (const buffer of contextToBuffer.values()) {
+        for (const wrapper of buffer) {
+          size += wrapper.size;
+        }
+      }
+    }
+    return size;
+  }
+
+  /**
+   * Sets the watermarks of the outgoing messages pending in the Mapper and the
+   * drop policies of the given events.
+   */
+  setPendingMessageLimits(
+    params: Goog.SessionSetPendingMessageLimitsParameters
+  ) {
+    const policies = Object.entries(params.policies ?? {});
+    // Assert all the parameters are valid before changing anything.
+    for (const [name] of policies) {
+      checkEventName(name);
+    }
+    const highWatermark =
+      params.highWatermark === undefined || params.highWatermark === null
+        ? Infinity
+        : params.highWatermark;
+    const lowWatermark = params.lowWatermark ?? Math.floor(highWatermark / 2);
+    if (lowWatermark > highWatermark) {
+      throw new InvalidArgumentException(
+        `Low watermark ${lowWatermark} is greater than high watermark ${highWatermark}`
+      );
+    }
+
+    for (const [name, policy] of policies) {
+      for (const eventName of unrollEvents([name as ChromiumBidi.EventNames])) {
+        if (policy === 'block') {
+          this.#dropPolicies.delete(eventName);
+        } else {
+          this.#dropPolicies.set(eventName, policy);
+        }
+      }
+    }
+    if (params.highWatermark !== undefined) {
+      this.#bidiServer.setOutgoingMessageWatermarks(
+        highWatermark,
+        lowWatermark
+      );
+    }
+  }
+
+  /**
+   * Drops the buffered events of the given context and the records of events
+   * sent from it. Events of a destroyed context are never replayed, so keeping
+   * them would only grow the maps in long-running sessions.
+   */
+  clearBufferedEvents(contextId: BrowsingContext.BrowsingContext) {
+    this.#dropBufferedEvents(contextId);
+    for (const contextToChannelMap of this.#lastMessageSent.values()) {
+      contextToChannelMap.delete(contextId);
+    }
+  }
+
+  #getEntryOptions(
+    eventName: ChromiumBidi.EventNames,
+    channel: string | null,
+    contextId: BrowsingContext.BrowsingContext | null
+  ): EntryOptions {
+    return {
+      orderingKey: EventManager.#getOrderingKey(channel, contextId),
+      scope: channel ?? '',
+      group: eventName,
+      dropPolicy: this.#dropPolicies.get(eventName),
+    };
+  }
+
+  #setEventBufferLength(eventName: ChromiumBidi.EventNames, length: number) {
+    const contextToBuffer = this.#eventBuffers.get(eventName);
+    if (length === 0) {
+      this.#eventBufferLength.delete(eventName);
+      for (const buffer of contextToBuffer?.values() ?? []) {
+        for (const wrapper of buffer) {
+          this.#unbufferEvent(wrapper);
+        }
+      }
+      this.#eventBuffers.delete(eventName);
+      return;
+    }
+
+    this.#eventBufferLength.set(eventName, length);
+    for (const [contextId, buffer] of contextToBuffer ?? []) {
+      const resized = this.#createBuffer(length);
+      // Adding over the capacity drops the oldest events.
+      for (const wrapper of buffer) {
+        resized.add(wrapper);
+      }
+      contextToBuffer!.set(contextId, resized);
+    }
+  }
+
+  #createBuffer(length: number): Buffer<EventWrapper> {
+    return new Buffer<EventWrapper>(length, (wrapper) =>
+      this.#unbufferEvent(wrapper)
+    );
   }
 
   /**
    * If the event is buffer-able, put it in the buffer.
    */
   #bufferEvent(eventWrapper: EventWrapper, eventName: ChromiumBidi.EventNames) {
-    if (!eventBufferLength.has(eventName)) {
+    if (!this.#eventBufferLength.has(eventName)) {
       // Do nothing if the event is no buffer-able.
       return;
     }
-    const bufferMapKey = EventManager.#getMapKey(
-      eventName,
-      eventWrapper.contextId
-    );
-    if (!this.#eventBuffers.has(bufferMapKey)) {
-      this.#eventBuffers.set(
-        bufferMapKey,
-        new Buffer<EventWrapper>(eventBufferLength.get(eventName)!)
+    if (!this.#eventBuffers.has(eventName)) {
+      this.#eventBuffers.set(eventName, new Map());
+    }
+    const contextToBuffer = this.#eventBuffers.get(eventName)!;
+    if (!contextToBuffer.has(eventWrapper.contextId)) {
+      contextToBuffer.set(
+        eventWrapper.contextId,
+        this.#createBuffer(this.#eventBufferLength.get(eventName)!)
       );
     }
-    this.#eventBuffers.get(bufferMapKey)!.add(eventWrapper);
-    // Add the context to the list of contexts having `eventName` events.
-    this.#eventToContextsMap.get(eventName).add(eventWrapper.contextId);
+    eventWrapper.buffered = true;
+    contextToBuffer.get(eventWrapper.contextId)!.add(eventWrapper);
+
+    // Move the context to the end of the recently buffered list.
+    this.#bufferedContexts.delete(eventWrapper.contextId);
+    this.#bufferedContexts.add(eventWrapper.contextId);
+
+    // The size is known only once the event is resolved.
+    void eventWrapper.event.then((result) => {
+      if (!eventWrapper.buffered) {
+        return;
+      }
+      eventWrapper.result = result;
+      if (this.#maxTotalSize !== null) {
+        this.#bufferedSize += eventWrapper.size;
+        this.#dropLeastRecentlyBufferedEvents();
+      }
+    });
+  }
+
+  #unbufferEvent(eventWrapper: EventWrapper) {
+    eventWrapper.buffered = false;
+    if (this.#maxTotalSize !== null) {
+      this.#bufferedSize -= eventWrapper.size;
+    }
+  }
+
+  /** Drops all the buffered events of the given context. */
+  #dropBufferedEvents(contextId: BrowsingContext.BrowsingContext | null) {
+    for (const contextToBuffer of this.#eventBuffers.values()) {
+      for (const wrapper of contextToBuffer.get(contextId) ?? []) {
+        this.#unbufferEvent(wrapper);
+      }
+      contextToBuffer.delete(contextId);
+    }
+    this.#bufferedContexts.delete(contextId);
+  }
+
+  /**
+   * Drops the events of the least recently buffered into contexts until the
+   * buffered size is within the limit.
+   */
+  #dropLeastRecentlyBufferedEvents() {
+    if (this.#maxTotalSize === null) {
+      return;
+    }
+    for (const contextId of this.#bufferedContexts) {
+      if (this.#bufferedSize <= this.#maxTotalSize) {
+        return;
+      }
+      this.#dropBufferedEvents(contextId);
+    }
   }
 
   /**
@@ -217,61 +568,68 @@ export class EventManager {
     channel: string | null,
     eventName: ChromiumBidi.EventNames
   ) {
-    if (!eventBufferLength.has(eventName)) {
+    if (!this.#eventBufferLength.has(eventName)) {
       // Do nothing if the event is no buffer-able.
       return;
     }
 
-    const lastSentMapKey = EventManager.#getMapKey(
-      eventName,
-      eventWrapper.contextId,
-      channel
-    );
-    this.#lastMessageSent.set(
-      lastSentMapKey,
-      Math.max(this.#lastMessageSent.get(lastSentMapKey) ?? 0, eventWrapper.id)
+    if (!this.#lastMessageSent.has(eventName)) {
+      this.#lastMessageSent.set(eventName, new Map());
+    }
+    const contextToChannelMap = this.#lastMessageSent.get(eventName)!;
+    if (!contextToChannelMap.has(eventWrapper.contextId)) {
+      contextToChannelMap.set(eventWrapper.contextId, new Map());
+    }
+    const channelMap = contextToChannelMap.get(eventWrapper.contextId)!;
+    channelMap.set(
+      channel,
+      Math.max(channelMap.get(channel) ?? 0, eventWrapper.id)
     );
   }
 
   /**
-   * Returns events which are buffered and not yet sent to the given channel events.
+   * Returns events which are buffered and not yet sent to the given channel
+   * events, ordered by id.
    */
   #getBufferedEvents(
     eventName: ChromiumBidi.EventNames,
     contextId: BrowsingContext.BrowsingContext | null,
     channel: string | null
-  ): EventWrapper[] {
-    const bufferMapKey = EventManager.#getMapKey(eventName, contextId);
-    const lastSentMapKey = EventManager.#getMapKey(
-      eventName,
-      contextId,
-      channel
-    );
-    const lastSentMessageId =
-      this.#lastMessageSent.get(lastSentMapKey) ?? -Infinity;
-
-    const result: EventWrapper[] =
-      this.#eventBuffers
-        .get(bufferMapKey)
-        ?.get()
-        .filter((wrapper) => wrapper.id > lastSentMessageId) ?? [];
-
-    if (contextId === null) {
-      // For global subscriptions, events buffered in each context should be sent back.
-      Array.from(this.#eventToContextsMap.get(eventName).keys())
-        .filter(
-          (_contextId) =>
-            // Events without context are already in the result.
-            _contextId !== null &&
-            // Events from deleted contexts should not be sent.
-            this.#bidiServer.getBrowsingContextStorage().hasContext(_contextId)
-        )
-        .map((_contextId) =>
-          this.#getBufferedEvents(eventName, _contextId, channel)
-        )
-        .forEach((events) => result.push(...events));
-    }
-    return result.sort((e1, e2) => e1.id - e2.id);
+  ): Iterable<EventWrapper> {
+    const contextToBuffer = this.#eventBuffers.get(eventName);
+    if (contextToBuffer === undefined) {
+      return [];
+    }
+
+    // For global subscriptions, events buffered in each context should be
+    // sent back.
+    const contextIds =
+      contextId === null
+        ? Array.from(contextToBuffer.keys()).filter(
+            (_contextId) =>
+              _contextId === null ||
+              // Events from deleted contexts should not be sent.
+              this.#bidiServer
+                .getBrowsingContextStorage()
+                .hasContext(_contextId)
+          )
+        : [contextId];
+
+    const contextToChannelMap = this.#lastMessageSent.get(eventName);
+    const unsentEvents: Iterable<EventWrapper>[] = [];
+    for (const _contextId of contextIds) {
+      const buffer = contextToBuffer.get(_contextId);
+      if (buffer === undefined) {
+        continue;
+      }
+      const lastSentMessageId =
+        contextToChannelMap?.get(_contextId)?.get(channel) ?? -Infinity;
+      unsentEvents.push(
+        buffer.valuesAfter(lastSentMessageId, (wrapper) => wrapper.id)
+      );
+    }
+    // Each buffer is already ordered by id.
+    return mergeSorted(unsentEvents, (e1, e2) => e1.id - e2.id);
   }
 }
 
@@ -282,6 +640,7 @@ const EVENT_NAMES = new Set([
   ...Object.values(ChromiumBidi.Log.EventNames),
   ...Object.values(ChromiumBidi.Network.EventNames),
   ...Object.values(ChromiumBidi.Script.EventNames),
+  ...Object.values(ChromiumBidi.Session.EventNames),
   // keep-sorted end
 ]);
 
@@ -47,11 +47,12 @@ const ANOTHER_CHANNEL = 'ANOTHER_CHANNEL';
 
 describe('SubscriptionManager', () => {
   let subscriptionManager: SubscriptionManager;
+  let findTopLevelContextId: sinon.SinonStub;
 
   beforeEach(() => {
     const browsingContextStorage: BrowsingContextStorage =
       sinon.createStubInstance(BrowsingContextStorage);
-    browsingContextStorage.findTopLevelContextId = sinon
+    findTopLevelContextId = sinon
       .stub()
       .callsFake((contextId: BrowsingContext.BrowsingContext) => {
         if (contextId === SOME_NESTED_CONTEXT) {
@@ -68,6 +69,7 @@ describe('SubscriptionManager', () => {
         }
         return null;
       });
+    browsingContextStorage.findTopLevelContextId = findTopLevelContextId;
 
     subscriptionManager = new SubscriptionManager(browsingContextStorage);
   });
@@ -400,6 +402,155 @@ describe('SubscriptionManager', () => {
     });
   });
 
+  describe('isSubscribedTo', () => {
+    it('should be false without subscriptions', () => {
+      expect(subscriptionManager.isSubscribedTo(SOME_EVENT, SOME_CONTEXT)).to
+        .be.false;
+    });
+
+    it('should be true for global subscription in any context', () => {
+      subscriptionManager.subscribe(SOME_EVENT, null, SOME_CHANNEL);
+
+      expect(subscriptionManager.isSubscribedTo(SOME_EVENT, SOME_CONTEXT)).to
+        .be.true;
+      expect(subscriptionManager.isSubscribedTo(SOME_EVENT, null)).to.be.true;
+    });
+
+    it('should respect top-level context of nested context', () => {
+      subscriptionManager.subscribe(SOME_EVENT, SOME_CONTEXT, SOME_CHANNEL);
+
+      expect(
+        subscriptionManager.isSubscribedTo(SOME_EVENT, SOME_NESTED_CONTEXT)
+      ).to.be.true;
+      expect(
+        subscriptionManager.isSubscribedTo(SOME_EVENT, ANOTHER_NESTED_CONTEXT)
+      ).to.be.false;
+      expect(subscriptionManager.isSubscribedTo(ANOTHER_EVENT, SOME_CONTEXT))
+        .to.be.false;
+    });
+
+    it('should be false after unsubscribe', () => {
+      subscriptionManager.subscribe(SOME_EVENT, null, SOME_CHANNEL);
+      subscriptionManager.unsubscribe(SOME_EVENT, null, SOME_CHANNEL);
+
+      expect(subscriptionManager.isSubscribedTo(SOME_EVENT, null)).to.be.false;
+    });
+  });
+
+  describe('dispatch', () => {
+    const CHANNELS = Array.from({length: 100}, (_, i) => `CHANNEL_${i}`);
+    const CONTEXTS = Array.from({length: 100}, (_, i) => `CONTEXT_${i}`);
+
+    beforeEach(() => {
+      // Many unrelated subscriptions, which should not affect the dispatch.
+      for (const channel of CHANNELS) {
+        subscriptionManager.subscribe(ANOTHER_EVENT, null, channel);
+        for (const context of CONTEXTS) {
+          subscriptionManager.subscribe(YET_ANOTHER_EVENT, context, channel);
+        }
+      }
+      findTopLevelContextId.resetHistory();
+    });
+
+    it('should not look up the context without subscriptions', () => {
+      expect(
+        subscriptionManager.getChannelsSubscribedToEvent(
+          SOME_EVENT,
+          SOME_CONTEXT
+        )
+      ).to.deep.equal([]);
+      expect(findTopLevelContextId.callCount).to.equal(0);
+    });
+
+    it('should not look up the context with only global subscriptions', () => {
+      subscriptionManager.subscribe(SOME_EVENT, null, SOME_CHANNEL);
+      findTopLevelContextId.resetHistory();
+
+      expect(
+        subscriptionManager.getChannelsSubscribedToEvent(
+          SOME_EVENT,
+          SOME_NESTED_CONTEXT
+        )
+      ).to.deep.equal([SOME_CHANNEL]);
+      expect(findTopLevelContextId.callCount).to.equal(0);
+    });
+
+    it('should look up the context once regardless of channel count', () => {
+      subscriptionManager.subscribe(SOME_EVENT, SOME_CONTEXT, SOME_CHANNEL);
+      subscriptionManager.subscribe(SOME_EVENT, null, ANOTHER_CHANNEL);
+      subscriptionManager.subscribe(SOME_EVENT, ANOTHER_CONTEXT, 'UNRELATED');
+      subscriptionManager.subscribe(SOME_EVENT, null, SOME_CHANNEL);
+      findTopLevelContextId.resetHistory();
+
+      expect(
+        subscriptionManager.getChannelsSubscribedToEvent(
+          SOME_EVENT,
+          SOME_NESTED_CONTEXT
+        )
+      ).to.deep.equal([SOME_CHANNEL, ANOTHER_CHANNEL]);
+      expect(findTopLevelContextId.callCount).to.equal(1);
+    });
+
+    it('should keep priority order across global and context subscriptions', () => {
+      subscriptionManager.subscribe(SOME_EVENT, null, CHANNELS[0]!);
+      subscriptionManager.subscribe(SOME_EVENT, SOME_CONTEXT, CHANNELS[1]!);
+      subscriptionManager.subscribe(SOME_EVENT, null, CHANNELS[2]!);
+      subscriptionManager.subscribe(SOME_EVENT, SOME_CONTEXT, CHANNELS[3]!);
+      subscriptionManager.subscribe(SOME_EVENT, SOME_CONTEXT, CHANNELS[0]!);
+
+      expect(
+        subscriptionManager.getChannelsSubscribedToEvent(
+          SOME_EVENT,
+          SOME_CONTEXT
+        )
+      ).to.deep.equal([CHANNELS[0], CHANNELS[1], CHANNELS[2], CHANNELS[3]]);
+    });
+
+    it('should drop the index entries on unsubscribe', () => {
+      subscriptionManager.subscribe(SOME_EVENT, SOME_CONTEXT, SOME_CHANNEL);
+      subscriptionManager.unsubscribe(SOME_EVENT, SOME_CONTEXT, SOME_CHANNEL);
+      findTopLevelContextId.resetHistory();
+
+      expect(
+        subscriptionManager.getChannelsSubscribedToEvent(
+          SOME_EVENT,
+          SOME_CONTEXT
+        )
+      ).to.deep.equal([]);
+      expect(findTopLevelContextId.callCount).to.equal(0);
+    });
+  });
+
+  describe('benchmark', () => {
+    it('should dispatch in time independent of the unrelated subscriptions', () => {
+      const browsingContextStorage: BrowsingContextStorage =
+        sinon.createStubInstance(BrowsingContextStorage);
+      // Not a stub, so that the calls are not recorded.
+      browsingContextStorage.findTopLevelContextId = (contextId) =>
+        contextId === SOME_NESTED_CONTEXT ? SOME_CONTEXT : contextId;
+      const manager = new SubscriptionManager(browsingContextStorage);
+      for (let i = 0; i < 1000; i++) {
+        manager.subscribe(ANOTHER_EVENT, null, `CHANNEL_${i}`);
+        for (let j = 0; j < 10; j++) {
+          manager.subscribe(SOME_EVENT, `CONTEXT_${j}`, `CHANNEL_${i}`);
+        }
+      }
+      manager.subscribe(SOME_EVENT, SOME_CONTEXT, SOME_CHANNEL);
+      manager.subscribe(SOME_EVENT, null, ANOTHER_CHANNEL);
+
+      // Within the default test timeout only if dispatching does not depend on
+      // the 11000 unrelated subscriptions.
+      let dispatched = 0;
+      for (let i = 0; i < 100_000; i++) {
+        dispatched += manager.getChannelsSubscribedToEvent(
+          SOME_EVENT,
+          SOME_NESTED_CONTEXT
+        ).length;
+      }
+      expect(dispatched).to.equal(200_000);
+    });
+  });
+
   describe('cartesian product', () => {
     it('should return empty array for empty array', () => {
       expect(cartesianProduct([], [])).to.deep.equal([]);
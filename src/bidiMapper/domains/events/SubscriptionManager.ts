@@ -70,15 +70,15 @@ export function unrollEvents(
 
 export class SubscriptionManager {
   #subscriptionPriority = 0;
+  // Subscription priorities, indexed by event, then by top-level context, then
+  // by channel. As priorities only grow and re-subscribing keeps the original
+  // priority, each channel map is ordered by priority.
   // BrowsingContext `null` means the event has subscription across all the
   // browsing contexts.
   // Channel `null` means no `channel` should be added.
-  #channelToContextToEventMap = new Map<
-    string | null,
-    Map<
-      BrowsingContext.BrowsingContext | null,
-      Map<ChromiumBidi.EventNames, number>
-    >
+  #eventToContextToChannelMap = new Map<
+    ChromiumBidi.EventNames,
+    Map<BrowsingContext.BrowsingContext | null, Map<string | null, number>>
   >();
   #browsingContextStorage: BrowsingContextStorage;
 
@@ -86,60 +86,61 @@ export class SubscriptionManager {
     this.#browsingContextStorage = browsingContextStorage;
   }
 
+  /**
+   * Returns the channels subscribed to the event in the given context, ordered
+   * by subscription priority. The cost is proportional to the number of the
+   * matching subscriptions.
+   */
   getChannelsSubscribedToEvent(
     eventMethod: ChromiumBidi.EventNames,
     contextId: BrowsingContext.BrowsingContext | null
   ): (string | null)[] {
-    const prioritiesAndChannels = Array.from(
-      this.#channelToContextToEventMap.keys()
-    )
-      .map((channel) => ({
-        priority: this.#getEventSubscriptionPriorityForChannel(
-          eventMethod,
-          contextId,
-          channel
-        ),
-        channel,
-      }))
-      .filter(({priority}) => priority !== null) as {
-      priority: number;
-      channel: string | null;
-    }[];
-
-    // Sort channels by priority.
-    return prioritiesAndChannels
-      .sort((a, b) => a.priority - b.priority)
-      .map(({channel}) => channel);
-  }
+    const contextToChannelMap =
+      this.#eventToContextToChannelMap.get(eventMethod);
+    if (contextToChannelMap === undefined) {
+      return [];
+    }
 
-  #getEventSubscriptionPriorityForChannel(
-    eventMethod: ChromiumBidi.EventNames,
-    contextId: BrowsingContext.BrowsingContext | null,
-    channel: string | null
-  ): null | number {
-    const contextToEventMap = this.#channelToContextToEventMap.get(channel);
-    if (contextToEventMap === undefined) {
-      return null;
+    // `null` covers global subscription.
+    const globalChannels = contextToChannelMap.get(null);
+    if (contextToChannelMap.size === (globalChannels === undefined ? 0 : 1)) {
+      // Only global subscriptions, no need to look up the top-level context.
+      return [...(globalChannels?.keys() ?? [])];
     }
 
     const maybeTopLevelContextId =
       this.#browsingContextStorage.findTopLevelContextId(contextId);
+    const contextChannels =
+      maybeTopLevelContextId === null
+        ? undefined
+        : contextToChannelMap.get(maybeTopLevelContextId);
 
-    // `null` covers global subscription.
-    const relevantContexts = [...new Set([null, maybeTopLevelContextId])];
-
-    // Get all the subscription priorities.
-    const priorities: number[] = relevantContexts
-      .map((c) => contextToEventMap.get(c)?.get(eventMethod))
-      .filter((p) => p !== undefined) as number[];
+    return mergeByPriority(globalChannels, contextChannels);
+  }
 
-    if (priorities.length === 0) {
-      // Not subscribed, return null.
-      return null;
+  /**
+   * Returns true if any channel is subscribed to the event in the given
+   * context. Cheaper than `getChannelsSubscribedToEvent`, as no list is built.
+   */
+  isSubscribedTo(
+    eventMethod: ChromiumBidi.EventNames,
+    contextId: BrowsingContext.BrowsingContext | null
+  ): boolean {
+    const contextToChannelMap =
+      this.#eventToContextToChannelMap.get(eventMethod);
+    if (contextToChannelMap === undefined) {
+      return false;
+    }
+    if (contextToChannelMap.has(null)) {
+      return true;
     }
 
-    // Return minimal priority.
-    return Math.min(...priorities);
+    const maybeTopLevelContextId =
+      this.#browsingContextStorage.findTopLevelContextId(contextId);
+    return (
+      maybeTopLevelContextId !== null &&
+      contextToChannelMap.has(maybeTopLevelContextId)
+    );
   }
 
   subscribe(
@@ -176,22 +177,22 @@ export class SubscriptionManager {
       // Intentionally left empty.
     }
 
-    if (!this.#channelToContextToEventMap.has(channel)) {
-      this.#channelToContextToEventMap.set(channel, new Map());
+    if (!this.#eventToContextToChannelMap.has(event)) {
+      this.#eventToContextToChannelMap.set(event, new Map());
     }
-    const contextToEventMap = this.#channelToContextToEventMap.get(channel)!;
+    const contextToChannelMap = this.#eventToContextToChannelMap.get(event)!;
 
-    if (!contextToEventMap.has(contextId)) {
-      contextToEventMap.set(contextId, new Map());
+    if (!contextToChannelMap.has(contextId)) {
+      contextToChannelMap.set(contextId, new Map());
     }
-    const eventMap = contextToEventMap.get(contextId)!;
+    const channelMap = contextToChannelMap.get(contextId)!;
 
     // Do not re-subscribe to events to keep the priority.
-    if (eventMap.has(event)) {
+    if (channelMap.has(channel)) {
       return;
     }
 
-    eventMap.set(event, this.#subscriptionPriority++);
+    channelMap.set(channel, this.#subscriptionPriority++);
   }
 
   /**
@@ -243,25 +244,13 @@ export class SubscriptionManager {
     // All the subscriptions are handled on the top-level contexts.
     contextId = this.#browsingContextStorage.findTopLevelContextId(contextId);
 
-    if (!this.#channelToContextToEventMap.has(channel)) {
-      throw new InvalidArgumentException(
-        `Cannot unsubscribe from ${event}, ${
-          contextId === null ? 'null' : contextId
-        }. No subscription found.`
-      );
-    }
-    const contextToEventMap = this.#channelToContextToEventMap.get(channel)!;
-
-    if (!contextToEventMap.has(contextId)) {
-      throw new InvalidArgumentException(
-        `Cannot unsubscribe from ${event}, ${
-          contextId === null ? 'null' : contextId
-        }. No subscription found.`
-      );
-    }
-    const eventMap = contextToEventMap.get(contextId)!;
-
-    if (!eventMap.has(event)) {
+    const contextToChannelMap = this.#eventToContextToChannelMap.get(event);
+    const channelMap = contextToChannelMap?.get(contextId);
+    if (
+      contextToChannelMap === undefined ||
+      channelMap === undefined ||
+      !channelMap.has(channel)
+    ) {
       throw new InvalidArgumentException(
         `Cannot unsubscribe from ${event}, ${
           contextId === null ? 'null' : contextId
@@ -270,15 +259,47 @@ export class SubscriptionManager {
     }
 
     return () => {
-      eventMap.delete(event);
+      channelMap.delete(channel);
 
       // Clean up maps if empty.
-      if (eventMap.size === 0) {
-        contextToEventMap.delete(event);
+      if (channelMap.size === 0) {
+        contextToChannelMap.delete(contextId);
       }
-      if (contextToEventMap.size === 0) {
-        this.#channelToContextToEventMap.delete(channel);
+      if (contextToChannelMap.size === 0) {
+        this.#eventToContextToChannelMap.delete(event);
       }
     };
   }
 }
+
+/**
+ * Merges the channels of two maps ordered by priority into a single list
+ * ordered by priority. A channel present in both maps is listed once, with
+ * its higher priority.
+ */
+function mergeByPriority(
+  first: Map<string | null, number> | undefined,
+  second: Map<string | null, number> | undefined
+): (string | null)[] {
+  if (first === undefined || second === undefined) {
+    return [...((first ?? second)?.keys() ?? [])];
+  }
+
+  const firstEntries = [...first.entries()];
+  const secondEntries = [...second.entries()];
+  const result: (string | null)[] = [];
+  const seen = new Set<string | null>();
+  let i = 0;
+  let j = 0;
+  while (i < firstEntries.length || j < secondEntries.length) {
+    const takeFirst =
+      j === secondEntries.length ||
+      (i < firstEntries.length && firstEntries[i]![1] < secondEntries[j]![1]);
+    const [channel] = takeFirst ? firstEntries[i++]! : secondEntries[j++]!;
+    if (!seen.has(channel)) {
+      seen.add(channel);
+      result.push(channel);
+    }
+  }
+  return result;
+}
@@ -0,0 +1,60 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import {
+  UnknownErrorException,
+  type EmptyResult,
+  type Goog,
+} from '../../../protocol/protocol.js';
+
+import type {StreamStorage} from './StreamStorage.js';
+
+export class IoProcessor {
+  readonly #streamStorage: StreamStorage;
+
+  constructor(streamStorage: StreamStorage) {
+    this.#streamStorage = streamStorage;
+  }
+
+  async read(params: Goog.IoReadParameters): Promise<Goog.IoReadResult> {
+    const {cdpClient, handle} = this.#streamStorage.getStream(params.stream);
+    try {
+      const result = await cdpClient.sendCommand('IO.read', {
+        handle,
+        size: params.size,
+      });
+      if (result.base64Encoded !== true) {
+        throw new UnknownErrorException('Stream data is not base64-encoded');
+      }
+      return {
+        data: result.data,
+        eof: result.eof,
+      };
+    } catch (error) {
+      // The stream is unusable, e.g. because its target is gone.
+      this.#streamStorage.deleteStream(params.stream);
+      throw error;
+    }
+  }
+
+  async close(params: Goog.IoCloseParameters): Promise<EmptyResult> {
+    const {cdpClient, handle} = this.#streamStorage.getStream(params.stream);
+    this.#streamStorage.deleteStream(params.stream);
+    await cdpClient.sendCommand('IO.close', {handle});
+    return {};
+  }
+}
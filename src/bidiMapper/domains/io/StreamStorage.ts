@@ -0,0 +1,90 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import type Protocol from 'devtools-protocol';
+
+import type {ICdpClient} from '../../../cdp/cdpClient.js';
+import {
+  NoSuchHandleException,
+  type BrowsingContext,
+  type Goog,
+} from '../../../protocol/protocol.js';
+import {uuidv4} from '../../../utils/uuid.js';
+
+/** A CDP stream, read via the session it was created in. */
+export type CdpStream = {
+  cdpClient: ICdpClient;
+  handle: Protocol.IO.StreamHandle;
+  /** Context the stream was created for. */
+  contextId: BrowsingContext.BrowsingContext;
+};
+
+/**
+ * Container class for the CDP streams exposed to the client, e.g. by
+ * `goog:browsingContext.printToStream`.
+ */
+export class StreamStorage {
+  readonly #streams = new Map<Goog.Stream, CdpStream>();
+  readonly #streamsByContext = new Map<
+    BrowsingContext.BrowsingContext,
+    Set<Goog.Stream>
+  >();
+
+  addStream(cdpStream: CdpStream): Goog.Stream {
+    const stream = uuidv4();
+    this.#streams.set(stream, cdpStream);
+    let contextStreams = this.#streamsByContext.get(cdpStream.contextId);
+    if (contextStreams === undefined) {
+      contextStreams = new Set();
+      this.#streamsByContext.set(cdpStream.contextId, contextStreams);
+    }
+    contextStreams.add(stream);
+    return stream;
+  }
+
+  getStream(stream: Goog.Stream): CdpStream {
+    const cdpStream = this.#streams.get(stream);
+    if (cdpStream === undefined) {
+      throw new NoSuchHandleException(`Unknown stream '${stream}'`);
+    }
+    return cdpStream;
+  }
+
+  deleteStream(stream: Goog.Stream) {
+    const cdpStream = this.#streams.get(stream);
+    if (cdpStream === undefined) {
+      return;
+    }
+    this.#streams.delete(stream);
+    const contextStreams = this.#streamsByContext.get(cdpStream.contextId)!;
+    contextStreams.delete(stream);
+    if (contextStreams.size === 0) {
+      this.#streamsByContext.delete(cdpStream.contextId);
+    }
+  }
+
+  /** Closes and deletes the streams of the context, once it is disposed. */
+  deleteContextStreams(contextId: BrowsingContext.BrowsingContext) {
+    for (const stream of this.#streamsByContext.get(contextId) ?? []) {
+      const {cdpClient, handle} = this.#streams.get(stream)!;
+      this.#streams.delete(stream);
+      // The target of the stream can be gone already.
+      void cdpClient.sendCommand('IO.close', {handle}).catch(() => {});
+    }
+    this.#streamsByContext.delete(contextId);
+  }
+}
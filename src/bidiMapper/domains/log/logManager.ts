@@ -90,6 +90,15 @@ export class LogManager {
           cdpSessionId: this.#cdpTarget.cdpSessionId,
           executionContextId: params.executionContextId,
         });
+        if (
+          !this.#eventManager.isSubscribedOrBuffered(
+            ChromiumBidi.Log.EventNames.LogEntryAddedEvent,
+            realm?.browsingContextId ?? 'UNKNOWN'
+          )
+        ) {
+          // Do not serialize the arguments if nobody needs them.
+          return;
+        }
         const argsPromise: Promise<Script.RemoteValue[]> =
           realm === undefined
             ? Promise.resolve(params.args as Script.RemoteValue[])
@@ -140,6 +149,14 @@ export class LogManager {
           cdpSessionId: this.#cdpTarget.cdpSessionId,
           executionContextId: params.exceptionDetails.executionContextId,
         });
+        if (
+          !this.#eventManager.isSubscribedOrBuffered(
+            ChromiumBidi.Log.EventNames.LogEntryAddedEvent,
+            realm?.browsingContextId ?? 'UNKNOWN'
+          )
+        ) {
+          return;
+        }
 
         // Try the best to get the exception text.
         const textPromise = (async () => {
@@ -173,6 +173,15 @@ export class NetworkRequest {
       error: new Error('Loading Failed'),
     });
 
+    if (
+      !this.#eventManager.isSubscribedOrBuffered(
+        ChromiumBidi.Network.EventNames.FetchErrorEvent,
+        this.#requestWillBeSentEvent?.frameId ?? null
+      )
+    ) {
+      return;
+    }
+
     this.#eventManager.registerEvent(
       {
         type: 'event',
@@ -277,7 +286,13 @@ export class NetworkRequest {
   }
 
   #sendBeforeRequestEvent() {
-    if (!this.#isIgnoredEvent()) {
+    if (
+      !this.#isIgnoredEvent() &&
+      this.#eventManager.isSubscribedOrBuffered(
+        ChromiumBidi.Network.EventNames.BeforeRequestSentEvent,
+        this.#requestWillBeSentEvent?.frameId ?? null
+      )
+    ) {
       this.#eventManager.registerPromiseEvent(
         this.#beforeRequestSentDeferred.then((result) => {
           if (result.kind === 'success') {
@@ -315,7 +330,13 @@ export class NetworkRequest {
   }
 
   #sendResponseReceivedEvent() {
-    if (!this.#isIgnoredEvent()) {
+    if (
+      !this.#isIgnoredEvent() &&
+      this.#eventManager.isSubscribedOrBuffered(
+        ChromiumBidi.Network.EventNames.ResponseCompletedEvent,
+        this.#responseReceivedEvent?.frameId ?? null
+      )
+    ) {
       this.#eventManager.registerPromiseEvent(
         this.#responseReceivedDeferred.then((result) => {
           if (result.kind === 'success') {
@@ -0,0 +1,119 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import {expect} from 'chai';
+import * as sinon from 'sinon';
+
+import {CompiledFunctionCache} from './CompiledFunctionCache.js';
+
+describe('CompiledFunctionCache', () => {
+  let compile: sinon.SinonStub;
+  let release: sinon.SinonSpy;
+  let cache: CompiledFunctionCache;
+
+  beforeEach(() => {
+    compile = sinon.stub().callsFake(async (declaration) => `${declaration}#`);
+    release = sinon.fake();
+    cache = new CompiledFunctionCache(2, compile, release);
+  });
+
+  /** Calls the declaration until it is compiled. */
+  async function useCompiled(declaration: string) {
+    await cache.use(declaration, async () => undefined);
+    await cache.use(declaration, async () => undefined);
+  }
+
+  it('should not compile the declaration called once', async () => {
+    const handle = await cache.use('f', async (handle) => handle);
+
+    expect(handle).to.be.undefined;
+    expect(compile.called).to.be.false;
+  });
+
+  it('should compile the declaration once called again', async () => {
+    const handle1 = await cache.use('f', async (handle) => handle);
+    const handle2 = await cache.use('f', async (handle) => handle);
+    const handle3 = await cache.use('f', async (handle) => handle);
+
+    expect(handle1).to.be.undefined;
+    expect(handle2).to.equal('f#');
+    expect(handle3).to.equal('f#');
+    expect(compile.callCount).to.equal(1);
+  });
+
+  it('should forget the least recently seen declarations', async () => {
+    await cache.use('f', async () => undefined);
+    await cache.use('g', async () => undefined);
+    await cache.use('h', async () => undefined);
+    const handle = await cache.use('f', async (handle) => handle);
+
+    expect(handle).to.be.undefined;
+    expect(compile.called).to.be.false;
+  });
+
+  it('should release the least recently used function', async () => {
+    await useCompiled('f');
+    await useCompiled('g');
+    await cache.use('f', async () => undefined);
+    await useCompiled('h');
+    await Promise.resolve();
+
+    expect(cache.size).to.equal(2);
+    expect(release.calledOnceWith('g#')).to.be.true;
+  });
+
+  it('should not release the function in use', async () => {
+    await cache.use('f', async () => undefined);
+    let done!: () => void;
+    const call = cache.use(
+      'f',
+      () => new Promise<void>((resolve) => (done = resolve))
+    );
+    await useCompiled('g');
+    await useCompiled('h');
+    await Promise.resolve();
+
+    expect(release.called).to.be.false;
+
+    done();
+    await call;
+    await Promise.resolve();
+
+    expect(release.calledOnceWith('f#')).to.be.true;
+  });
+
+  it('should not cache the failed compilation', async () => {
+    compile.onFirstCall().rejects(new Error('some error'));
+
+    await useCompiled('f');
+    const handle1 = await cache.use('f', async (handle) => handle);
+    const handle2 = await cache.use('f', async (handle) => handle);
+
+    expect(handle1).to.be.undefined;
+    expect(handle2).to.equal('f#');
+    expect(compile.callCount).to.equal(2);
+  });
+
+  it('should forget all the functions when cleared', async () => {
+    await useCompiled('f');
+    cache.clear();
+    await useCompiled('f');
+
+    expect(compile.callCount).to.equal(2);
+    expect(release.called).to.be.false;
+  });
+});
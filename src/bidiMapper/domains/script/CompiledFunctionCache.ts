@@ -0,0 +1,143 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import type {Script} from '../../../protocol/protocol.js';
+
+type Entry = {
+  /** Handle of the compiled function, or `undefined` if it cannot be cached. */
+  handle: Promise<Script.Handle | undefined>;
+  /** Number of the calls using the handle. */
+  users: number;
+  evicted: boolean;
+};
+
+/**
+ * Keeps the handles of the functions compiled in a realm, keyed by their
+ * declaration, so that repeated calls of the same declaration are not parsed
+ * and sent again. A declaration is compiled only once it is called for the
+ * second time, so that unique declarations cost no additional round trip. The
+ * least recently used functions are released once there are more than
+ * `maxSize` of them.
+ */
+export class CompiledFunctionCache {
+  readonly #maxSize: number;
+  readonly #compile: (
+    declaration: string
+  ) => Promise<Script.Handle | undefined>;
+  readonly #release: (handle: Script.Handle) => void;
+  /** Entries in the least recently used order. */
+  readonly #entries = new Map<string, Entry>();
+  /** Declarations called once and not compiled, in the order of the calls. */
+  readonly #seenOnce = new Set<string>();
+
+  /**
+   * @param compile Creates the function of the declaration. Returns
+   *   `undefined` if the declaration cannot be cached.
+   * @param release Releases the function no longer cached.
+   */
+  constructor(
+    maxSize: number,
+    compile: (declaration: string) => Promise<Script.Handle | undefined>,
+    release: (handle: Script.Handle) => void
+  ) {
+    this.#maxSize = maxSize;
+    this.#compile = compile;
+    this.#release = release;
+  }
+
+  get size(): number {
+    return this.#entries.size;
+  }
+
+  /**
+   * Runs the call with the handle of the compiled declaration, or with
+   * `undefined` if it is not compiled yet or cannot be cached. The handle is
+   * not released until the call is done.
+   */
+  async use<T>(
+    declaration: string,
+    call: (handle: Script.Handle | undefined) => Promise<T>
+  ): Promise<T> {
+    if (!this.#entries.has(declaration) && !this.#seenOnce.has(declaration)) {
+      this.#seenOnce.add(declaration);
+      if (this.#seenOnce.size > this.#maxSize) {
+        this.#seenOnce.delete(this.#seenOnce.values().next().value!);
+      }
+      return call(undefined);
+    }
+    this.#seenOnce.delete(declaration);
+
+    const entry = this.#get(declaration);
+    entry.users++;
+    try {
+      return await call(await entry.handle);
+    } finally {
+      entry.users--;
+      this.#releaseIfUnused(entry);
+    }
+  }
+
+  /** Forgets all the functions, e.g. when the realm is destroyed. */
+  clear() {
+    this.#entries.clear();
+    this.#seenOnce.clear();
+  }
+
+  #get(declaration: string): Entry {
+    const cached = this.#entries.get(declaration);
+    if (cached !== undefined) {
+      // Move to the most recently used position.
+      this.#entries.delete(declaration);
+      this.#entries.set(declaration, cached);
+      return cached;
+    }
+
+    const entry: Entry = {
+      handle: this.#compile(declaration).catch(() => {
+        // Compile again next time, the failure can be transient.
+        if (this.#entries.get(declaration) === entry) {
+          this.#entries.delete(declaration);
+        }
+        return undefined;
+      }),
+      users: 0,
+      evicted: false,
+    };
+    this.#entries.set(declaration, entry);
+
+    for (const [oldest, evicted] of this.#entries) {
+      if (this.#entries.size <= this.#maxSize) {
+        break;
+      }
+      this.#entries.delete(oldest);
+      evicted.evicted = true;
+      this.#releaseIfUnused(evicted);
+    }
+    return entry;
+  }
+
+  #releaseIfUnused(entry: Entry) {
+    if (!entry.evicted || entry.users > 0) {
+      return;
+    }
+    void entry.handle.then((handle) => {
+      if (handle !== undefined) {
+        this.#release(handle);
+      }
+    });
+  }
+}
@@ -0,0 +1,108 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import {expect} from 'chai';
+import * as sinon from 'sinon';
+
+import {ObjectGroupGenerations} from './ObjectGroupGenerations.js';
+
+describe('ObjectGroupGenerations', () => {
+  let clock: sinon.SinonFakeTimers;
+  let releaseGroup: sinon.SinonSpy;
+  let groups: ObjectGroupGenerations;
+
+  beforeEach(() => {
+    clock = sinon.useFakeTimers();
+    releaseGroup = sinon.fake();
+    groups = new ObjectGroupGenerations('prefix/', releaseGroup);
+  });
+
+  afterEach(() => {
+    clock.restore();
+  });
+
+  it('should share the group within a task', () => {
+    const group1 = groups.begin();
+    const group2 = groups.begin();
+    clock.tick(0);
+    const group3 = groups.begin();
+
+    expect(group1).to.equal('prefix/0');
+    expect(group2).to.equal(group1);
+    expect(group3).to.equal('prefix/1');
+  });
+
+  it('should release the group once closed and its commands are done', () => {
+    const group = groups.begin();
+    groups.begin();
+    groups.end(group);
+    clock.tick(0);
+    sinon.assert.notCalled(releaseGroup);
+
+    groups.end(group);
+
+    sinon.assert.calledOnceWithExactly(releaseGroup, group);
+  });
+
+  it('should release the group on close if its commands are done', () => {
+    const group = groups.begin();
+    groups.end(group);
+    sinon.assert.notCalled(releaseGroup);
+
+    clock.tick(0);
+
+    sinon.assert.calledOnceWithExactly(releaseGroup, group);
+  });
+
+  it('should keep the group until its handles are disowned', () => {
+    const group = groups.begin();
+    groups.retain(group, 'HANDLE_1');
+    groups.retain(group, 'HANDLE_2');
+    groups.end(group);
+    clock.tick(0);
+
+    expect(groups.disown(['HANDLE_1'])).to.deep.equal(['HANDLE_1']);
+    sinon.assert.notCalled(releaseGroup);
+
+    expect(groups.disown(['HANDLE_2'])).to.deep.equal([]);
+    sinon.assert.calledOnceWithExactly(releaseGroup, group);
+  });
+
+  it('should release all the disowned handles of a group at once', () => {
+    const group = groups.begin();
+    groups.retain(group, 'HANDLE_1');
+    groups.retain(group, 'HANDLE_2');
+    groups.end(group);
+    clock.tick(0);
+
+    expect(groups.disown(['HANDLE_1', 'HANDLE_2', 'UNKNOWN'])).to.deep.equal([
+      'UNKNOWN',
+    ]);
+    sinon.assert.calledOnceWithExactly(releaseGroup, group);
+  });
+
+  it('should release handles of an open group individually', () => {
+    const group = groups.begin();
+    groups.retain(group, 'HANDLE_1');
+
+    expect(groups.disown(['HANDLE_1'])).to.deep.equal(['HANDLE_1']);
+
+    groups.end(group);
+    clock.tick(0);
+    sinon.assert.calledOnceWithExactly(releaseGroup, group);
+  });
+});
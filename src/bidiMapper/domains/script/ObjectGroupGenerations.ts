@@ -0,0 +1,131 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import type {Script} from '../../../protocol/protocol.js';
+
+type Generation = {
+  name: string;
+  /** Number of the commands which can still create objects in the group. */
+  pending: number;
+  /** Handles of the group retained by the client. */
+  handles: Set<Script.Handle>;
+  /** Whether new commands use another group. */
+  closed: boolean;
+};
+
+/**
+ * Assigns the remote objects created by the commands of a realm to CDP object
+ * groups. The commands started in the same task share a group, which is
+ * released with a single `Runtime.releaseObjectGroup` once it is closed, its
+ * commands are done and the client retains none of its handles.
+ */
+export class ObjectGroupGenerations {
+  readonly #prefix: string;
+  readonly #releaseGroup: (name: string) => void;
+  /** Maps group name to the generation, until the group is released. */
+  readonly #generations = new Map<string, Generation>();
+  readonly #handleToGeneration = new Map<Script.Handle, Generation>();
+  #current: Generation | undefined;
+  #nextId = 0;
+
+  /**
+   * @param prefix Prefix of the group names, unique per CDP session.
+   * @param releaseGroup Releases the objects of the group.
+   */
+  constructor(prefix: string, releaseGroup: (name: string) => void) {
+    this.#prefix = prefix;
+    this.#releaseGroup = releaseGroup;
+  }
+
+  /**
+   * Returns the group for the objects of a new command. The group is not
+   * released until `end` is called with it.
+   */
+  begin(): string {
+    if (this.#current === undefined) {
+      const generation: Generation = {
+        name: `${this.#prefix}${this.#nextId++}`,
+        pending: 0,
+        handles: new Set(),
+        closed: false,
+      };
+      this.#current = generation;
+      this.#generations.set(generation.name, generation);
+      // Close the group once the current task is done.
+      setTimeout(() => {
+        generation.closed = true;
+        this.#current = undefined;
+        this.#releaseIfUnused(generation);
+      }, 0);
+    }
+    this.#current.pending++;
+    return this.#current.name;
+  }
+
+  /** Marks the command which got the group from `begin` as done. */
+  end(name: string) {
+    const generation = this.#generations.get(name)!;
+    generation.pending--;
+    this.#releaseIfUnused(generation);
+  }
+
+  /** Keeps the group alive until the handle of its object is disowned. */
+  retain(name: string, handle: Script.Handle) {
+    const generation = this.#generations.get(name)!;
+    generation.handles.add(handle);
+    this.#handleToGeneration.set(handle, generation);
+  }
+
+  /**
+   * Forgets the given handles, releasing the groups no longer needed. Returns
+   * the handles to be released individually, as their group is still needed.
+   */
+  disown(handles: Iterable<Script.Handle>): Script.Handle[] {
+    const disowned = new Map<Script.Handle, Generation | undefined>();
+    for (const handle of handles) {
+      const generation = this.#handleToGeneration.get(handle);
+      disowned.set(handle, generation);
+      this.#handleToGeneration.delete(handle);
+      generation?.handles.delete(handle);
+    }
+
+    const toRelease: Script.Handle[] = [];
+    for (const [handle, generation] of disowned) {
+      if (generation === undefined || !this.#releaseIfUnused(generation)) {
+        toRelease.push(handle);
+      }
+    }
+    return toRelease;
+  }
+
+  /** Releases the group if it is not needed. Returns whether it is released. */
+  #releaseIfUnused(generation: Generation): boolean {
+    if (!this.#generations.has(generation.name)) {
+      return true;
+    }
+    if (
+      !generation.closed ||
+      generation.pending > 0 ||
+      generation.handles.size > 0
+    ) {
+      return false;
+    }
+    this.#generations.delete(generation.name);
+    this.#releaseGroup(generation.name);
+    return true;
+  }
+}
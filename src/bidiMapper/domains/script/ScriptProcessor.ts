@@ -17,6 +17,7 @@
 
 import {
   type EmptyResult,
+  type Goog,
   Script,
   NoSuchScriptException,
 } from '../../../protocol/protocol';
@@ -87,7 +88,7 @@ export class ScriptProcessor {
   }
 
   async callFunction(
-    params: Script.CallFunctionParameters
+    params: Goog.CallFunctionParameters
   ): Promise<Script.EvaluateResult> {
     const realm = await this.#getRealm(params.target);
     return realm.callFunction(
@@ -99,12 +100,13 @@ export class ScriptProcessor {
       params.awaitPromise,
       params.resultOwnership ?? Script.ResultOwnership.None,
       params.serializationOptions ?? {},
-      params.userActivation ?? false
+      params.userActivation ?? false,
+      params['goog:objectGroup']
     );
   }
 
   async evaluate(
-    params: Script.EvaluateParameters
+    params: Goog.EvaluateParameters
   ): Promise<Script.EvaluateResult> {
     const realm = await this.#getRealm(params.target);
     return realm.evaluate(
@@ -112,7 +114,8 @@ export class ScriptProcessor {
       params.awaitPromise,
       params.resultOwnership ?? Script.ResultOwnership.None,
       params.serializationOptions ?? {},
-      params.userActivation ?? false
+      params.userActivation ?? false,
+      params['goog:objectGroup']
     );
   }
 
@@ -124,6 +127,14 @@ export class ScriptProcessor {
     return {};
   }
 
+  async disownGroup(
+    params: Goog.ScriptDisownGroupParameters
+  ): Promise<EmptyResult> {
+    const realm = await this.#getRealm(params.target);
+    await realm.disownGroup(params.group);
+    return {};
+  }
+
   getRealms(params: Script.GetRealmsParameters): Script.GetRealmsResult {
     if (params.context !== undefined) {
       // Make sure the context is known.
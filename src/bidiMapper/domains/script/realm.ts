@@ -19,6 +19,7 @@ import {Protocol} from 'devtools-protocol';
 import {
   ChromiumBidi,
   type BrowsingContext,
+  type Goog,
   NoSuchHandleException,
   NoSuchNodeException,
   UnknownErrorException,
@@ -29,10 +30,23 @@ import type {EventManager} from '../events/EventManager.js';
 import type {ICdpClient} from '../../../cdp/cdpClient.js';
 import {LogType, type LoggerFn} from '../../../utils/log.js';
 
+import {CompiledFunctionCache} from './CompiledFunctionCache.js';
+import {ObjectGroupGenerations} from './ObjectGroupGenerations.js';
 import {ChannelProxy} from './channelProxy.js';
 import type {RealmStorage} from './realmStorage.js';
 
 const SHARED_ID_DIVIDER = '_element_';
+/** Maximum number of the compiled `script.callFunction` declarations. */
+const MAX_COMPILED_FUNCTIONS = 100;
+/**
+ * URL of the script calling the compiled function, so that its frame is removed
+ * from the stack traces.
+ */
+const CALL_COMPILED_FUNCTION_URL = '__chromium_bidi_call_compiled_function__';
+/** Calls the compiled function the command is sent to. */
+const CALL_COMPILED_FUNCTION_SCRIPT =
+  'function (...args) { return this(...args); }\n' +
+  `//# sourceURL=${CALL_COMPILED_FUNCTION_URL}\n`;
 
 export class Realm {
   readonly #realmStorage: RealmStorage;
@@ -46,6 +60,17 @@ export class Realm {
   readonly #eventManager: EventManager;
   readonly sandbox?: string;
   readonly #logger?: LoggerFn;
+  /** Groups of the objects the client does not retain. */
+  readonly #transientGroups: ObjectGroupGenerations;
+  /** Groups of the objects sent to the client as handles. */
+  readonly #rootGroups: ObjectGroupGenerations;
+  /** Maps CDP object group of a client-named group to its handles. */
+  readonly #clientGroups = new Map<string, Set<Script.Handle>>();
+  readonly #handleToClientGroup = new Map<Script.Handle, string>();
+  /** Handles to be released at the end of the current task. */
+  #disownedHandles = new Set<Script.Handle>();
+  #disownFlush: Promise<void> | undefined;
+  readonly #compiledFunctions: CompiledFunctionCache;
 
   constructor(
     realmStorage: RealmStorage,
@@ -71,24 +96,52 @@ export class Realm {
     this.#browsingContextStorage = browsingContextStorage;
     this.#eventManager = eventManager;
     this.#logger = logger;
+    this.#transientGroups = new ObjectGroupGenerations(
+      `${realmId}/transient/`,
+      this.#releaseObjectGroup
+    );
+    this.#rootGroups = new ObjectGroupGenerations(
+      `${realmId}/root/`,
+      this.#releaseObjectGroup
+    );
+    this.#compiledFunctions = new CompiledFunctionCache(
+      MAX_COMPILED_FUNCTIONS,
+      this.#compileFunction,
+      (handle) =>
+        void this.#releaseObject(handle).catch((error) =>
+          this.#logger?.(LogType.debug, error)
+        )
+    );
 
     this.#realmStorage.addRealm(this);
 
-    this.#eventManager.registerEvent(
-      {
-        type: 'event',
-        method: ChromiumBidi.Script.EventNames.RealmCreated,
-        params: this.realmInfo,
-      },
-      this.browsingContextId
-    );
+    if (
+      this.#eventManager.isSubscribedOrBuffered(
+        ChromiumBidi.Script.EventNames.RealmCreated,
+        this.browsingContextId
+      )
+    ) {
+      this.#eventManager.registerEvent(
+        {
+          type: 'event',
+          method: ChromiumBidi.Script.EventNames.RealmCreated,
+          params: this.realmInfo,
+        },
+        this.browsingContextId
+      );
+    }
   }
 
+  /**
+   * @param objectGroup Group the result was created in by `#withObjectGroup`,
+   *   if any. Otherwise, the result is released individually unless retained.
+   */
   cdpToBidiValue(
     cdpValue:
       | Protocol.Runtime.CallFunctionOnResponse
       | Protocol.Runtime.EvaluateResponse,
-    resultOwnership: Script.ResultOwnership
+    resultOwnership: Script.ResultOwnership,
+    objectGroup?: string
   ): Script.RemoteValue {
     const bidiValue = this.#deepSerializedToBiDi(
       cdpValue.result.deepSerializedValue!
@@ -101,8 +154,19 @@ export class Realm {
         // and  CDP response but not on the actual BiDi type.
         (bidiValue as any).handle = objectId;
         // Remember all the handles sent to client.
-        this.#realmStorage.knownHandlesToRealmMap.set(objectId, this.realmId);
-      } else {
+        if (objectGroup !== undefined) {
+          this.#retain(objectGroup, objectId);
+        }
+        for (const evicted of this.#realmStorage.addHandle(
+          objectId,
+          this.realmId
+        )) {
+          // No need to await for the object to be released.
+          void this.#queueRelease(evicted).catch(
+            (error) => this.#logger?.(LogType.debug, error)
+          );
+        }
+      } else if (objectGroup === undefined) {
         // No need to await for the object to be released.
         void this.#releaseObject(objectId).catch(
           (error) => this.#logger?.(LogType.debug, error)
@@ -235,44 +299,87 @@ export class Realm {
     };
   }
 
+  /**
+   * @param clientGroup Client-named group to put the result handle into.
+   */
   async evaluate(
     expression: string,
     awaitPromise: boolean,
     resultOwnership: Script.ResultOwnership,
     serializationOptions: Script.SerializationOptions,
-    userActivation = false
+    userActivation = false,
+    clientGroup?: Goog.ObjectGroup
   ): Promise<Script.EvaluateResult> {
     await this.#browsingContextStorage
       .getContext(this.browsingContextId)
       .targetUnblocked();
 
-    const cdpEvaluateResult = await this.cdpClient.sendCommand(
-      'Runtime.evaluate',
-      {
-        contextId: this.executionContextId,
-        expression,
-        awaitPromise,
-        serializationOptions: Realm.#getSerializationOptions(
-          Protocol.Runtime.SerializationOptionsSerialization.Deep,
-          serializationOptions
-        ),
-        userGesture: userActivation,
+    return this.#withObjectGroup(
+      resultOwnership,
+      clientGroup,
+      async (objectGroup) => {
+        const cdpEvaluateResult = await this.cdpClient.sendCommand(
+          'Runtime.evaluate',
+          {
+            contextId: this.executionContextId,
+            expression,
+            awaitPromise,
+            serializationOptions: Realm.#getSerializationOptions(
+              Protocol.Runtime.SerializationOptionsSerialization.Deep,
+              serializationOptions
+            ),
+            userGesture: userActivation,
+            objectGroup,
+          }
+        );
+
+        if (cdpEvaluateResult.exceptionDetails) {
+          return this.#getExceptionResult(
+            cdpEvaluateResult.exceptionDetails,
+            0,
+            resultOwnership
+          );
+        }
+
+        return {
+          realm: this.realmId,
+          result: this.cdpToBidiValue(
+            cdpEvaluateResult,
+            resultOwnership,
+            objectGroup
+          ),
+          type: 'success',
+        };
       }
     );
+  }
 
-    if (cdpEvaluateResult.exceptionDetails) {
-      return this.#getExceptionResult(
-        cdpEvaluateResult.exceptionDetails,
-        0,
-        resultOwnership
-      );
+  /**
+   * Runs the command creating remote objects in an object group, which is
+   * kept until the command is done. Handles of a client-named group are kept
+   * until the group is disowned.
+   */
+  async #withObjectGroup<T>(
+    resultOwnership: Script.ResultOwnership,
+    clientGroup: Goog.ObjectGroup | undefined,
+    command: (objectGroup: string) => Promise<T>
+  ): Promise<T> {
+    if (
+      clientGroup !== undefined &&
+      resultOwnership === Script.ResultOwnership.Root
+    ) {
+      return command(`${this.#clientGroupPrefix}${clientGroup}`);
+    }
+    const groups =
+      resultOwnership === Script.ResultOwnership.Root
+        ? this.#rootGroups
+        : this.#transientGroups;
+    const objectGroup = groups.begin();
+    try {
+      return await command(objectGroup);
+    } finally {
+      groups.end(objectGroup);
     }
-
-    return {
-      realm: this.realmId,
-      result: this.cdpToBidiValue(cdpEvaluateResult, resultOwnership),
-      type: 'success',
-    };
   }
 
   /**
@@ -285,21 +392,28 @@ export class Realm {
   ): Promise<Script.RemoteValue> {
     const argument = Realm.#cdpRemoteObjectToCallArgument(cdpRemoteObject);
 
-    const cdpValue: Protocol.Runtime.CallFunctionOnResponse =
-      await this.cdpClient.sendCommand('Runtime.callFunctionOn', {
-        functionDeclaration: String(
-          (remoteObject: Protocol.Runtime.RemoteObject) => remoteObject
-        ),
-        awaitPromise: false,
-        arguments: [argument],
-        serializationOptions: {
-          serialization:
-            Protocol.Runtime.SerializationOptionsSerialization.Deep,
-        },
-        executionContextId: this.executionContextId,
-      });
+    return this.#withObjectGroup(
+      resultOwnership,
+      undefined,
+      async (objectGroup) => {
+        const cdpValue: Protocol.Runtime.CallFunctionOnResponse =
+          await this.cdpClient.sendCommand('Runtime.callFunctionOn', {
+            functionDeclaration: String(
+              (remoteObject: Protocol.Runtime.RemoteObject) => remoteObject
+            ),
+            awaitPromise: false,
+            arguments: [argument],
+            serializationOptions: {
+              serialization:
+                Protocol.Runtime.SerializationOptionsSerialization.Deep,
+            },
+            executionContextId: this.executionContextId,
+            objectGroup,
+          });
 
-    return this.cdpToBidiValue(cdpValue, resultOwnership);
+        return this.cdpToBidiValue(cdpValue, resultOwnership, objectGroup);
+      }
+    );
   }
 
   static #cdpRemoteObjectToCallArgument(
@@ -374,12 +488,15 @@ export class Realm {
     resultOwnership: Script.ResultOwnership
   ): Promise<Script.ExceptionDetails> {
     const callFrames =
-      cdpExceptionDetails.stackTrace?.callFrames.map((frame) => ({
-        url: frame.url,
-        functionName: frame.functionName,
-        lineNumber: frame.lineNumber - lineOffset,
-        columnNumber: frame.columnNumber,
-      })) ?? [];
+      cdpExceptionDetails.stackTrace?.callFrames
+        // The cached functions are called by an extra script.
+        .filter((frame) => frame.url !== CALL_COMPILED_FUNCTION_URL)
+        .map((frame) => ({
+          url: frame.url,
+          functionName: frame.functionName,
+          lineNumber: frame.lineNumber - lineOffset,
+          columnNumber: frame.columnNumber,
+        })) ?? [];
 
     // Exception should always be there.
     const exception = cdpExceptionDetails.exception!;
@@ -395,6 +512,9 @@ export class Realm {
     };
   }
 
+  /**
+   * @param clientGroup Client-named group to put the result handle into.
+   */
   async callFunction(
     functionDeclaration: string,
     thisLocalValue: Script.LocalValue,
@@ -402,23 +522,13 @@ export class Realm {
     awaitPromise: boolean,
     resultOwnership: Script.ResultOwnership,
     serializationOptions: Script.SerializationOptions,
-    userActivation = false
+    userActivation = false,
+    clientGroup?: Goog.ObjectGroup
   ): Promise<Script.EvaluateResult> {
     await this.#browsingContextStorage
       .getContext(this.browsingContextId)
       .targetUnblocked();
 
-    const callFunctionAndSerializeScript = `(...args) => {
-      function callFunction(f, args) {
-        const deserializedThis = args.shift();
-        const deserializedArgs = args;
-        return f.apply(deserializedThis, deserializedArgs);
-      }
-      return callFunction((
-        ${functionDeclaration}
-      ), args);
-    }`;
-
     const thisAndArgumentsList = [
       await this.#deserializeToCdpArg(thisLocalValue),
       ...(await Promise.all(
@@ -429,52 +539,122 @@ export class Realm {
       )),
     ];
 
-    let cdpCallFunctionResult: Protocol.Runtime.CallFunctionOnResponse;
-    try {
-      cdpCallFunctionResult = await this.cdpClient.sendCommand(
-        'Runtime.callFunctionOn',
-        {
-          functionDeclaration: callFunctionAndSerializeScript,
-          awaitPromise,
-          arguments: thisAndArgumentsList,
-          serializationOptions: Realm.#getSerializationOptions(
-            Protocol.Runtime.SerializationOptionsSerialization.Deep,
-            serializationOptions
-          ),
-          executionContextId: this.executionContextId,
-          userGesture: userActivation,
-        }
-      );
-    } catch (error: any) {
-      // Heuristic to determine if the problem is in the argument.
-      // The check can be done on the `deserialization` step, but this approach
-      // helps to save round-trips.
-      if (
-        error.code === -32000 &&
-        [
-          'Could not find object with given id',
-          'Argument should belong to the same JavaScript world as target object',
-          'Invalid remote object id',
-        ].includes(error.message)
-      ) {
-        throw new NoSuchHandleException('Handle was not found.');
+    return this.#compiledFunctions.use(
+      functionDeclaration,
+      (functionHandle) =>
+        this.#withObjectGroup(
+          resultOwnership,
+          clientGroup,
+          async (objectGroup) => {
+            let cdpCallFunctionResult: Protocol.Runtime.CallFunctionOnResponse;
+            try {
+              cdpCallFunctionResult = await this.cdpClient.sendCommand(
+                'Runtime.callFunctionOn',
+                {
+                  // Call the compiled function if cached, otherwise send the
+                  // whole declaration.
+                  ...(functionHandle === undefined
+                    ? {
+                        functionDeclaration:
+                          Realm.#callFunctionScript(functionDeclaration),
+                        executionContextId: this.executionContextId,
+                      }
+                    : {
+                        functionDeclaration: CALL_COMPILED_FUNCTION_SCRIPT,
+                        objectId: functionHandle,
+                      }),
+                  awaitPromise,
+                  arguments: thisAndArgumentsList,
+                  serializationOptions: Realm.#getSerializationOptions(
+                    Protocol.Runtime.SerializationOptionsSerialization.Deep,
+                    serializationOptions
+                  ),
+                  userGesture: userActivation,
+                  objectGroup,
+                }
+              );
+            } catch (error: any) {
+              // Heuristic to determine if the problem is in the argument.
+              // The check can be done on the `deserialization` step, but this
+              // approach helps to save round-trips.
+              if (
+                error.code === -32000 &&
+                [
+                  'Could not find object with given id',
+                  'Argument should belong to the same JavaScript world as target object',
+                  'Invalid remote object id',
+                ].includes(error.message)
+              ) {
+                throw new NoSuchHandleException('Handle was not found.');
+              }
+              throw error;
+            }
+
+            if (cdpCallFunctionResult.exceptionDetails) {
+              return this.#getExceptionResult(
+                cdpCallFunctionResult.exceptionDetails,
+                1,
+                resultOwnership
+              );
+            }
+            return {
+              type: 'success',
+              result: this.cdpToBidiValue(
+                cdpCallFunctionResult,
+                resultOwnership,
+                objectGroup
+              ),
+              realm: this.realmId,
+            };
+          }
+        )
+    );
+  }
+
+  /**
+   * Returns the script calling the function declaration with the deserialized
+   * `this` and arguments.
+   */
+  static #callFunctionScript(functionDeclaration: string): string {
+    return `(...args) => {
+      function callFunction(f, args) {
+        const deserializedThis = args.shift();
+        const deserializedArgs = args;
+        return f.apply(deserializedThis, deserializedArgs);
       }
-      throw error;
-    }
+      return callFunction((
+        ${functionDeclaration}
+      ), args);
+    }`;
+  }
 
-    if (cdpCallFunctionResult.exceptionDetails) {
-      return this.#getExceptionResult(
-        cdpCallFunctionResult.exceptionDetails,
-        1,
-        resultOwnership
-      );
+  /**
+   * Creates the function calling the declaration, so that it is parsed once
+   * per realm. The declaration keeps its line numbers, as the function is the
+   * same script as the one sent for every call otherwise. Returns `undefined`
+   * if the script throws, so that the error is reported by the call itself.
+   */
+  #compileFunction = async (
+    functionDeclaration: string
+  ): Promise<Script.Handle | undefined> => {
+    const callFunctionScript = Realm.#callFunctionScript(functionDeclaration);
+    const {result, exceptionDetails} = await this.cdpClient.sendCommand(
+      'Runtime.callFunctionOn',
+      {
+        functionDeclaration: `() => ${callFunctionScript}`,
+        executionContextId: this.executionContextId,
+      }
+    );
+    if (exceptionDetails !== undefined) {
+      if (result.objectId !== undefined) {
+        void this.#releaseObject(result.objectId).catch((error) =>
+          this.#logger?.(LogType.debug, error)
+        );
+      }
+      return undefined;
     }
-    return {
-      type: 'success',
-      result: this.cdpToBidiValue(cdpCallFunctionResult, resultOwnership),
-      realm: this.realmId,
-    };
-  }
+    return result.objectId;
+  };
 
   async #deserializeToCdpArg(
     localValue: Script.LocalValue
@@ -521,6 +701,7 @@ export class Realm {
         throw new UnknownErrorException(error.message, error.stack);
       }
     } else if ('handle' in localValue && localValue.handle) {
+      this.#realmStorage.touchHandle(localValue.handle);
       return {objectId: localValue.handle};
       // We tried to find a handle value but failed
       // This allows us to have exhaustive switch on `localValue.type`
@@ -766,20 +947,100 @@ export class Realm {
     }
   }
 
+  #releaseObjectGroup = (objectGroup: string) => {
+    // No need to await for the objects to be released.
+    void this.cdpClient
+      .sendCommand('Runtime.releaseObjectGroup', {objectGroup})
+      .catch((error) => this.#logger?.(LogType.debug, error));
+  };
+
+  /** Keeps the object of the handle until its group is released. */
+  #retain(objectGroup: string, handle: Script.Handle) {
+    if (!objectGroup.startsWith(this.#clientGroupPrefix)) {
+      this.#rootGroups.retain(objectGroup, handle);
+      return;
+    }
+    let handles = this.#clientGroups.get(objectGroup);
+    if (handles === undefined) {
+      handles = new Set();
+      this.#clientGroups.set(objectGroup, handles);
+    }
+    handles.add(handle);
+    this.#handleToClientGroup.set(handle, objectGroup);
+  }
+
+  get #clientGroupPrefix(): string {
+    return `${this.realmId}/client/`;
+  }
+
+  /**
+   * Releases all the objects of the client-named group at once. The group is
+   * released even if no handle of it is retained, as it can still hold the
+   * objects never sent to the client, e.g. thrown exceptions.
+   */
+  async disownGroup(clientGroup: Goog.ObjectGroup) {
+    const objectGroup = `${this.#clientGroupPrefix}${clientGroup}`;
+    const handles = this.#clientGroups.get(objectGroup) ?? [];
+    this.#clientGroups.delete(objectGroup);
+    for (const handle of handles) {
+      this.#handleToClientGroup.delete(handle);
+      this.#realmStorage.deleteHandle(handle);
+    }
+    await this.cdpClient.sendCommand('Runtime.releaseObjectGroup', {
+      objectGroup,
+    });
+  }
+
   async disown(handle: Script.Handle) {
     // Disowning an object from different realm does nothing.
-    if (
-      this.#realmStorage.knownHandlesToRealmMap.get(handle) !== this.realmId
-    ) {
+    if (this.#realmStorage.getHandleRealm(handle) !== this.realmId) {
       return;
     }
 
-    await this.#releaseObject(handle);
+    this.#realmStorage.deleteHandle(handle);
+    await this.#queueRelease(handle);
+  }
 
-    this.#realmStorage.knownHandlesToRealmMap.delete(handle);
+  /**
+   * Releases the handle together with the other handles released in the
+   * current task, so that handles sharing an object group are released with a
+   * single command.
+   */
+  #queueRelease(handle: Script.Handle): Promise<void> {
+    const clientGroup = this.#handleToClientGroup.get(handle);
+    if (clientGroup !== undefined) {
+      this.#handleToClientGroup.delete(handle);
+      const handles = this.#clientGroups.get(clientGroup)!;
+      handles.delete(handle);
+      if (handles.size === 0) {
+        this.#clientGroups.delete(clientGroup);
+      }
+    }
+    this.#disownedHandles.add(handle);
+    this.#disownFlush ??= Promise.resolve().then(async () => {
+      const handles = this.#disownedHandles;
+      this.#disownedHandles = new Set();
+      this.#disownFlush = undefined;
+      await Promise.all(
+        this.#rootGroups
+          .disown(handles)
+          .map((handle) => this.#releaseObject(handle))
+      );
+    });
+    return this.#disownFlush;
   }
 
   dispose() {
+    // The compiled functions are gone with the execution context.
+    this.#compiledFunctions.clear();
+    if (
+      !this.#eventManager.isSubscribedOrBuffered(
+        ChromiumBidi.Script.EventNames.RealmDestroyed,
+        this.browsingContextId
+      )
+    ) {
+      return;
+    }
     this.#eventManager.registerEvent(
       {
         type: 'event',
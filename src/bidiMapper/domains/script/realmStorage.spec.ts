@@ -0,0 +1,166 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import {expect} from 'chai';
+import * as sinon from 'sinon';
+
+import type {Realm} from './realm.js';
+import {RealmStorage} from './realmStorage.js';
+
+function createRealm(
+  realmId: string,
+  browsingContextId: string,
+  executionContextId: number,
+  cdpSessionId: string,
+  sandbox?: string
+): Realm {
+  return {
+    realmId,
+    browsingContextId,
+    executionContextId,
+    sandbox,
+    origin: 'http://example.com',
+    type: 'window',
+    cdpClient: {sessionId: cdpSessionId},
+    dispose: sinon.fake(),
+  } as unknown as Realm;
+}
+
+describe('RealmStorage', () => {
+  let realmStorage: RealmStorage;
+  let realm1: Realm;
+  let realm1Sandbox: Realm;
+  let realm2: Realm;
+
+  beforeEach(() => {
+    realmStorage = new RealmStorage();
+    realm1 = createRealm('REALM_1', 'CONTEXT_1', 1, 'SESSION_1');
+    realm1Sandbox = createRealm(
+      'REALM_1_SANDBOX',
+      'CONTEXT_1',
+      2,
+      'SESSION_1',
+      'SANDBOX'
+    );
+    // Execution context ids are unique only within a CDP session.
+    realm2 = createRealm('REALM_2', 'CONTEXT_2', 1, 'SESSION_2');
+    realmStorage.addRealm(realm1);
+    realmStorage.addRealm(realm1Sandbox);
+    realmStorage.addRealm(realm2);
+  });
+
+  it('should find all realms', () => {
+    expect(realmStorage.findRealms({})).to.deep.equal([
+      realm1,
+      realm1Sandbox,
+      realm2,
+    ]);
+  });
+
+  it('should find realm by id', () => {
+    expect(realmStorage.findRealms({realmId: 'REALM_2'})).to.deep.equal([
+      realm2,
+    ]);
+    expect(realmStorage.findRealms({realmId: 'UNKNOWN'})).to.deep.equal([]);
+  });
+
+  it('should find realm by execution context', () => {
+    expect(
+      realmStorage.findRealm({cdpSessionId: 'SESSION_2', executionContextId: 1})
+    ).to.equal(realm2);
+    expect(
+      realmStorage.findRealm({cdpSessionId: 'SESSION_2', executionContextId: 2})
+    ).to.be.undefined;
+  });
+
+  it('should find realms by browsing context and sandbox', () => {
+    expect(
+      realmStorage.findRealms({browsingContextId: 'CONTEXT_1'})
+    ).to.deep.equal([realm1, realm1Sandbox]);
+    expect(
+      realmStorage.findRealms({
+        browsingContextId: 'CONTEXT_1',
+        sandbox: 'SANDBOX',
+      })
+    ).to.deep.equal([realm1Sandbox]);
+    expect(
+      realmStorage.findRealms({
+        browsingContextId: 'CONTEXT_2',
+        sandbox: 'SANDBOX',
+      })
+    ).to.deep.equal([]);
+  });
+
+  it('should apply non-indexed filters', () => {
+    expect(
+      realmStorage.findRealms({cdpSessionId: 'SESSION_1', type: 'window'})
+    ).to.deep.equal([realm1, realm1Sandbox]);
+    expect(
+      realmStorage.findRealms({cdpSessionId: 'SESSION_1', origin: 'null'})
+    ).to.deep.equal([]);
+  });
+
+  it('should delete realms from all indexes', () => {
+    realmStorage.addHandle('HANDLE_1', 'REALM_1');
+    realmStorage.addHandle('HANDLE_2', 'REALM_2');
+
+    realmStorage.deleteRealms({cdpSessionId: 'SESSION_1'});
+
+    sinon.assert.calledOnce(realm1.dispose as sinon.SinonSpy);
+    sinon.assert.calledOnce(realm1Sandbox.dispose as sinon.SinonSpy);
+    expect(realmStorage.realmCount).to.equal(1);
+    expect(realmStorage.findRealms({realmId: 'REALM_1'})).to.deep.equal([]);
+    expect(
+      realmStorage.findRealms({browsingContextId: 'CONTEXT_1'})
+    ).to.deep.equal([]);
+    expect(realmStorage.findRealms({sandbox: 'SANDBOX'})).to.deep.equal([]);
+    expect(
+      realmStorage.findRealm({cdpSessionId: 'SESSION_1', executionContextId: 1})
+    ).to.be.undefined;
+    expect(realmStorage.getHandleRealm('HANDLE_1')).to.be.undefined;
+    expect(realmStorage.getHandleRealm('HANDLE_2')).to.equal('REALM_2');
+    expect(realmStorage.handleCount).to.equal(1);
+  });
+
+  describe('handles', () => {
+    it('should track handles per realm', () => {
+      expect(realmStorage.addHandle('HANDLE_1', 'REALM_1')).to.deep.equal([]);
+      expect(realmStorage.getHandleRealm('HANDLE_1')).to.equal('REALM_1');
+
+      realmStorage.deleteHandle('HANDLE_1');
+
+      expect(realmStorage.getHandleRealm('HANDLE_1')).to.be.undefined;
+      expect(realmStorage.handleCount).to.equal(0);
+    });
+
+    it('should evict the least recently used handles over the limit', () => {
+      realmStorage = new RealmStorage(2);
+
+      expect(realmStorage.addHandle('HANDLE_1', 'REALM_1')).to.deep.equal([]);
+      expect(realmStorage.addHandle('HANDLE_2', 'REALM_1')).to.deep.equal([]);
+      // Handles of other realms do not count.
+      expect(realmStorage.addHandle('HANDLE_3', 'REALM_2')).to.deep.equal([]);
+      realmStorage.touchHandle('HANDLE_1');
+
+      expect(realmStorage.addHandle('HANDLE_4', 'REALM_1')).to.deep.equal([
+        'HANDLE_2',
+      ]);
+      expect(realmStorage.getHandleRealm('HANDLE_2')).to.be.undefined;
+      expect(realmStorage.handleCount).to.equal(3);
+    });
+  });
+});
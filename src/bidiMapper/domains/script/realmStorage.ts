@@ -38,25 +38,124 @@ type RealmFilter = {
 /** Container class for browsing realms. */
 export class RealmStorage {
   /** Tracks handles and their realms sent to the client. */
-  readonly #knownHandlesToRealmMap = new Map<
-    Protocol.Runtime.RemoteObjectId,
-    Script.Realm
-  >();
+  readonly #knownHandlesToRealmMap = new Map<Script.Handle, Script.Realm>();
+  /**
+   * Maps realm ID to the handles sent to the client, from the least to the
+   * most recently used.
+   */
+  readonly #realmToHandles = new Map<Script.Realm, Set<Script.Handle>>();
+  /** Maximum number of the handles retained per realm, if any. */
+  readonly #maxHandlesPerRealm: number;
 
   /** Map from realm ID to Realm. */
   readonly #realmMap = new Map<Script.Realm, Realm>();
+  /**
+   * Secondary indexes of the realms. Each maps a key to the realms having it,
+   * in the order they were added.
+   */
+  readonly #realmsByExecutionContext = new Map<string, Set<Realm>>();
+  readonly #realmsByBrowsingContext = new Map<
+    BrowsingContext.BrowsingContext,
+    Set<Realm>
+  >();
+  readonly #realmsBySandbox = new Map<string, Set<Realm>>();
+  readonly #realmsByCdpSession = new Map<
+    Protocol.Target.SessionID,
+    Set<Realm>
+  >();
+
+  /**
+   * @param maxHandlesPerRealm Maximum number of the handles retained per realm.
+   *   Once exceeded, the least recently used handles are released.
+   */
+  constructor(maxHandlesPerRealm = Infinity) {
+    this.#maxHandlesPerRealm = maxHandlesPerRealm;
+  }
+
+  /** Number of the realms. */
+  get realmCount(): number {
+    return this.#realmMap.size;
+  }
 
-  get knownHandlesToRealmMap() {
-    return this.#knownHandlesToRealmMap;
+  /** Number of the handles sent to the client. */
+  get handleCount(): number {
+    return this.#knownHandlesToRealmMap.size;
+  }
+
+  /**
+   * Remembers the handle sent to the client. Returns the least recently used
+   * handles of the realm exceeding the limit, to be released by the caller.
+   */
+  addHandle(handle: Script.Handle, realmId: Script.Realm): Script.Handle[] {
+    this.#knownHandlesToRealmMap.set(handle, realmId);
+    let handles = this.#realmToHandles.get(realmId);
+    if (handles === undefined) {
+      handles = new Set();
+      this.#realmToHandles.set(realmId, handles);
+    }
+    // Re-inserting moves the handle to the most recently used position.
+    handles.delete(handle);
+    handles.add(handle);
+
+    const evicted: Script.Handle[] = [];
+    for (const leastRecentlyUsed of handles) {
+      if (handles.size <= this.#maxHandlesPerRealm) {
+        break;
+      }
+      handles.delete(leastRecentlyUsed);
+      this.#knownHandlesToRealmMap.delete(leastRecentlyUsed);
+      evicted.push(leastRecentlyUsed);
+    }
+    return evicted;
+  }
+
+  /** Returns the realm the handle was sent from, if it is known. */
+  getHandleRealm(handle: Script.Handle): Script.Realm | undefined {
+    return this.#knownHandlesToRealmMap.get(handle);
+  }
+
+  /** Marks the known handle as the most recently used one of its realm. */
+  touchHandle(handle: Script.Handle) {
+    const realmId = this.#knownHandlesToRealmMap.get(handle);
+    if (realmId === undefined) {
+      return;
+    }
+    const handles = this.#realmToHandles.get(realmId)!;
+    handles.delete(handle);
+    handles.add(handle);
+  }
+
+  deleteHandle(handle: Script.Handle) {
+    const realmId = this.#knownHandlesToRealmMap.get(handle);
+    if (realmId === undefined) {
+      return;
+    }
+    this.#knownHandlesToRealmMap.delete(handle);
+    const handles = this.#realmToHandles.get(realmId)!;
+    handles.delete(handle);
+    if (handles.size === 0) {
+      this.#realmToHandles.delete(realmId);
+    }
   }
 
   addRealm(realm: Realm) {
     this.#realmMap.set(realm.realmId, realm);
+    addToIndex(
+      this.#realmsByExecutionContext,
+      getExecutionContextKey(
+        realm.cdpClient.sessionId,
+        realm.executionContextId
+      ),
+      realm
+    );
+    addToIndex(this.#realmsByBrowsingContext, realm.browsingContextId, realm);
+    addToIndex(this.#realmsBySandbox, realm.sandbox, realm);
+    addToIndex(this.#realmsByCdpSession, realm.cdpClient.sessionId, realm);
   }
 
   /** Finds all realms that match the given filter. */
   findRealms(filter: RealmFilter): Realm[] {
-    return Array.from(this.#realmMap.values()).filter((realm) => {
+    return Array.from(this.#getCandidates(filter)).filter((realm) => {
       if (filter.realmId !== undefined && filter.realmId !== realm.realmId) {
         return false;
       }
@@ -97,6 +196,49 @@ export class RealmStorage {
     });
   }
 
+  /**
+   * Returns the realms possibly matching the given filter, using the most
+   * selective index applicable to it.
+   */
+  #getCandidates(filter: RealmFilter): Iterable<Realm> {
+    if (filter.realmId !== undefined) {
+      const realm = this.#realmMap.get(filter.realmId);
+      return realm === undefined ? [] : [realm];
+    }
+    if (
+      filter.executionContextId !== undefined &&
+      filter.cdpSessionId !== undefined
+    ) {
+      return (
+        this.#realmsByExecutionContext.get(
+          getExecutionContextKey(
+            filter.cdpSessionId,
+            filter.executionContextId
+          )
+        ) ?? []
+      );
+    }
+
+    let candidates: Set<Realm> | undefined;
+    for (const [index, key] of [
+      [this.#realmsByBrowsingContext, filter.browsingContextId],
+      [this.#realmsBySandbox, filter.sandbox],
+      [this.#realmsByCdpSession, filter.cdpSessionId],
+    ] as const) {
+      if (key === undefined) {
+        continue;
+      }
+      const realms = index.get(key);
+      if (realms === undefined) {
+        return [];
+      }
+      if (candidates === undefined || realms.size < candidates.size) {
+        candidates = realms;
+      }
+    }
+    return candidates ?? this.#realmMap.values();
+  }
+
   findRealm(filter: RealmFilter): Realm | undefined {
     const maybeRealms = this.findRealms(filter);
     if (maybeRealms.length !== 1) {
@@ -121,9 +263,67 @@ export class RealmStorage {
     this.findRealms(filter).map((realm) => {
       realm.dispose();
       this.#realmMap.delete(realm.realmId);
-      Array.from(this.knownHandlesToRealmMap.entries())
-        .filter(([, r]) => r === realm.realmId)
-        .map(([handle]) => this.knownHandlesToRealmMap.delete(handle));
+      deleteFromIndex(
+        this.#realmsByExecutionContext,
+        getExecutionContextKey(
+          realm.cdpClient.sessionId,
+          realm.executionContextId
+        ),
+        realm
+      );
+      deleteFromIndex(
+        this.#realmsByBrowsingContext,
+        realm.browsingContextId,
+        realm
+      );
+      deleteFromIndex(this.#realmsBySandbox, realm.sandbox, realm);
+      deleteFromIndex(
+        this.#realmsByCdpSession,
+        realm.cdpClient.sessionId,
+        realm
+      );
+      for (const handle of this.#realmToHandles.get(realm.realmId) ?? []) {
+        this.#knownHandlesToRealmMap.delete(handle);
+      }
+      this.#realmToHandles.delete(realm.realmId);
     });
   }
 }
+
+function getExecutionContextKey(
+  cdpSessionId: Protocol.Target.SessionID | undefined,
+  executionContextId: Protocol.Runtime.ExecutionContextId
+): string {
+  return `${cdpSessionId ?? ''}\n${executionContextId}`;
+}
+
+function addToIndex<K>(
+  index: Map<K, Set<Realm>>,
+  key: K | undefined,
+  realm: Realm
+) {
+  if (key === undefined) {
+    return;
+  }
+  let realms = index.get(key);
+  if (realms === undefined) {
+    realms = new Set();
+    index.set(key, realms);
+  }
+  realms.add(realm);
+}
+
+function deleteFromIndex<K>(
+  index: Map<K, Set<Realm>>,
+  key: K | undefined,
+  realm: Realm
+) {
+  if (key === undefined) {
+    return;
+  }
+  const realms = index.get(key);
+  realms?.delete(realm);
+  if (realms?.size === 0) {
+    index.delete(key);
+  }
+}
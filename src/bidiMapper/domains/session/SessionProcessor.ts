@@ -18,6 +18,7 @@
 import type {
   ChromiumBidi,
   EmptyResult,
+  Goog,
   Session,
 } from '../../../protocol/protocol.js';
 import type {EventManager} from '../events/EventManager.js';
@@ -56,4 +57,22 @@ export class SessionProcessor {
     );
     return {};
   }
+
+  getEventBuffering(): Goog.SessionGetEventBufferingResult {
+    return this.#eventManager.getEventBuffering();
+  }
+
+  setPendingMessageLimits(
+    params: Goog.SessionSetPendingMessageLimitsParameters
+  ): EmptyResult {
+    this.#eventManager.setPendingMessageLimits(params);
+    return {};
+  }
+
+  setEventBuffering(
+    params: Goog.SessionSetEventBufferingParameters
+  ): EmptyResult {
+    this.#eventManager.setEventBuffering(params);
+    return {};
+  }
 }
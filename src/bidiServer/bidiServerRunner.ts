@@ -20,12 +20,20 @@ import debug from 'debug';
 import websocket from 'websocket';
 
 import type {ITransport} from '../utils/transport.js';
+import {uuidv4} from '../utils/uuid.js';
+
+import {SessionLimiter, type SessionLimits} from './sessionLimiter.js';
 
 export const debugInfo = debug('bidi:server:info');
 const debugInternal = debug('bidi:server:internal');
 const debugSend = debug('bidi:server:SEND ▸');
 const debugRecv = debug('bidi:server:RECV ◂');
 
+// Time in milliseconds a session created with the `/session` HTTP endpoint
+// waits for its WebSocket connection before it is discarded.
+const PENDING_SESSION_TIMEOUT = 60_000;
+const SESSION_PATH_REGEX = /^\/session\/([^/]+)$/;
+
 function getHttpRequestPayload(request: http.IncomingMessage): Promise<string> {
   return new Promise((resolve, reject) => {
     let data = '';
@@ -42,6 +50,23 @@ function getHttpRequestPayload(request: http.IncomingMessage): Promise<string> {
 }
 
 export class BidiServerRunner {
+  #sessionLimiter: SessionLimiter;
+  // Sessions created with the `/session` HTTP endpoint, which are not
+  // connected yet, with their expiration timeouts.
+  #pendingSessions = new Map<string, ReturnType<typeof setTimeout>>();
+  // Connections of the sessions created with the `/session` HTTP endpoint.
+  #activeSessions = new Map<string, websocket.connection>();
+
+  constructor(
+    sessionLimits: SessionLimits = {
+      maxSessions: 0,
+      maxQueuedSessions: 0,
+      queueTimeout: 0,
+    }
+  ) {
+    this.#sessionLimiter = new SessionLimiter(sessionLimits);
+  }
+
   /**
    *
    * @param bidiPort port to start ws server on
@@ -67,6 +92,25 @@ export class BidiServerRunner {
 
         // https://w3c.github.io/webdriver-bidi/#transport, step 2.
         if (request.url === '/session') {
+          // Waits for a free session slot if the limit is reached, or until
+          // the queue timeout.
+          const sessionId = await this.#createPendingSession();
+          if (sessionId === null) {
+            response.writeHead(500, {
+              'Content-Type': 'application/json;charset=utf-8',
+              'Cache-Control': 'no-cache',
+            });
+            response.write(
+              JSON.stringify({
+                value: {
+                  error: 'session not created',
+                  message: 'Maximum number of sessions reached',
+                  stacktrace: '',
+                },
+              })
+            );
+            return response.end();
+          }
           response.writeHead(200, {
             'Content-Type': 'application/json;charset=utf-8',
             'Cache-Control': 'no-cache',
@@ -74,13 +118,26 @@ export class BidiServerRunner {
           response.write(
             JSON.stringify({
               value: {
-                sessionId: '1',
+                sessionId,
                 capabilities: {
-                  webSocketUrl: `ws://localhost:${bidiPort}`,
+                  webSocketUrl: `ws://localhost:${bidiPort}/session/${sessionId}`,
                 },
               },
             })
           );
+        } else if (
+          request.method === 'DELETE' &&
+          this.#deleteSession(SESSION_PATH_REGEX.exec(request.url)?.[1] ?? '')
+        ) {
+          response.writeHead(200, {
+            'Content-Type': 'application/json;charset=utf-8',
+            'Cache-Control': 'no-cache',
+          });
+          response.write(
+            JSON.stringify({
+              value: null,
+            })
+          );
         } else if (request.url.startsWith('/session')) {
           debugInternal(
             `Unknown session command ${
@@ -128,11 +185,37 @@ export class BidiServerRunner {
     wsServer.on('request', async (request: websocket.request) => {
       debugInternal('new WS request received:', request.resourceURL.path);
 
+      // Connections to `/session/<id>` use the session slot taken by the
+      // `/session` HTTP endpoint, other connections take a slot themselves.
+      const sessionId = SESSION_PATH_REGEX.exec(
+        request.resourceURL.pathname ?? ''
+      )?.[1];
+      if (sessionId !== undefined) {
+        if (!this.#takePendingSession(sessionId)) {
+          request.reject(404, `Unknown session ${sessionId}`);
+          return;
+        }
+      } else if (!(await this.#sessionLimiter.acquire())) {
+        request.reject(503, 'Maximum number of sessions reached');
+        return;
+      }
+
       const bidiServer = new BidiServer();
 
-      const onBidiConnectionClosed = await onNewBidiConnectionOpen(bidiServer);
+      let onBidiConnectionClosed: () => void;
+      try {
+        onBidiConnectionClosed = await onNewBidiConnectionOpen(bidiServer);
+      } catch (e) {
+        debugInfo('Could not open BiDi connection', e);
+        this.#sessionLimiter.release();
+        request.reject(500, 'Could not open BiDi connection');
+        return;
+      }
 
       const connection = request.accept();
+      if (sessionId !== undefined) {
+        this.#activeSessions.set(sessionId, connection);
+      }
 
       connection.on('message', (message) => {
         // 1. If |type| is not text, return.
@@ -159,6 +242,10 @@ export class BidiServerRunner {
           } disconnected.`
         );
 
+        if (sessionId !== undefined) {
+          this.#activeSessions.delete(sessionId);
+        }
+        this.#sessionLimiter.release();
         onBidiConnectionClosed();
       });
 
@@ -168,6 +255,69 @@ export class BidiServerRunner {
     });
   }
 
+  /**
+   * Takes a session slot and creates a session waiting for its WebSocket
+   * connection. Returns `null` if the session limit does not allow it.
+   */
+  async #createPendingSession(): Promise<string | null> {
+    if (!(await this.#sessionLimiter.acquire())) {
+      return null;
+    }
+    const sessionId = uuidv4();
+    this.#pendingSessions.set(
+      sessionId,
+      setTimeout(() => {
+        debugInternal(`Session ${sessionId} was not connected in time.`);
+        this.#deletePendingSession(sessionId);
+      }, PENDING_SESSION_TIMEOUT)
+    );
+    return sessionId;
+  }
+
+  /**
+   * Marks the pending session as connected. Returns `false` if there is no
+   * such pending session.
+   */
+  #takePendingSession(sessionId: string): boolean {
+    const expirationTimeout = this.#pendingSessions.get(sessionId);
+    if (expirationTimeout === undefined) {
+      return false;
+    }
+    clearTimeout(expirationTimeout);
+    this.#pendingSessions.delete(sessionId);
+    return true;
+  }
+
+  /**
+   * Discards the pending session and frees its slot. Returns `false` if there
+   * is no such pending session.
+   */
+  #deletePendingSession(sessionId: string): boolean {
+    if (!this.#takePendingSession(sessionId)) {
+      return false;
+    }
+    this.#sessionLimiter.release();
+    return true;
+  }
+
+  /**
+   * Discards the pending session, or closes the connection of the active one,
+   * which frees its slot once closed. Returns `false` if there is no such
+   * session.
+   */
+  #deleteSession(sessionId: string): boolean {
+    if (this.#deletePendingSession(sessionId)) {
+      return true;
+    }
+    const connection = this.#activeSessions.get(sessionId);
+    if (connection === undefined) {
+      return false;
+    }
+    this.#activeSessions.delete(sessionId);
+    connection.close();
+    return true;
+  }
+
   #sendClientMessageStr(
     messageStr: string,
     connection: websocket.connection
@@ -0,0 +1,143 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import * as chai from 'chai';
+import {expect} from 'chai';
+import * as sinon from 'sinon';
+import chaiAsPromised from 'chai-as-promised';
+
+import {BrowserPool, type BrowserPoolOptions} from './browserPool.js';
+
+chai.use(chaiAsPromised);
+
+class FakeInstance {
+  static launched: FakeInstance[] = [];
+
+  closed = false;
+
+  constructor() {
+    FakeInstance.launched.push(this);
+  }
+
+  close(): Promise<void> {
+    this.closed = true;
+    return Promise.resolve();
+  }
+}
+
+function createPool(
+  options: Partial<BrowserPoolOptions> = {}
+): BrowserPool<FakeInstance> {
+  return new BrowserPool(() => Promise.resolve(new FakeInstance()), {
+    size: 2,
+    maxIdleAge: 0,
+    refill: 'eager',
+    ...options,
+  });
+}
+
+describe('BrowserPool', () => {
+  let clock: sinon.SinonFakeTimers;
+
+  beforeEach(() => {
+    FakeInstance.launched = [];
+    clock = sinon.useFakeTimers();
+  });
+
+  afterEach(() => {
+    clock.restore();
+  });
+
+  it('should pre-launch instances', async () => {
+    const pool = createPool();
+    await clock.tickAsync(0);
+
+    expect(FakeInstance.launched).to.have.length(2);
+    expect(pool.idleCount).to.equal(2);
+  });
+
+  it('should hand out pre-launched instances', async () => {
+    const pool = createPool();
+    await clock.tickAsync(0);
+
+    const instance = await pool.acquire();
+
+    expect(instance).to.equal(FakeInstance.launched[0]);
+  });
+
+  it('should launch an instance if the pool is empty', async () => {
+    const pool = createPool({size: 0});
+
+    const instance = await pool.acquire();
+
+    expect(FakeInstance.launched).to.deep.equal([instance]);
+  });
+
+  it('should refill eagerly', async () => {
+    const pool = createPool();
+    await clock.tickAsync(0);
+
+    await pool.acquire();
+    await clock.tickAsync(0);
+
+    expect(FakeInstance.launched).to.have.length(3);
+    expect(pool.idleCount).to.equal(2);
+  });
+
+  it('should refill on release', async () => {
+    const pool = createPool({refill: 'onRelease'});
+    await clock.tickAsync(0);
+
+    const instance = await pool.acquire();
+    await clock.tickAsync(0);
+    expect(FakeInstance.launched).to.have.length(2);
+    expect(pool.idleCount).to.equal(1);
+
+    await pool.release(instance);
+    await clock.tickAsync(0);
+    expect(instance.closed).to.be.true;
+    expect(FakeInstance.launched).to.have.length(3);
+    expect(pool.idleCount).to.equal(2);
+  });
+
+  it('should replace instances idle for too long', async () => {
+    const pool = createPool({size: 1, maxIdleAge: 1000});
+    await clock.tickAsync(0);
+    const [first] = FakeInstance.launched;
+
+    await clock.tickAsync(999);
+    expect(first!.closed).to.be.false;
+
+    await clock.tickAsync(1);
+    expect(first!.closed).to.be.true;
+    expect(FakeInstance.launched).to.have.length(2);
+    expect(pool.idleCount).to.equal(1);
+  });
+
+  it('should close idle instances', async () => {
+    const pool = createPool();
+    await clock.tickAsync(0);
+
+    await pool.close();
+
+    expect(FakeInstance.launched.every((i) => i.closed)).to.be.true;
+    expect(pool.idleCount).to.equal(0);
+    await expect(pool.acquire()).to.be.eventually.rejectedWith(
+      'Browser pool is closed'
+    );
+  });
+});
@@ -0,0 +1,162 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import debug from 'debug';
+
+const debugInternal = debug('bidi:server:internal');
+
+/**
+ * When idle instances are launched to replace the acquired ones:
+ * - `eager`: as soon as an instance is acquired, so that the pool is always
+ *   full.
+ * - `onRelease`: when an acquired instance is released, so that the number of
+ *   running instances does not exceed the pool size unless there are more
+ *   concurrent sessions than that.
+ */
+export type RefillPolicy = 'eager' | 'onRelease';
+
+export type BrowserPoolOptions = {
+  /** Number of idle instances to keep ready. */
+  size: number;
+  /**
+   * Time in milliseconds after which an idle instance is destroyed and
+   * replaced. 0 means idle instances are kept forever.
+   */
+  maxIdleAge: number;
+  refill: RefillPolicy;
+};
+
+export interface PooledInstance {
+  close(): Promise<void>;
+}
+
+type IdleEntry<T> = {
+  instance: T;
+  idleTimeout: ReturnType<typeof setTimeout> | null;
+};
+
+/**
+ * Keeps a number of pre-launched instances (e.g. browsers with an
+ * initialized Mapper), so that a new session does not have to wait for the
+ * launch. Instances are not reused across sessions: a released instance is
+ * closed, as the browser state cannot be reliably reset.
+ */
+export class BrowserPool<T extends PooledInstance> {
+  readonly #launch: () => Promise<T>;
+  readonly #options: BrowserPoolOptions;
+
+  #idle: IdleEntry<T>[] = [];
+  #launching = 0;
+  #closed = false;
+
+  constructor(launch: () => Promise<T>, options: BrowserPoolOptions) {
+    this.#launch = launch;
+    this.#options = options;
+    this.#refill();
+  }
+
+  get idleCount(): number {
+    return this.#idle.length;
+  }
+
+  /**
+   * Returns an idle instance if there is one, otherwise launches a new one.
+   */
+  async acquire(): Promise<T> {
+    if (this.#closed) {
+      throw new Error('Browser pool is closed');
+    }
+
+    const entry = this.#idle.shift();
+    if (this.#options.refill === 'eager') {
+      this.#refill();
+    }
+    if (entry === undefined) {
+      debugInternal('Browser pool is empty, launching a new instance');
+      return this.#launch();
+    }
+    if (entry.idleTimeout !== null) {
+      clearTimeout(entry.idleTimeout);
+    }
+    return entry.instance;
+  }
+
+  /**
+   * Closes the instance previously returned by `acquire`.
+   */
+  async release(instance: T): Promise<void> {
+    try {
+      await instance.close();
+    } finally {
+      if (this.#options.refill === 'onRelease') {
+        this.#refill();
+      }
+    }
+  }
+
+  async close(): Promise<void> {
+    this.#closed = true;
+    const idle = this.#idle;
+    this.#idle = [];
+    await Promise.all(
+      idle.map(({instance, idleTimeout}) => {
+        if (idleTimeout !== null) {
+          clearTimeout(idleTimeout);
+        }
+        return instance.close();
+      })
+    );
+  }
+
+  #refill() {
+    while (
+      !this.#closed &&
+      this.#idle.length + this.#launching < this.#options.size
+    ) {
+      this.#launching++;
+      this.#launch().then(
+        (instance) => {
+          this.#launching--;
+          this.#addIdle(instance);
+        },
+        (error) => {
+          // Not retrying to avoid a busy loop if the launch is broken. The
+          // pool is refilled on the next acquisition or release.
+          this.#launching--;
+          debugInternal('Failed to launch a pooled instance', error);
+        }
+      );
+    }
+  }
+
+  #addIdle(instance: T) {
+    if (this.#closed) {
+      void instance.close();
+      return;
+    }
+
+    const entry: IdleEntry<T> = {instance, idleTimeout: null};
+    if (this.#options.maxIdleAge > 0) {
+      entry.idleTimeout = setTimeout(() => {
+        this.#idle = this.#idle.filter((e) => e !== entry);
+        void instance.close();
+        this.#refill();
+      }, this.#options.maxIdleAge);
+    }
+    this.#idle.push(entry);
+  }
+}
@@ -31,13 +31,24 @@ import {
 import type {ITransport} from '../utils/transport.js';
 
 import {BidiServerRunner, debugInfo} from './bidiServerRunner.js';
-import {MapperServer} from './mapperServer.js';
+import {BrowserPool, type RefillPolicy} from './browserPool.js';
+import {MapperServer, type ResponseBatching} from './mapperServer.js';
 import mapperReader from './mapperReader.js';
 
 function parseArguments(): {
   channel: ChromeReleaseChannel;
+  deferBinaryData: boolean;
   headless: string;
+  maxHandlesPerRealm: number;
+  maxQueuedSessions: number;
+  maxSessions: number;
+  poolMaxIdleAge: number;
+  poolRefill: RefillPolicy;
+  poolSize: number;
   port: number;
+  responseBatchLatency: number;
+  responseBatchSize: number;
+  sessionQueueTimeout: number;
   verbose: boolean;
 } {
   const parser = new argparse.ArgumentParser({
@@ -53,6 +64,15 @@ function parseArguments(): {
     default: ChromeReleaseChannel.DEV,
   });
 
+  parser.add_argument('--defer-binary-data', {
+    dest: 'deferBinaryData',
+    help:
+      'If present, the server fetches the screenshot and PDF data instead of ' +
+      'the Mapper, so that the data is encoded only once.',
+    action: 'store_true',
+    default: process.env['DEFER_BINARY_DATA'] === 'true',
+  });
+
   parser.add_argument('--headless', {
     help: 'Sets if browser should run in headless or headful mode. Default is true.',
     default: true,
@@ -64,6 +84,92 @@ function parseArguments(): {
     default: process.env['PORT'] ?? 8080,
   });
 
+  parser.add_argument('--max-handles-per-realm', {
+    dest: 'maxHandlesPerRealm',
+    help:
+      'Maximum number of handles retained per realm. Once exceeded, the ' +
+      'least recently used handles are disowned. Default is 0, meaning ' +
+      'unlimited.',
+    type: 'int',
+    default: process.env['MAX_HANDLES_PER_REALM'] ?? 0,
+  });
+
+  parser.add_argument('--max-sessions', {
+    dest: 'maxSessions',
+    help:
+      'Maximum number of concurrent sessions. Requests for new sessions ' +
+      'over the limit wait for a session to end. Default is 0, meaning ' +
+      'unlimited.',
+    type: 'int',
+    default: 0,
+  });
+
+  parser.add_argument('--max-queued-sessions', {
+    dest: 'maxQueuedSessions',
+    help:
+      'Maximum number of requests for new sessions waiting for a session ' +
+      'to end. Further requests are rejected. Default is 0, meaning ' +
+      'unlimited.',
+    type: 'int',
+    default: 0,
+  });
+
+  parser.add_argument('--session-queue-timeout', {
+    dest: 'sessionQueueTimeout',
+    help:
+      'Time in milliseconds a request for a new session waits for a ' +
+      'session to end, before it is rejected with the `session not created` ' +
+      'error. Default is 0, meaning unlimited.',
+    type: 'int',
+    default: 0,
+  });
+
+  parser.add_argument('--pool-size', {
+    dest: 'poolSize',
+    help:
+      'Number of browsers launched in advance, so that new connections do ' +
+      'not wait for the browser launch. Default is 0.',
+    type: 'int',
+    default: 0,
+  });
+
+  parser.add_argument('--pool-max-idle-age', {
+    dest: 'poolMaxIdleAge',
+    help:
+      'Time in milliseconds after which an unused pre-launched browser is ' +
+      'replaced. Default is 0, meaning never.',
+    type: 'int',
+    default: 0,
+  });
+
+  parser.add_argument('--pool-refill', {
+    dest: 'poolRefill',
+    help:
+      'When pre-launched browsers are replaced: as soon as one is taken ' +
+      '(`eager`) or when its connection is closed (`onRelease`). Default is ' +
+      '`eager`.',
+    choices: ['eager', 'onRelease'],
+    default: 'eager',
+  });
+
+  parser.add_argument('--response-batch-size', {
+    dest: 'responseBatchSize',
+    help:
+      'If greater than 1, the Mapper sends up to the given number of ' +
+      'messages to the server at once. Default is 1.',
+    type: 'int',
+    default: 1,
+  });
+
+  parser.add_argument('--response-batch-latency', {
+    dest: 'responseBatchLatency',
+    help:
+      'Maximum time in milliseconds a message waits for its batch to be ' +
+      'sent, if response batching is enabled. Default is 0.',
+    type: 'int',
+    default: 0,
+  });
+
   parser.add_argument('-v', '--verbose', {
     help: 'If present, the Mapper debug log, including CDP commands and events will be logged into the server output.',
     action: 'store_true',
@@ -79,11 +185,39 @@ function parseArguments(): {
     const {channel, port} = args;
     const headless = args.headless !== 'false';
     const verbose = args.verbose === true;
+    const responseBatching: ResponseBatching | undefined =
+      args.responseBatchSize > 1
+        ? {
+            maxSize: args.responseBatchSize,
+            maxLatency: args.responseBatchLatency,
+          }
+        : undefined;
 
     debugInfo('Launching BiDi server...');
 
-    new BidiServerRunner().run(port, (bidiServer) => {
-      return onNewBidiConnectionOpen(channel, headless, bidiServer, verbose);
+    const browserPool = new BrowserPool(
+      () =>
+        launchBrowser(
+          channel,
+          headless,
+          verbose,
+          responseBatching,
+          args.maxHandlesPerRealm,
+          args.deferBinaryData
+        ),
+      {
+        size: args.poolSize,
+        maxIdleAge: args.poolMaxIdleAge,
+        refill: args.poolRefill,
+      }
+    );
+
+    new BidiServerRunner({
+      maxSessions: args.maxSessions,
+      maxQueuedSessions: args.maxQueuedSessions,
+      queueTimeout: args.sessionQueueTimeout,
+    }).run(port, (bidiServer) => {
+      return onNewBidiConnectionOpen(browserPool, bidiServer);
     });
     debugInfo('BiDi server launched');
   } catch (e) {
@@ -91,21 +225,27 @@ function parseArguments(): {
   }
 })();
 
+type BrowserInstance = {
+  mapperServer: MapperServer;
+  close(): Promise<void>;
+};
+
+let bidiMapperScriptPromise: Promise<string> | undefined;
+
 /**
- * On each new BiDi connection:
+ * Launches a browser ready to serve a BiDi connection:
  * 1. Launch Chromium (using Puppeteer for now).
  * 2. Get `BiDi-CDP` mapper JS binaries using `mapperReader`.
  * 3. Run `BiDi-CDP` mapper in launched browser.
- * 4. Bind `BiDi-CDP` mapper to the `BiDi server`.
- *
- * @return delegate to be called when the connection is closed
  */
-async function onNewBidiConnectionOpen(
+async function launchBrowser(
   channel: ChromeReleaseChannel,
   headless: boolean,
-  bidiTransport: ITransport,
-  verbose: boolean
-) {
+  verbose: boolean,
+  responseBatching?: ResponseBatching,
+  maxHandlesPerRealm?: number,
+  deferBinaryData?: boolean
+): Promise<BrowserInstance> {
   // 1. Launch the browser using @puppeteer/browsers.
   const profileDir = await mkdtemp(
     path.join(os.tmpdir(), 'web-driver-bidi-server-')
@@ -123,7 +263,8 @@ async function onNewBidiConnectionOpen(
     '--no-default-browser-check',
     '--no-first-run',
     '--password-store=basic',
-    '--remote-debugging-port=9222',
+    // Several browsers can be running at once, so let each pick a free port.
+    '--remote-debugging-port=0',
     '--use-mock-keychain',
     `--user-data-dir=${profileDir}`,
     // keep-sorted end
@@ -146,21 +287,58 @@ async function onNewBidiConnectionOpen(
     args: chromeArguments,
   });
 
-  const wsEndpoint = await browser.waitForLineOutput(
-    CDP_WEBSOCKET_ENDPOINT_REGEX
-  );
+  try {
+    const wsEndpoint = await browser.waitForLineOutput(
+      CDP_WEBSOCKET_ENDPOINT_REGEX
+    );
 
-  // 2. Get `BiDi-CDP` mapper JS binaries using `mapperReader`.
-  const bidiMapperScript = await mapperReader();
+    // 2. Get `BiDi-CDP` mapper JS binaries using `mapperReader`. The bundle
+    // does not change while the server is running, so it is read only once.
+    bidiMapperScriptPromise ??= mapperReader();
+    const bidiMapperScript = await bidiMapperScriptPromise;
 
-  // 3. Run `BiDi-CDP` mapper in launched browser.
-  const mapperServer = await MapperServer.create(
-    wsEndpoint,
-    bidiMapperScript,
-    verbose
-  );
+    // 3. Run `BiDi-CDP` mapper in launched browser.
+    const mapperServer = await MapperServer.create(
+      wsEndpoint,
+      bidiMapperScript,
+      verbose,
+      responseBatching,
+      maxHandlesPerRealm,
+      deferBinaryData
+    );
 
-  // 4. Bind `BiDi-CDP` mapper to the `BiDi server`.
+    return {
+      mapperServer,
+      close: async () => {
+        // Close the mapper server.
+        mapperServer.close();
+
+        // Close browser.
+        await browser.close();
+      },
+    };
+  } catch (e) {
+    await browser.close();
+    throw e;
+  }
+}
+
+/**
+ * On each new BiDi connection:
+ * 1. Take a browser with a running `BiDi-CDP` mapper from the pool.
+ * 2. Bind `BiDi-CDP` mapper to the `BiDi server`.
+ *
+ * @return delegate to be called when the connection is closed
+ */
+async function onNewBidiConnectionOpen(
+  browserPool: BrowserPool<BrowserInstance>,
+  bidiTransport: ITransport
+) {
+  // 1. Take a browser with a running `BiDi-CDP` mapper from the pool.
+  const browserInstance = await browserPool.acquire();
+  const {mapperServer} = browserInstance;
+
+  // 2. Bind `BiDi-CDP` mapper to the `BiDi server`.
   // Forward messages from BiDi Mapper to the client.
   mapperServer.setOnMessage(async (message) => {
     await bidiTransport.sendMessage(message);
@@ -173,10 +351,7 @@ async function onNewBidiConnectionOpen(
 
   // Return delegate to be called when the connection is closed.
   return async () => {
-    // Close the mapper server.
-    mapperServer.close();
-
-    // Close browser.
-    await browser.close();
+    // Close the mapper server and the browser.
+    await browserPool.release(browserInstance);
   };
 }
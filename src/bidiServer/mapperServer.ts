@@ -21,6 +21,11 @@ import debug from 'debug';
 
 import {CdpConnection} from '../cdp/cdpConnection.js';
 import type {CdpClient} from '../cdp/cdpClient.js';
+import {
+  ErrorCode,
+  type ErrorResponse,
+  type Goog,
+} from '../protocol/protocol.js';
 import {LogType} from '../utils/log.js';
 import {WebSocketTransport} from '../utils/websocketTransport.js';
 
@@ -29,25 +34,83 @@ const debugInfo = debug('bidi:mapper:info');
 const debugMapperDebugOthers = debug('bidi:mapper:debug:others');
 const debugMapperDebugPrefix = 'bidi:mapper:debug:';
 
+const DEFERRED_DATA_KEY = 'goog:deferredData';
+/** Commands whose data the Mapper leaves to the server. */
+const DEFERRING_METHODS = [
+  'browsingContext.captureScreenshot',
+  'browsingContext.print',
+];
+/**
+ * Time in milliseconds after which the client messages held for a command
+ * with deferred data are sent, even if the command has not been responded to.
+ */
+const HELD_MESSAGES_TIMEOUT = 30_000;
+
+/**
+ * If set, the Mapper coalesces outgoing messages into batches of up to
+ * `maxSize` messages, each message waiting at most `maxLatency` milliseconds
+ * for its batch to be sent.
+ */
+export type ResponseBatching = {
+  maxSize: number;
+  maxLatency: number;
+};
+
 export class MapperServer {
   #handlers: ((message: string) => void)[] = [];
 
   #cdpConnection: CdpConnection;
   #mapperCdpClient: CdpClient;
+  // Remote handle of the function delivering messages to the Mapper.
+  #dispatcherObjectId: Protocol.Runtime.RemoteObjectId;
+
+  // Messages waiting to be delivered to the Mapper with the next flush.
+  #pendingMessages: string[] = [];
+  #flushPromise: Promise<void> | null = null;
+
+  // Messages from the Mapper waiting for their deferred data, or for the
+  // preceding messages to be sent.
+  #queuedResponseCount = 0;
+  #responseQueue = Promise.resolve();
+  // Client messages held until the deferred data of the preceding commands is
+  // fetched, so that they cannot change the page before it is captured.
+  #heldMessages: string[] = [];
+  // Maps the commands with deferred data the held messages wait for, keyed by
+  // id and channel, to their timeouts.
+  #deferringCommands = new Map<string, ReturnType<typeof setTimeout>>();
+  #deferBinaryData: boolean;
+  // Sessions of this connection, used to fetch deferred data.
+  #targetSessions = new Map<
+    Protocol.Target.TargetID,
+    Promise<Protocol.Target.SessionID>
+  >();
 
   static async create(
     cdpUrl: string,
     mapperContent: string,
-    verbose: boolean
+    verbose: boolean,
+    responseBatching?: ResponseBatching,
+    maxHandlesPerRealm?: number,
+    deferBinaryData = false
   ): Promise<MapperServer> {
     const cdpConnection = await this.#establishCdpConnection(cdpUrl);
     try {
       const mapperCdpClient = await this.#initMapper(
         cdpConnection,
         mapperContent,
-        verbose
+        verbose,
+        responseBatching,
+        maxHandlesPerRealm,
+        deferBinaryData
+      );
+      const dispatcherObjectId =
+        await this.#createDispatcher(mapperCdpClient);
+      return new MapperServer(
+        cdpConnection,
+        mapperCdpClient,
+        dispatcherObjectId,
+        deferBinaryData
       );
-      return new MapperServer(cdpConnection, mapperCdpClient);
     } catch (e) {
       cdpConnection.close();
       throw e;
@@ -56,11 +119,18 @@ export class MapperServer {
 
   private constructor(
     cdpConnection: CdpConnection,
-    mapperCdpClient: CdpClient
+    mapperCdpClient: CdpClient,
+    dispatcherObjectId: Protocol.Runtime.RemoteObjectId,
+    deferBinaryData: boolean
   ) {
     this.#cdpConnection = cdpConnection;
     this.#mapperCdpClient = mapperCdpClient;
+    this.#dispatcherObjectId = dispatcherObjectId;
+    this.#deferBinaryData = deferBinaryData;
 
+    this.#cdpConnection
+      .browserClient()
+      .on('Target.detachedFromTarget', this.#onDetachedFromTarget);
     this.#mapperCdpClient.on('Runtime.bindingCalled', this.#onBindingCalled);
     this.#mapperCdpClient.on(
       'Runtime.consoleAPICalled',
@@ -77,14 +147,124 @@ export class MapperServer {
     this.#handlers.push(handler);
   }
 
+  /**
+   * Queues the message for the Mapper. Messages queued within the same event
+   * loop iteration are delivered together, in order, with a single CDP call.
+   * Messages following a command with deferred data are held until the data
+   * is fetched, or for at most `HELD_MESSAGES_TIMEOUT`.
+   */
   sendMessage(messageJson: string): Promise<void> {
-    return this.#sendBidiMessage(messageJson);
+    if (this.#deferringCommands.size > 0) {
+      this.#heldMessages.push(messageJson);
+      return Promise.resolve();
+    }
+    const commandKey = this.#deferBinaryData
+      ? MapperServer.#getDeferringCommandKey(messageJson)
+      : undefined;
+    if (commandKey !== undefined) {
+      this.#deferringCommands.set(
+        commandKey,
+        setTimeout(() => {
+          debugInternal('No response to the command with deferred data');
+          this.#releaseHeldMessages(commandKey);
+        }, HELD_MESSAGES_TIMEOUT)
+      );
+    }
+    this.#pendingMessages.push(messageJson);
+    this.#flushPromise ??= new Promise<void>((resolve) =>
+      setImmediate(resolve)
+    ).then(() => this.#flush());
+    return this.#flushPromise;
   }
 
   close() {
+    for (const timeout of this.#deferringCommands.values()) {
+      clearTimeout(timeout);
+    }
+    this.#deferringCommands.clear();
+    this.#heldMessages = [];
     this.#cdpConnection.close();
   }
 
+  static #getCommandKey(id: number, channel: unknown): string {
+    return `${id}:${typeof channel === 'string' ? channel : ''}`;
+  }
+
+  /**
+   * Returns the key of the command, if the Mapper can leave its data to the
+   * server.
+   */
+  static #getDeferringCommandKey(messageJson: string): string | undefined {
+    // Cheap check to avoid parsing each message.
+    if (!DEFERRING_METHODS.some((method) => messageJson.includes(method))) {
+      return undefined;
+    }
+    try {
+      const command = JSON.parse(messageJson) as {
+        id?: unknown;
+        method?: unknown;
+        channel?: unknown;
+      };
+      if (
+        typeof command.id !== 'number' ||
+        !DEFERRING_METHODS.includes(command.method as string)
+      ) {
+        return undefined;
+      }
+      return MapperServer.#getCommandKey(command.id, command.channel);
+    } catch {
+      // The Mapper responds with an error without the id.
+      return undefined;
+    }
+  }
+
+  /**
+   * Returns the key of the command with deferred data the message responds to,
+   * if any.
+   */
+  #getRespondedCommandKey(bidiMessage: string): string | undefined {
+    let response: {id?: unknown; channel?: unknown; type?: unknown};
+    try {
+      response = JSON.parse(bidiMessage);
+    } catch {
+      return undefined;
+    }
+    if (typeof response.id !== 'number') {
+      return undefined;
+    }
+    const key = MapperServer.#getCommandKey(response.id, response.channel);
+    if (this.#deferringCommands.has(key)) {
+      return key;
+    }
+    if (response.type === 'error' && response.channel === undefined) {
+      // The Mapper may fail the command before reading its channel.
+      const prefix = `${response.id}:`;
+      return [...this.#deferringCommands.keys()].find((commandKey) =>
+        commandKey.startsWith(prefix)
+      );
+    }
+    return undefined;
+  }
+
+  /**
+   * Sends the held messages once all the commands with deferred data are
+   * responded to, or have timed out.
+   */
+  #releaseHeldMessages(commandKey: string) {
+    clearTimeout(this.#deferringCommands.get(commandKey));
+    if (
+      !this.#deferringCommands.delete(commandKey) ||
+      this.#deferringCommands.size > 0
+    ) {
+      return;
+    }
+    const heldMessages = this.#heldMessages;
+    this.#heldMessages = [];
+    for (const message of heldMessages) {
+      void this.sendMessage(message);
+    }
+  }
+
   static #establishCdpConnection(cdpUrl: string): Promise<CdpConnection> {
     return new Promise((resolve, reject) => {
       debugInternal('Establishing session with cdpUrl: ', cdpUrl);
@@ -103,24 +283,153 @@ export class MapperServer {
     });
   }
 
-  async #sendBidiMessage(bidiMessageJson: string): Promise<void> {
+  async #flush(): Promise<void> {
+    const messages = this.#pendingMessages;
+    this.#pendingMessages = [];
+    this.#flushPromise = null;
+
     try {
-      await this.#mapperCdpClient.sendCommand('Runtime.evaluate', {
-        expression: `onBidiMessage(${JSON.stringify(bidiMessageJson)})`,
+      // The messages are passed as a by-value argument, so they are encoded
+      // only once as part of the CDP message, and the function declaration is
+      // constant, so V8 serves it from the compilation cache.
+      await this.#mapperCdpClient.sendCommand('Runtime.callFunctionOn', {
+        functionDeclaration: String(
+          (dispatch: (messages: string[]) => void, messages: string[]) =>
+            dispatch(messages)
+        ),
+        objectId: this.#dispatcherObjectId,
+        arguments: [{objectId: this.#dispatcherObjectId}, {value: messages}],
       });
     } catch (error) {
       debugInternal('Call to onBidiMessage failed', error);
+      if (this.#deferringCommands.size > 0) {
+        // The commands will not be responded to, so stop holding the messages.
+        for (const message of messages) {
+          const commandKey = MapperServer.#getDeferringCommandKey(message);
+          if (commandKey !== undefined) {
+            this.#releaseHeldMessages(commandKey);
+          }
+        }
+      }
     }
   }
 
   #onBidiMessage(bidiMessage: string): void {
+    // Cheap check to avoid parsing each message. A false positive only costs
+    // a parse.
+    if (
+      this.#queuedResponseCount === 0 &&
+      !bidiMessage.includes(`"${DEFERRED_DATA_KEY}"`)
+    ) {
+      this.#dispatchBidiMessage(bidiMessage);
+      return;
+    }
+
+    // Messages are queued to keep their order while deferred data is fetched.
+    this.#queuedResponseCount++;
+    this.#responseQueue = this.#responseQueue
+      .then(() => this.#resolveDeferredData(bidiMessage))
+      .then((message) => {
+        this.#queuedResponseCount--;
+        this.#dispatchBidiMessage(message);
+      });
+  }
+
+  #dispatchBidiMessage(bidiMessage: string): void {
     for (const handler of this.#handlers) handler(bidiMessage);
+    if (this.#deferringCommands.size > 0) {
+      const commandKey = this.#getRespondedCommandKey(bidiMessage);
+      if (commandKey !== undefined) {
+        this.#releaseHeldMessages(commandKey);
+      }
+    }
+  }
+
+  /**
+   * Fetches the data the Mapper left to the server, so that the payload is
+   * encoded only once on its way to the client.
+   */
+  async #resolveDeferredData(bidiMessage: string): Promise<string> {
+    const message = JSON.parse(bidiMessage) as {
+      id: number;
+      channel?: string;
+      result?: Partial<Goog.DeferredDataResult> & {data?: string};
+    };
+    const deferredData = message.result?.[DEFERRED_DATA_KEY];
+    if (message.result === undefined || deferredData === undefined) {
+      return bidiMessage;
+    }
+    delete message.result[DEFERRED_DATA_KEY];
+
+    try {
+      const sessionId = await this.#getTargetSession(deferredData.targetId);
+      const cdpClient = this.#cdpConnection.getCdpClient(sessionId);
+      const {data} =
+        deferredData.method === 'Page.printToPDF'
+          ? await cdpClient.sendCommand('Page.printToPDF', deferredData.params)
+          : await cdpClient.sendCommand(
+              'Page.captureScreenshot',
+              deferredData.params
+            );
+      message.result.data = data;
+      return JSON.stringify(message);
+    } catch (error) {
+      debugInternal('Could not fetch deferred data', error);
+      const errorMessage = (error as Error).message;
+      const errorResponse: ErrorResponse & {channel?: string} = {
+        type: 'error',
+        id: message.id,
+        // Effectively zero dimensions.
+        error:
+          errorMessage === 'invalid print parameters: content area is empty'
+            ? ErrorCode.UnsupportedOperation
+            : ErrorCode.UnknownError,
+        message: errorMessage,
+      };
+      if (message.channel !== undefined) {
+        errorResponse.channel = message.channel;
+      }
+      return JSON.stringify(errorResponse);
+    }
+  }
+
+  #getTargetSession(
+    targetId: Protocol.Target.TargetID
+  ): Promise<Protocol.Target.SessionID> {
+    let sessionPromise = this.#targetSessions.get(targetId);
+    if (sessionPromise === undefined) {
+      sessionPromise = this.#cdpConnection
+        .browserClient()
+        .sendCommand('Target.attachToTarget', {targetId, flatten: true})
+        .then(({sessionId}) => sessionId);
+      sessionPromise.catch(() => this.#targetSessions.delete(targetId));
+      this.#targetSessions.set(targetId, sessionPromise);
+    }
+    return sessionPromise;
   }
 
+  #onDetachedFromTarget = (params: Protocol.Target.DetachedFromTargetEvent) => {
+    for (const [targetId, sessionPromise] of this.#targetSessions) {
+      void sessionPromise.then((sessionId) => {
+        if (
+          sessionId === params.sessionId &&
+          this.#targetSessions.get(targetId) === sessionPromise
+        ) {
+          this.#targetSessions.delete(targetId);
+        }
+      });
+    }
+  };
+
   #onBindingCalled = (params: Protocol.Runtime.BindingCalledEvent) => {
     if (params.name === 'sendBidiResponse') {
       this.#onBidiMessage(params.payload);
     }
+    if (params.name === 'sendBidiResponses') {
+      for (const message of params.payload.split('\n')) {
+        this.#onBidiMessage(message);
+      }
+    }
     if (params.name === 'sendDebugMessage') {
       this.#onDebugMessage(params.payload);
     }
@@ -169,10 +478,40 @@ export class MapperServer {
     debugInfo('exceptionThrown', params);
   };
 
+  /**
+   * Creates a function in the Mapper tab delivering an array of messages to
+   * `onBidiMessage`, and returns its remote handle. A message failing to be
+   * delivered is reported to the console, and does not prevent the following
+   * messages from being delivered.
+   */
+  static async #createDispatcher(
+    mapperCdpClient: CdpClient
+  ): Promise<Protocol.Runtime.RemoteObjectId> {
+    const {result} = await mapperCdpClient.sendCommand('Runtime.evaluate', {
+      expression: `(messages) => {
+        for (const message of messages) {
+          try {
+            onBidiMessage(message);
+          } catch (error) {
+            // Logged by the server on Runtime.consoleAPICalled.
+            console.error('Could not deliver BiDi message', String(error));
+          }
+        }
+      }`,
+    });
+    if (result.objectId === undefined) {
+      throw new Error('Could not create the Mapper message dispatcher');
+    }
+    return result.objectId;
+  }
+
   static async #initMapper(
     cdpConnection: CdpConnection,
     mapperContent: string,
-    verbose: boolean
+    verbose: boolean,
+    responseBatching?: ResponseBatching,
+    maxHandlesPerRealm?: number,
+    deferBinaryData = false
   ): Promise<CdpClient> {
     debugInternal('Connection opened.');
 
@@ -199,6 +538,12 @@ export class MapperServer {
       name: 'sendBidiResponse',
     });
 
+    if (responseBatching) {
+      await mapperCdpClient.sendCommand('Runtime.addBinding', {
+        name: 'sendBidiResponses',
+      });
+    }
+
     if (verbose) {
       // Needed to request verbose logs from Mapper.
       await mapperCdpClient.sendCommand('Runtime.addBinding', {
@@ -212,9 +557,9 @@ export class MapperServer {
         payload,
       }: Protocol.Runtime.BindingCalledEvent) => {
         // Needed to check when Mapper is launched on the frontend.
-        if (name === 'sendBidiResponse') {
+        if (name === 'sendBidiResponse' || name === 'sendBidiResponses') {
           try {
-            const parsed = JSON.parse(payload);
+            const parsed = JSON.parse(payload.split('\n')[0]!);
             if (parsed.launched) {
               mapperCdpClient.off('Runtime.bindingCalled', onBindingCalled);
               resolve();
@@ -232,6 +577,27 @@ export class MapperServer {
       expression: mapperContent,
     });
 
+    if (responseBatching) {
+      await mapperCdpClient.sendCommand('Runtime.evaluate', {
+        expression: `window.setResponseBatching(${JSON.stringify(
+          responseBatching
+        )})`,
+      });
+    }
+
+    if (maxHandlesPerRealm) {
+      await mapperCdpClient.sendCommand('Runtime.evaluate', {
+        expression: `window.setMaxHandlesPerRealm(${maxHandlesPerRealm})`,
+      });
+    }
+
+    if (deferBinaryData) {
+      // Let Mapper leave screenshot and PDF data to the server.
+      await mapperCdpClient.sendCommand('Runtime.evaluate', {
+        expression: 'window.setDeferBinaryData(true)',
+      });
+    }
+
     // Let Mapper know what is it's TargetId to filter out related targets.
     await mapperCdpClient.sendCommand('Runtime.evaluate', {
       expression: `window.setSelfTargetId(${JSON.stringify(targetId)})`,
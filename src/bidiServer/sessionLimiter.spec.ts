@@ -0,0 +1,121 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import {expect} from 'chai';
+import * as sinon from 'sinon';
+
+import {SessionLimiter} from './sessionLimiter.js';
+
+describe('SessionLimiter', () => {
+  it('should not limit sessions if maxSessions is 0', async () => {
+    const limiter = new SessionLimiter({
+      maxSessions: 0,
+      maxQueuedSessions: 0,
+      queueTimeout: 0,
+    });
+
+    for (let i = 0; i < 100; i++) {
+      expect(await limiter.acquire()).to.be.true;
+    }
+    expect(limiter.activeCount).to.equal(100);
+  });
+
+  it('should queue sessions over the limit', async () => {
+    const limiter = new SessionLimiter({
+      maxSessions: 1,
+      maxQueuedSessions: 2,
+      queueTimeout: 0,
+    });
+    expect(await limiter.acquire()).to.be.true;
+
+    const order: number[] = [];
+    const second = limiter.acquire().then(() => order.push(2));
+    const third = limiter.acquire().then(() => order.push(3));
+    expect(limiter.queuedCount).to.equal(2);
+
+    limiter.release();
+    await second;
+    expect(order).to.deep.equal([2]);
+    expect(limiter.activeCount).to.equal(1);
+
+    limiter.release();
+    await third;
+    expect(order).to.deep.equal([2, 3]);
+    expect(limiter.activeCount).to.equal(1);
+
+    limiter.release();
+    expect(limiter.activeCount).to.equal(0);
+  });
+
+  it('should reject sessions if the queue is full', async () => {
+    const limiter = new SessionLimiter({
+      maxSessions: 1,
+      maxQueuedSessions: 1,
+      queueTimeout: 0,
+    });
+    expect(await limiter.acquire()).to.be.true;
+    void limiter.acquire();
+
+    expect(await limiter.acquire()).to.be.false;
+    expect(limiter.queuedCount).to.equal(1);
+  });
+
+  describe('with queue timeout', () => {
+    let clock: sinon.SinonFakeTimers;
+
+    beforeEach(() => {
+      clock = sinon.useFakeTimers();
+    });
+
+    afterEach(() => {
+      clock.restore();
+    });
+
+    it('should reject sessions not acquired in time', async () => {
+      const limiter = new SessionLimiter({
+        maxSessions: 1,
+        maxQueuedSessions: 0,
+        queueTimeout: 1000,
+      });
+      expect(await limiter.acquire()).to.be.true;
+      const second = limiter.acquire();
+
+      await clock.tickAsync(1000);
+      expect(await second).to.be.false;
+      expect(limiter.queuedCount).to.equal(0);
+
+      limiter.release();
+      expect(limiter.activeCount).to.equal(0);
+    });
+
+    it('should not reject sessions acquired in time', async () => {
+      const limiter = new SessionLimiter({
+        maxSessions: 1,
+        maxQueuedSessions: 0,
+        queueTimeout: 1000,
+      });
+      expect(await limiter.acquire()).to.be.true;
+      const second = limiter.acquire();
+
+      await clock.tickAsync(500);
+      limiter.release();
+      await clock.tickAsync(1000);
+      expect(await second).to.be.true;
+      expect(limiter.activeCount).to.equal(1);
+    });
+  });
+});
@@ -0,0 +1,101 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+export type SessionLimits = {
+  /** Maximum number of concurrent sessions. 0 means unlimited. */
+  maxSessions: number;
+  /**
+   * Maximum number of new session requests waiting for a free slot once
+   * `maxSessions` is reached. Further requests are rejected. 0 means
+   * unlimited.
+   */
+  maxQueuedSessions: number;
+  /**
+   * Time in milliseconds a queued request waits for a free slot before it is
+   * rejected. 0 means unlimited.
+   */
+  queueTimeout: number;
+};
+
+type WaitingRequest = {
+  resolve: (acquired: boolean) => void;
+  timeout?: ReturnType<typeof setTimeout>;
+};
+
+/**
+ * Limits the number of concurrent sessions. Requests over the limit wait in
+ * FIFO order for a session to end.
+ */
+export class SessionLimiter {
+  readonly #limits: SessionLimits;
+  #activeCount = 0;
+  #waiting: WaitingRequest[] = [];
+
+  constructor(limits: SessionLimits) {
+    this.#limits = limits;
+  }
+
+  get activeCount(): number {
+    return this.#activeCount;
+  }
+
+  get queuedCount(): number {
+    return this.#waiting.length;
+  }
+
+  /**
+   * Resolves to `true` once a session slot is taken, or to `false` if the
+   * request is rejected because the queue is full or no slot was freed in
+   * time. A taken slot must be freed with `release`.
+   */
+  acquire(): Promise<boolean> {
+    if (
+      this.#limits.maxSessions === 0 ||
+      this.#activeCount < this.#limits.maxSessions
+    ) {
+      this.#activeCount++;
+      return Promise.resolve(true);
+    }
+    if (
+      this.#limits.maxQueuedSessions !== 0 &&
+      this.#waiting.length >= this.#limits.maxQueuedSessions
+    ) {
+      return Promise.resolve(false);
+    }
+    return new Promise((resolve) => {
+      const request: WaitingRequest = {resolve};
+      if (this.#limits.queueTimeout !== 0) {
+        request.timeout = setTimeout(() => {
+          this.#waiting = this.#waiting.filter((other) => other !== request);
+          resolve(false);
+        }, this.#limits.queueTimeout);
+      }
+      this.#waiting.push(request);
+    });
+  }
+
+  release() {
+    const next = this.#waiting.shift();
+    if (next === undefined) {
+      this.#activeCount--;
+    } else {
+      // The slot is handed over directly, so `#activeCount` is unchanged.
+      clearTimeout(next.timeout);
+      next.resolve(true);
+    }
+  }
+}
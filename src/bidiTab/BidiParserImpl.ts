@@ -19,6 +19,7 @@ import * as Parser from '../protocol-parser/protocol-parser.js';
 import type {
   BrowsingContext,
   Cdp,
+  Goog,
   Input,
   Script,
   Session,
@@ -32,7 +33,7 @@ export class BidiParserImpl implements BidiParser {
   }
   parseCaptureScreenshotParams(
     params: unknown
-  ): BrowsingContext.CaptureScreenshotParameters {
+  ): Goog.CaptureScreenshotParameters {
     return Parser.BrowsingContext.parseCaptureScreenshotParams(params);
   }
   parseCloseParams(params: unknown): BrowsingContext.CloseParameters {
@@ -75,6 +76,35 @@ export class BidiParserImpl implements BidiParser {
   }
   // keep-sorted end
 
+  // Goog domain
+  // keep-sorted start block=yes
+  parseBatchParams(params: unknown): Goog.BatchParameters {
+    return Parser.Goog.parseBatchParams(params);
+  }
+  parseDisownGroupParams(params: unknown): Goog.ScriptDisownGroupParameters {
+    return Parser.Goog.parseDisownGroupParams(params);
+  }
+  parseIoCloseParams(params: unknown): Goog.IoCloseParameters {
+    return Parser.Goog.parseIoCloseParams(params);
+  }
+  parseIoReadParams(params: unknown): Goog.IoReadParameters {
+    return Parser.Goog.parseIoReadParams(params);
+  }
+  parsePrintToStreamParams(params: unknown): Goog.PrintToStreamParameters {
+    return Parser.Goog.parsePrintToStreamParams(params);
+  }
+  parseSetEventBufferingParams(
+    params: unknown
+  ): Goog.SessionSetEventBufferingParameters {
+    return Parser.Goog.parseSetEventBufferingParams(params);
+  }
+  parseSetPendingMessageLimitsParams(
+    params: unknown
+  ): Goog.SessionSetPendingMessageLimitsParameters {
+    return Parser.Goog.parseSetPendingMessageLimitsParams(params);
+  }
+  // keep-sorted end
+
   // Input domain
   // keep-sorted start block=yes
   parsePerformActionsParams(params: unknown): Input.PerformActionsParameters {
@@ -92,13 +122,13 @@ export class BidiParserImpl implements BidiParser {
   ): Script.AddPreloadScriptParameters {
     return Parser.Script.parseAddPreloadScriptParams(params);
   }
-  parseCallFunctionParams(params: unknown): Script.CallFunctionParameters {
+  parseCallFunctionParams(params: unknown): Goog.CallFunctionParameters {
     return Parser.Script.parseCallFunctionParams(params);
   }
   parseDisownParams(params: unknown): Script.DisownParameters {
     return Parser.Script.parseDisownParams(params);
   }
-  parseEvaluateParams(params: unknown): Script.EvaluateParameters {
+  parseEvaluateParams(params: unknown): Goog.EvaluateParameters {
     return Parser.Script.parseEvaluateParams(params);
   }
   parseGetRealmsParams(params: unknown): Script.GetRealmsParameters {
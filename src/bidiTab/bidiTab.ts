@@ -46,7 +46,11 @@ declare global {
     // `window.sendBidiResponse` is exposed by `Runtime.addBinding` from the server side.
     sendBidiResponse: (response: string) => void;
 
-    // `window.onBidiMessage` is called via `Runtime.evaluate` from the server side.
+    // `window.sendBidiResponses` is exposed by `Runtime.addBinding` from the server side
+    // if response batching is enabled. The responses are separated by '\n'.
+    sendBidiResponses?: (responses: string) => void;
+
+    // `window.onBidiMessage` is called via `Runtime.callFunctionOn` from the server side.
     onBidiMessage: ((message: string) => void) | null;
 
     // Set from the server side if verbose logging is required.
@@ -54,9 +58,44 @@ declare global {
 
     // `window.setSelfTargetId` is called via `Runtime.evaluate` from the server side.
     setSelfTargetId: (targetId: string) => void;
+
+    // `window.setResponseBatching` is called via `Runtime.evaluate` from the server side
+    // before `setSelfTargetId` if response batching is required.
+    setResponseBatching: (batching: ResponseBatching) => void;
+
+    // `window.setDeferBinaryData` is called via `Runtime.evaluate` from the server side
+    // before `setSelfTargetId` if the server fetches screenshot and PDF data itself.
+    setDeferBinaryData: (deferBinaryData: boolean) => void;
+
+    // `window.setMaxHandlesPerRealm` is called via `Runtime.evaluate` from the server side
+    // before `setSelfTargetId` to limit the handles retained per realm.
+    setMaxHandlesPerRealm: (maxHandlesPerRealm: number) => void;
   }
 }
 
+type ResponseBatching = {
+  // Maximum number of responses sent with one binding call.
+  maxSize: number;
+  // Maximum time in milliseconds a response waits for the batch to fill.
+  maxLatency: number;
+};
+
+let responseBatching: ResponseBatching | null = null;
+window.setResponseBatching = (batching) => {
+  log(LogType.debug, 'Response batching:', batching);
+  responseBatching = batching;
+};
+
+let deferBinaryData = false;
+window.setDeferBinaryData = (enabled) => {
+  deferBinaryData = enabled;
+};
+
+let maxHandlesPerRealm: number | undefined;
+window.setMaxHandlesPerRealm = (limit) => {
+  maxHandlesPerRealm = limit;
+};
+
 // Initiate `setSelfTargetId` as soon as possible to prevent race condition.
 const waitSelfTargetIdPromise = waitSelfTargetId();
 
@@ -112,7 +151,12 @@ function createBidiServer(selfTargetId: string) {
   class WindowBidiTransport implements BidiTransport {
     #onMessage: ((message: ChromiumBidi.Command) => void) | null = null;
 
-    constructor() {
+    #batching: ResponseBatching | null;
+    #pendingMessages: string[] = [];
+    #flushTimeout: ReturnType<typeof setTimeout> | null = null;
+
+    constructor(batching: ResponseBatching | null) {
+      this.#batching = batching;
       window.onBidiMessage = (messageStr: string) => {
         log(`${LogType.bidi}:RECV ◂`, messageStr);
         let messageObject: ChromiumBidi.Command;
@@ -138,15 +182,46 @@ function createBidiServer(selfTargetId: string) {
 
     sendMessage(message: ChromiumBidi.Message) {
       const messageStr = JSON.stringify(message);
-      window.sendBidiResponse(messageStr);
+      if (this.#batching === null) {
+        window.sendBidiResponse(messageStr);
+      } else {
+        this.#enqueueMessage(messageStr, this.#batching);
+      }
       log(`${LogType.bidi}:SEND ▸`, messageStr);
     }
 
     close() {
+      this.#flush();
       this.#onMessage = null;
       window.onBidiMessage = null;
     }
 
+    #enqueueMessage(messageStr: string, batching: ResponseBatching) {
+      this.#pendingMessages.push(messageStr);
+      if (this.#pendingMessages.length >= batching.maxSize) {
+        this.#flush();
+      } else if (this.#flushTimeout === null) {
+        this.#flushTimeout = setTimeout(
+          () => this.#flush(),
+          batching.maxLatency
+        );
+      }
+    }
+
+    #flush() {
+      if (this.#flushTimeout !== null) {
+        clearTimeout(this.#flushTimeout);
+        this.#flushTimeout = null;
+      }
+      if (this.#pendingMessages.length === 0) {
+        return;
+      }
+      // `JSON.stringify` escapes line breaks, so '\n' cannot appear inside of
+      // a serialized message.
+      window.sendBidiResponses!(this.#pendingMessages.join('\n'));
+      this.#pendingMessages = [];
+    }
+
     #respondWithError(
       plainCommandData: string,
       errorCode: ErrorCode,
@@ -257,11 +332,12 @@ function createBidiServer(selfTargetId: string) {
   }
 
   return BidiServer.createAndStart(
-    new WindowBidiTransport(),
+    new WindowBidiTransport(responseBatching),
     createCdpConnection(),
     selfTargetId,
     new BidiParserImpl(),
-    log
+    log,
+    {deferBinaryData, maxHandlesPerRealm}
   );
 }
 
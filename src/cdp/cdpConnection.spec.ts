@@ -154,6 +154,42 @@ describe('CdpConnection', () => {
     otherSessionCallback.resetHistory();
   });
 
+  it('counts commands, errors and events', async () => {
+    const mockCdpServer = new StubTransport();
+    const cdpConnection = new CdpConnection(mockCdpServer);
+
+    const browserClient = cdpConnection.browserClient();
+    const success = browserClient.sendCommand('Browser.getVersion');
+    const failure = browserClient.sendCommand('Browser.close');
+    void browserClient.sendCommand('Browser.crash');
+    expect(cdpConnection.metrics).to.include({
+      commands: 3,
+      errors: 0,
+      pending: 3,
+      events: 0,
+    });
+
+    await mockCdpServer.emulateIncomingMessage({id: 0, result: {}});
+    await mockCdpServer.emulateIncomingMessage({
+      id: 1,
+      error: {code: -32000, message: 'Some error'},
+    });
+    await mockCdpServer.emulateIncomingMessage({
+      method: 'Browser.downloadWillBegin',
+    });
+    await success;
+    await expect(failure).to.be.rejected;
+
+    const metrics = cdpConnection.metrics;
+    expect(metrics).to.include({
+      commands: 3,
+      errors: 1,
+      pending: 1,
+      events: 1,
+    });
+    expect(metrics.latency.count).to.equal(2);
+  });
+
   it('closes the transport connection when closed', () => {
     const mockCdpServer = new StubTransport();
     const cdpConnection = new CdpConnection(mockCdpServer);
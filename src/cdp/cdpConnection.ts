@@ -17,6 +17,7 @@
 import type {ProtocolMapping} from 'devtools-protocol/types/protocol-mapping.js';
 import type Protocol from 'devtools-protocol';
 
+import {Histogram} from '../utils/histogram.js';
 import type {ITransport} from '../utils/transport.js';
 import {LogType} from '../utils/log.js';
 import type {LoggerFn} from '../utils/log.js';
@@ -28,11 +29,27 @@ interface CdpCallbacks {
   resolve: (result: CdpMessage<any>['result']) => void;
   reject: (error: object) => void;
   error: Error;
+  sentAt: number;
 }
 
+export type CdpConnectionMetrics = {
+  /** Number of the sent commands. */
+  commands: number;
+  /** Number of the commands which resulted in an error. */
+  errors: number;
+  /** Number of the commands waiting for a response. */
+  pending: number;
+  /** Number of the received events. */
+  events: number;
+  /** Round-trip times of the commands in milliseconds. */
+  latency: Histogram;
+};
+
 export interface ICdpConnection {
   browserClient(): ICdpClient;
   getCdpClient(sessionId: Protocol.Target.SessionID): ICdpClient;
+  /** Traffic counters, if the connection maintains them. */
+  readonly metrics?: Readonly<CdpConnectionMetrics>;
 }
 
 /**
@@ -48,6 +65,12 @@ export class CdpConnection implements ICdpConnection {
   readonly #sessionCdpClients = new Map<Protocol.Target.SessionID, CdpClient>();
   readonly #commandCallbacks = new Map<number, CdpCallbacks>();
   readonly #logger?: LoggerFn;
+  readonly #metrics: Omit<CdpConnectionMetrics, 'pending'> = {
+    commands: 0,
+    errors: 0,
+    events: 0,
+    latency: new Histogram(),
+  };
   #nextId = 0;
 
   constructor(transport: ITransport, logger?: LoggerFn) {
@@ -67,6 +90,10 @@ export class CdpConnection implements ICdpConnection {
     this.#sessionCdpClients.clear();
   }
 
+  get metrics(): Readonly<CdpConnectionMetrics> {
+    return {...this.#metrics, pending: this.#commandCallbacks.size};
+  }
+
   /** The CdpClient object attached to the root browser session. */
   browserClient(): CdpClient {
     return this.#browserCdpClient;
@@ -99,7 +126,9 @@ export class CdpConnection implements ICdpConnection {
             sessionId ?? ''
           } call rejected because the connection has been closed.`
         ),
+        sentAt: performance.now(),
       });
+      this.#metrics.commands++;
       const cdpMessage: CdpMessage<CdpMethod> = {id, method, params};
       if (sessionId) {
         cdpMessage.sessionId = sessionId;
@@ -134,13 +163,16 @@ export class CdpConnection implements ICdpConnection {
       const callbacks = this.#commandCallbacks.get(messageParsed.id);
       this.#commandCallbacks.delete(messageParsed.id);
       if (callbacks) {
+        this.#metrics.latency.record(performance.now() - callbacks.sentAt);
         if (messageParsed.result) {
           callbacks.resolve(messageParsed.result);
         } else if (messageParsed.error) {
+          this.#metrics.errors++;
           callbacks.reject(messageParsed.error);
         }
       }
     } else if (messageParsed.method) {
+      this.#metrics.events++;
       const client = messageParsed.sessionId
         ? this.#sessionCdpClients.get(messageParsed.sessionId)
         : this.#browserCdpClient;
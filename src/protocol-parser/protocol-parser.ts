@@ -53,11 +53,20 @@ export namespace Script {
     return parseObject(params, WebDriverBidi.Script.GetRealmsParametersSchema);
   }
 
-  export function parseEvaluateParams(params: unknown) {
+  const GoogObjectGroupParametersSchema = z.object({
+    'goog:objectGroup': z.string().optional(),
+  });
+
+  export function parseEvaluateParams(
+    params: unknown
+  ): Protocol.Goog.EvaluateParameters {
     return parseObject(
       params,
-      WebDriverBidi.Script.EvaluateParametersSchema
-    ) as Protocol.Script.EvaluateParameters;
+      z.intersection(
+        WebDriverBidi.Script.EvaluateParametersSchema,
+        GoogObjectGroupParametersSchema
+      )
+    ) as Protocol.Goog.EvaluateParameters;
   }
 
   export function parseDisownParams(
@@ -80,11 +89,16 @@ export namespace Script {
     );
   }
 
-  export function parseCallFunctionParams(params: unknown) {
+  export function parseCallFunctionParams(
+    params: unknown
+  ): Protocol.Goog.CallFunctionParameters {
     return parseObject(
       params,
-      WebDriverBidi.Script.CallFunctionParametersSchema
-    ) as Protocol.Script.CallFunctionParameters;
+      z.intersection(
+        WebDriverBidi.Script.CallFunctionParametersSchema,
+        GoogObjectGroupParametersSchema
+      )
+    ) as Protocol.Goog.CallFunctionParameters;
   }
 }
 
@@ -136,12 +150,26 @@ export namespace BrowsingContext {
     );
   }
 
+  // Vendor extensions of `browsingContext.captureScreenshot`.
+  const GoogCaptureScreenshotParametersSchema = z.object({
+    'goog:format': z
+      .object({
+        type: z.enum(['image/jpeg', 'image/png', 'image/webp']),
+        quality: z.number().min(0).max(1).optional(),
+      })
+      .optional(),
+    'goog:optimizeForSpeed': z.boolean().optional(),
+  });
+
   export function parseCaptureScreenshotParams(
     params: unknown
-  ): Protocol.BrowsingContext.CaptureScreenshotParameters {
+  ): Protocol.Goog.CaptureScreenshotParameters {
     return parseObject(
       params,
-      WebDriverBidi.BrowsingContext.CaptureScreenshotParametersSchema
+      z.intersection(
+        WebDriverBidi.BrowsingContext.CaptureScreenshotParametersSchema,
+        GoogCaptureScreenshotParametersSchema
+      )
     );
   }
 
@@ -229,3 +257,98 @@ export namespace Cdp {
     return parseObject(params, GetSessionRequestSchema);
   }
 }
+
+export namespace Goog {
+  const BatchedCommandSchema = z.object({
+    id: WebDriverBidi.JsUintSchema,
+    // Allowing any method, and validating it when the command is executed.
+    method: z.string(),
+    params: z.object({}).passthrough(),
+  });
+
+  const BatchParametersSchema = z.object({
+    commands: z.array(BatchedCommandSchema),
+    sequential: z.boolean().optional(),
+  });
+
+  const IoReadParametersSchema = z.object({
+    stream: z.string(),
+    size: WebDriverBidi.JsUintSchema.optional(),
+  });
+
+  const IoCloseParametersSchema = z.object({
+    stream: z.string(),
+  });
+
+  const ScriptDisownGroupParametersSchema = z.object({
+    group: z.string(),
+    target: WebDriverBidi.Script.TargetSchema,
+  });
+
+  const SessionSetPendingMessageLimitsParametersSchema = z.object({
+    highWatermark: WebDriverBidi.JsUintSchema.nullable().optional(),
+    lowWatermark: WebDriverBidi.JsUintSchema.optional(),
+    policies: z
+      .record(
+        z.string(),
+        z.enum(['block', 'dropOldest', 'dropNewest', 'coalesce'])
+      )
+      .optional(),
+  });
+
+  const SessionSetEventBufferingParametersSchema = z.object({
+    events: z.record(z.string(), WebDriverBidi.JsUintSchema).optional(),
+    maxTotalSize: WebDriverBidi.JsUintSchema.nullable().optional(),
+  });
+
+  export function parseBatchParams(
+    params: unknown
+  ): Protocol.Goog.BatchParameters {
+    return parseObject(
+      params,
+      BatchParametersSchema
+    ) as Protocol.Goog.BatchParameters;
+  }
+
+  export function parseIoReadParams(
+    params: unknown
+  ): Protocol.Goog.IoReadParameters {
+    return parseObject(params, IoReadParametersSchema);
+  }
+
+  export function parseIoCloseParams(
+    params: unknown
+  ): Protocol.Goog.IoCloseParameters {
+    return parseObject(params, IoCloseParametersSchema);
+  }
+
+  export function parsePrintToStreamParams(
+    params: unknown
+  ): Protocol.Goog.PrintToStreamParameters {
+    return BrowsingContext.parsePrintParams(params);
+  }
+
+  export function parseDisownGroupParams(
+    params: unknown
+  ): Protocol.Goog.ScriptDisownGroupParameters {
+    return parseObject(
+      params,
+      ScriptDisownGroupParametersSchema
+    ) as Protocol.Goog.ScriptDisownGroupParameters;
+  }
+
+  export function parseSetPendingMessageLimitsParams(
+    params: unknown
+  ): Protocol.Goog.SessionSetPendingMessageLimitsParameters {
+    return parseObject(
+      params,
+      SessionSetPendingMessageLimitsParametersSchema
+    );
+  }
+
+  export function parseSetEventBufferingParams(
+    params: unknown
+  ): Protocol.Goog.SessionSetEventBufferingParameters {
+    return parseObject(params, SessionSetEventBufferingParametersSchema);
+  }
+}
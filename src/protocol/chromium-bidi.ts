@@ -17,6 +17,7 @@
 
 import type * as WebDriverBidi from './webdriver-bidi.js';
 import type * as Cdp from './cdp.js';
+import type * as Goog from './goog.js';
 
 export type EventNames =
   // keep-sorted start
@@ -25,7 +26,8 @@ export type EventNames =
   | Cdp.EventNames
   | Log.EventNames
   | Network.EventNames
-  | Script.EventNames;
+  | Script.EventNames
+  | Session.EventNames;
 // keep-sorted end
 
 export enum BiDiModule {
@@ -79,21 +81,36 @@ export namespace Network {
   }
 }
 
-export type Command = (WebDriverBidi.Command | Cdp.Command) & {
+export namespace Session {
+  export enum EventNames {
+    MessagesDroppedEvent = 'goog:session.messagesDropped',
+  }
+}
+
+export type Command = (
+  | WebDriverBidi.Command
+  | Cdp.Command
+  | Goog.Command
+) & {
   channel?: WebDriverBidi.Script.Channel;
 };
 
 export type CommandResponse =
   | WebDriverBidi.CommandResponse
-  | Cdp.CommandResponse;
+  | Cdp.CommandResponse
+  | Goog.CommandResponse;
 
-export type Event = WebDriverBidi.Event | Cdp.Event;
+export type Event = WebDriverBidi.Event | Cdp.Event | Goog.Event;
 
-export type ResultData = WebDriverBidi.ResultData | Cdp.ResultData;
+export type ResultData =
+  | WebDriverBidi.ResultData
+  | Cdp.ResultData
+  | Goog.ResultData;
 
 export type Message = (
   | WebDriverBidi.Message
   | Cdp.Message
+  | Goog.Message
   | {launched: true}
 ) & {
   channel?: WebDriverBidi.Script.Channel;
@@ -0,0 +1,372 @@
+/**
+ * Copyright 2023 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/**
+ * Chromium-specific (`goog:`) extensions to the WebDriver BiDi protocol.
+ */
+
+import type Protocol from 'devtools-protocol';
+
+import type * as ChromiumBidi from './chromium-bidi.js';
+import type {
+  BrowsingContext,
+  EmptyParams,
+  EmptyResult,
+  ErrorResponse,
+  JsUint,
+  Script,
+} from './webdriver-bidi.js';
+
+export type Message = CommandResponse | Event;
+
+export type Command = {
+  id: JsUint;
+} & CommandData;
+export type CommandData =
+  | BatchCommand
+  | IoCloseCommand
+  | IoReadCommand
+  | PrintToStreamCommand
+  | ScriptDisownGroupCommand
+  | SessionGetEventBufferingCommand
+  | SessionGetMetricsCommand
+  | SessionSetEventBufferingCommand
+  | SessionSetPendingMessageLimitsCommand;
+
+export type CommandResponse = {
+  type: 'success';
+  id: JsUint;
+  result: ResultData;
+};
+export type ResultData =
+  | BatchResult
+  | EmptyResult
+  | IoReadResult
+  | PrintToStreamResult
+  | SessionGetEventBufferingResult
+  | SessionGetMetricsResult;
+
+export type Event = {
+  type: 'event';
+} & EventData;
+export type EventData = SessionMessagesDroppedEvent;
+
+export type BatchCommand = {
+  method: 'goog:batch';
+  params: BatchParameters;
+};
+
+export type BatchParameters = {
+  /**
+   * Commands to execute. Each command is executed on the channel of the batch
+   * itself; a `channel` set on a batched command is ignored.
+   */
+  commands: ChromiumBidi.Command[];
+  /**
+   * If set, each command is started only after the previous one has
+   * finished. Otherwise, all the commands are started at once.
+   */
+  sequential?: boolean;
+};
+
+export type BatchResult = {
+  /**
+   * Responses to the batched commands, in the order of the commands.
+   */
+  responses: (ChromiumBidi.CommandResponse | ErrorResponse)[];
+};
+
+/**
+ * `browsingContext.captureScreenshot` parameters with vendor extensions.
+ */
+export type CaptureScreenshotParameters =
+  BrowsingContext.CaptureScreenshotParameters & {
+    /** Image format. Defaults to PNG. */
+    'goog:format'?: ImageFormat;
+    /** If set, the image is encoded faster at the cost of its size. */
+    'goog:optimizeForSpeed'?: boolean;
+  };
+
+/**
+ * Name of a group of the handles, chosen by the client and disowned at once
+ * with `goog:script.disownGroup`.
+ */
+export type ObjectGroup = string;
+
+/**
+ * `script.evaluate` parameters with vendor extensions.
+ */
+export type EvaluateParameters = Script.EvaluateParameters & {
+  /** Group to put the result handle into, if any. */
+  'goog:objectGroup'?: ObjectGroup;
+};
+
+/**
+ * `script.callFunction` parameters with vendor extensions.
+ */
+export type CallFunctionParameters = Script.CallFunctionParameters & {
+  /** Group to put the result handle into, if any. */
+  'goog:objectGroup'?: ObjectGroup;
+};
+
+export type ScriptDisownGroupCommand = {
+  method: 'goog:script.disownGroup';
+  params: ScriptDisownGroupParameters;
+};
+
+export type ScriptDisownGroupParameters = {
+  group: ObjectGroup;
+  target: Script.Target;
+};
+
+export type ImageFormat = {
+  type: 'image/jpeg' | 'image/png' | 'image/webp';
+  /** Compression quality in range [0, 1]. Ignored for PNG. */
+  quality?: number;
+};
+
+/**
+ * Handle of a stream of binary data, read with `goog:io.read`.
+ */
+export type Stream = string;
+
+export type PrintToStreamCommand = {
+  method: 'goog:browsingContext.printToStream';
+  params: PrintToStreamParameters;
+};
+
+export type PrintToStreamParameters = BrowsingContext.PrintParameters;
+
+export type PrintToStreamResult = {
+  stream: Stream;
+};
+
+export type IoReadCommand = {
+  method: 'goog:io.read';
+  params: IoReadParameters;
+};
+
+export type IoReadParameters = {
+  stream: Stream;
+  /**
+   * Maximum number of bytes to read. If not set, the browser picks the chunk
+   * size.
+   */
+  size?: JsUint;
+};
+
+export type IoReadResult = {
+  /** Base64-encoded chunk of the data. */
+  data: string;
+  /** Set if the end of the stream is reached. */
+  eof: boolean;
+};
+
+export type IoCloseCommand = {
+  method: 'goog:io.close';
+  params: IoCloseParameters;
+};
+
+export type IoCloseParameters = {
+  stream: Stream;
+};
+
+export type SessionSetEventBufferingCommand = {
+  method: 'goog:session.setEventBuffering';
+  params: SessionSetEventBufferingParameters;
+};
+
+export type SessionSetEventBufferingParameters = {
+  /**
+   * Maps event names or modules to the number of events kept per browsing
+   * context for late subscribers. `0` disables buffering of the event.
+   */
+  events?: Record<string, JsUint>;
+  /**
+   * Limit of the total size of the buffered events, in characters of their
+   * serialized form. When exceeded, the events of the least recently active
+   * contexts are dropped. `null` removes the limit.
+   */
+  maxTotalSize?: JsUint | null;
+};
+
+export type SessionGetEventBufferingCommand = {
+  method: 'goog:session.getEventBuffering';
+  params: EmptyParams;
+};
+
+export type SessionGetEventBufferingResult = {
+  events: Record<string, JsUint>;
+  maxTotalSize: JsUint | null;
+  totalSize: JsUint;
+  buffers: EventBufferInfo[];
+};
+
+export type EventBufferInfo = {
+  event: string;
+  context: BrowsingContext.BrowsingContext | null;
+  /** Number of the buffered events. */
+  count: JsUint;
+  /** Size of the resolved buffered events. */
+  size: JsUint;
+};
+
+export type SessionGetMetricsCommand = {
+  method: 'goog:session.getMetrics';
+  params: EmptyParams;
+};
+
+export type SessionGetMetricsResult = {
+  /** Maps command method to its metrics. */
+  commands: Record<string, CommandMetrics>;
+  /** CDP traffic, or `null` if the CDP connection does not count it. */
+  cdp: CdpMetrics | null;
+  events: EventMetrics;
+  outgoingMessages: OutgoingMessageMetrics;
+  storage: StorageMetrics;
+};
+
+/**
+ * Counts values in buckets. `counts[i]` is the number of the values in
+ * `(bounds[i - 1], bounds[i]]`; the last count is of the values above the last
+ * bound.
+ */
+export type Histogram = {
+  count: JsUint;
+  sum: number;
+  max: number;
+  bounds: number[];
+  counts: JsUint[];
+};
+
+export type CommandMetrics = {
+  count: JsUint;
+  /** Number of the commands which resulted in an error. */
+  errors: JsUint;
+  /**
+   * Number of the CDP commands sent while the commands were processed. CDP
+   * commands of concurrently processed commands are counted for each of them.
+   */
+  cdpCommands: JsUint;
+  /** Processing times in milliseconds. */
+  latency: Histogram;
+};
+
+export type CdpMetrics = {
+  commands: JsUint;
+  errors: JsUint;
+  /** Number of the commands waiting for a response. */
+  pending: JsUint;
+  events: JsUint;
+  /** Round-trip times in milliseconds. */
+  latency: Histogram;
+};
+
+export type EventMetrics = {
+  /** Maps event name to the number of the produced events. */
+  emitted: Record<string, JsUint>;
+  /**
+   * Maps event name to the number of the events not produced, as nobody was
+   * subscribed to them.
+   */
+  elided: Record<string, JsUint>;
+  /** Number of the buffered events. */
+  buffered: JsUint;
+  /** Size of the resolved buffered events. */
+  bufferedSize: JsUint;
+};
+
+export type OutgoingMessageMetrics = {
+  /** Number of the messages waiting to be sent. */
+  depth: JsUint;
+  maxDepth: JsUint;
+  sent: JsUint;
+  dropped: JsUint;
+  /** Sum of the times in milliseconds from emitting to sending messages. */
+  totalWaitTime: number;
+  maxWaitTime: number;
+};
+
+export type StorageMetrics = {
+  contexts: JsUint;
+  realms: JsUint;
+  /** Number of the handles sent to the client and not disowned. */
+  handles: JsUint;
+};
+
+export type SessionSetPendingMessageLimitsCommand = {
+  method: 'goog:session.setPendingMessageLimits';
+  params: SessionSetPendingMessageLimitsParameters;
+};
+
+/**
+ * What to do with a new event while the outgoing messages pending in the Mapper
+ * are over the high watermark. See `ProcessingQueue` for details.
+ */
+export type DropPolicy = 'block' | 'dropOldest' | 'dropNewest' | 'coalesce';
+
+export type SessionSetPendingMessageLimitsParameters = {
+  /**
+   * Number of the outgoing messages pending in the Mapper, from which the drop
+   * policies apply. Messages handed over to the transport are not counted.
+   * `null` disables dropping.
+   */
+  highWatermark?: JsUint | null;
+  /**
+   * Number of the pending messages to which the queue has to fall for the
+   * drop policies to stop applying. Defaults to half of `highWatermark`.
+   */
+  lowWatermark?: JsUint;
+  /** Maps event names or modules to their drop policy. Defaults to `block`. */
+  policies?: Record<string, DropPolicy>;
+};
+
+export type SessionMessagesDroppedEvent = {
+  method: 'goog:session.messagesDropped';
+  params: SessionMessagesDroppedParameters;
+};
+
+export type SessionMessagesDroppedParameters = {
+  /**
+   * Maps event names to the number of the events dropped since the outgoing
+   * message queue went over its high watermark.
+   */
+  dropped: Record<string, JsUint>;
+};
+
+/**
+ * Result extension used between the Mapper and the server relay. The `data`
+ * of the result is left empty and fetched by the relay with the given CDP
+ * command, so that the payload does not pass through the Mapper. It is never
+ * sent to the client.
+ */
+export type DeferredDataResult = {
+  'goog:deferredData': DeferredData;
+};
+
+export type DeferredData = {
+  targetId: Protocol.Target.TargetID;
+} & (
+  | {
+      method: 'Page.captureScreenshot';
+      params: Protocol.Page.CaptureScreenshotRequest;
+    }
+  | {
+      method: 'Page.printToPDF';
+      params: Protocol.Page.PrintToPDFRequest;
+    }
+);
@@ -17,5 +17,6 @@
 
 export * as Cdp from './cdp.js';
 export * as ChromiumBidi from './chromium-bidi.js';
+export * as Goog from './goog.js';
 export * from './webdriver-bidi.js';
 export * from './ErrorResponse.js';
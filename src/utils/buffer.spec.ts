@@ -42,4 +42,102 @@ describe('Buffer', () => {
     buffer.add(3);
     sinon.assert.calledOnceWithExactly(onRemoved, 1);
   });
+
+  it('should iterate values from oldest to newest', () => {
+    const buffer = new Buffer<number>(3);
+    for (let i = 1; i <= 5; i++) {
+      buffer.add(i);
+    }
+    expect([...buffer]).to.deep.equal([3, 4, 5]);
+    expect(buffer.length).to.equal(3);
+  });
+
+  it('should not expose the internal storage', () => {
+    const buffer = new Buffer<number>(2);
+    buffer.add(1);
+    buffer.get().push(2);
+    expect(buffer.get()).to.deep.equal([1]);
+  });
+
+  it('should support capacities beyond the array length limit', () => {
+    const buffer = new Buffer<number>(2 ** 40);
+    buffer.add(1);
+    buffer.add(2);
+    expect(buffer.get()).to.deep.equal([1, 2]);
+  });
+
+  it('should drop values with zero capacity', () => {
+    const onRemoved = sinon.mock();
+    const buffer = new Buffer<number>(0, onRemoved);
+    buffer.add(1);
+    expect(buffer.get()).to.deep.equal([]);
+    sinon.assert.calledOnceWithExactly(onRemoved, 1);
+  });
+
+  describe('valuesAfter', () => {
+    const getKey = (value: {id: number}) => value.id;
+
+    function createBuffer(capacity: number, ids: number[]) {
+      const buffer = new Buffer<{id: number}>(capacity);
+      for (const id of ids) {
+        buffer.add({id});
+      }
+      return buffer;
+    }
+
+    it('should return all values for a key below the oldest', () => {
+      const buffer = createBuffer(3, [1, 2, 3, 4]);
+      expect([...buffer.valuesAfter(-Infinity, getKey)]).to.deep.equal([
+        {id: 2},
+        {id: 3},
+        {id: 4},
+      ]);
+    });
+
+    it('should return values after the key', () => {
+      const buffer = createBuffer(4, [1, 3, 5, 7, 9]);
+      expect([...buffer.valuesAfter(5, getKey)]).to.deep.equal([
+        {id: 7},
+        {id: 9},
+      ]);
+      expect([...buffer.valuesAfter(6, getKey)]).to.deep.equal([
+        {id: 7},
+        {id: 9},
+      ]);
+    });
+
+    it('should return nothing for a key of the newest', () => {
+      const buffer = createBuffer(3, [1, 2, 3]);
+      expect([...buffer.valuesAfter(3, getKey)]).to.deep.equal([]);
+    });
+
+    it('should return nothing for empty buffer', () => {
+      const buffer = createBuffer(3, []);
+      expect([...buffer.valuesAfter(0, getKey)]).to.deep.equal([]);
+    });
+
+    it('should look up only logarithmic number of keys', () => {
+      const buffer = createBuffer(1024, [...Array(2000).keys()]);
+      const getKeySpy = sinon.spy(getKey);
+      expect([...buffer.valuesAfter(1997, getKeySpy)]).to.deep.equal([
+        {id: 1998},
+        {id: 1999},
+      ]);
+      expect(getKeySpy.callCount).to.be.at.most(11);
+    });
+  });
+
+  describe('benchmark', () => {
+    it('should add to a full buffer in constant time', () => {
+      // Within the default test timeout only if adding does not depend on the
+      // buffer size.
+      const capacity = 100_000;
+      const buffer = new Buffer<number>(capacity);
+      for (let i = 0; i < 10 * capacity; i++) {
+        buffer.add(i);
+      }
+      expect(buffer.length).to.equal(capacity);
+      expect(buffer.get()[0]).to.equal(9 * capacity);
+    });
+  });
 });
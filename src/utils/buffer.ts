@@ -15,11 +15,19 @@
  * limitations under the License.
  */
 
-/** Implements a FIFO buffer with a fixed size. */
+/**
+ * Implements a FIFO buffer with a fixed size. Backed by a circular array, so
+ * adding a value is O(1) even when the buffer is full. The array grows with
+ * the values up to the capacity, so that large capacities cost nothing until
+ * used.
+ */
 export class Buffer<T> {
   readonly #capacity: number;
   readonly #entries: T[] = [];
   readonly #onItemRemoved?: (value: T) => void;
+  /** Index of the oldest value. */
+  #head = 0;
+  #length = 0;
 
   /**
    * @param capacity The buffer capacity.
@@ -30,17 +38,63 @@ export class Buffer<T> {
     this.#onItemRemoved = onItemRemoved;
   }
 
+  /** Number of the values in the buffer. */
+  get length(): number {
+    return this.#length;
+  }
+
+  /** Returns a copy of the values, from the oldest to the newest. */
   get(): T[] {
-    return this.#entries;
+    return [...this];
   }
 
   add(value: T) {
-    this.#entries.push(value);
-    while (this.#entries.length > this.#capacity) {
-      const item = this.#entries.shift();
-      if (item !== undefined) {
-        this.#onItemRemoved?.(item);
+    if (this.#capacity === 0) {
+      this.#onItemRemoved?.(value);
+      return;
+    }
+    if (this.#length < this.#capacity) {
+      // The oldest value is at the start until the buffer is full.
+      this.#entries.push(value);
+      this.#length++;
+      return;
+    }
+    // The buffer is full, overwrite the oldest value.
+    const removed = this.#entries[this.#head]!;
+    this.#entries[this.#head] = value;
+    this.#head = this.#index(1);
+    this.#onItemRemoved?.(removed);
+  }
+
+  *[Symbol.iterator](): IterableIterator<T> {
+    for (let i = 0; i < this.#length; i++) {
+      yield this.#entries[this.#index(i)]!;
+    }
+  }
+
+  /**
+   * Iterates over the values with a key greater than the given one, from the
+   * oldest to the newest. The keys must increase in the order the values were
+   * added, which allows finding the first value with a binary search.
+   */
+  *valuesAfter(key: number, getKey: (value: T) => number): IterableIterator<T> {
+    let low = 0;
+    let high = this.#length;
+    while (low < high) {
+      const middle = (low + high) >>> 1;
+      if (getKey(this.#entries[this.#index(middle)]!) <= key) {
+        low = middle + 1;
+      } else {
+        high = middle;
       }
     }
+    for (let i = low; i < this.#length; i++) {
+      yield this.#entries[this.#index(i)]!;
+    }
+  }
+
+  /** Returns the position in the array of the value at the given offset. */
+  #index(offset: number): number {
+    return (this.#head + offset) % this.#capacity;
   }
 }
@@ -0,0 +1,59 @@
+/**
+ * Copyright 2022 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import {expect} from 'chai';
+
+import {Histogram} from './histogram.js';
+
+describe('Histogram', () => {
+  it('should be empty', () => {
+    expect(new Histogram([1, 10]).toJSON()).to.deep.equal({
+      count: 0,
+      sum: 0,
+      max: 0,
+      bounds: [1, 10],
+      counts: [0, 0, 0],
+    });
+  });
+
+  it('should count values in buckets', () => {
+    const histogram = new Histogram([1, 10]);
+
+    for (const value of [0, 1, 1.5, 10, 11, 100]) {
+      histogram.record(value);
+    }
+
+    expect(histogram.count).to.equal(6);
+    expect(histogram.toJSON()).to.deep.equal({
+      count: 6,
+      sum: 123.5,
+      max: 100,
+      bounds: [1, 10],
+      counts: [2, 2, 2],
+    });
+  });
+
+  it('should use latency bounds by default', () => {
+    const histogram = new Histogram();
+
+    histogram.record(3);
+
+    const data = histogram.toJSON();
+    expect(data.bounds[0]).to.equal(1);
+    expect(data.counts[data.bounds.indexOf(5)]).to.equal(1);
+  });
+});
@@ -0,0 +1,87 @@
+/**
+ * Copyright 2022 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+export type HistogramData = {
+  /** Number of the recorded values. */
+  count: number;
+  /** Sum of the recorded values. */
+  sum: number;
+  /** Largest recorded value, or 0 if none. */
+  max: number;
+  /** Inclusive upper bounds of the buckets, in ascending order. */
+  bounds: number[];
+  /**
+   * Number of the values per bucket. The last count is of the values above
+   * the last bound.
+   */
+  counts: number[];
+};
+
+/** Bucket bounds for latencies in milliseconds. */
+const defaultBounds = [
+  1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000,
+] as const;
+
+/**
+ * Counts values, e.g. latencies, in buckets of fixed bounds. Recording a value
+ * takes O(log b) for `b` buckets and the memory does not grow with the number
+ * of values.
+ */
+export class Histogram {
+  readonly #bounds: readonly number[];
+  readonly #counts: number[];
+  #count = 0;
+  #sum = 0;
+  #max = 0;
+
+  constructor(bounds: readonly number[] = defaultBounds) {
+    this.#bounds = bounds;
+    this.#counts = new Array(bounds.length + 1).fill(0);
+  }
+
+  get count(): number {
+    return this.#count;
+  }
+
+  record(value: number) {
+    // Find the first bound not less than the value.
+    let low = 0;
+    let high = this.#bounds.length;
+    while (low < high) {
+      const middle = (low + high) >>> 1;
+      if (this.#bounds[middle]! < value) {
+        low = middle + 1;
+      } else {
+        high = middle;
+      }
+    }
+    this.#counts[low]!++;
+    this.#count++;
+    this.#sum += value;
+    this.#max = Math.max(this.#max, value);
+  }
+
+  toJSON(): HistogramData {
+    return {
+      count: this.#count,
+      sum: this.#sum,
+      max: this.#max,
+      bounds: [...this.#bounds],
+      counts: [...this.#counts],
+    };
+  }
+}
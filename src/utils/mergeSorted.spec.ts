@@ -0,0 +1,112 @@
+/**
+ * Copyright 2022 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import {expect} from 'chai';
+
+import {mergeSorted} from './mergeSorted.js';
+
+describe('mergeSorted', () => {
+  const compare = (a: number, b: number) => a - b;
+
+  it('should merge nothing', () => {
+    expect([...mergeSorted([], compare)]).to.deep.equal([]);
+    expect([...mergeSorted([[], []], compare)]).to.deep.equal([]);
+  });
+
+  it('should keep a single iterable', () => {
+    expect([...mergeSorted([[1, 2, 3]], compare)]).to.deep.equal([1, 2, 3]);
+  });
+
+  it('should merge sorted iterables', () => {
+    expect([
+      ...mergeSorted([[1, 4, 7], [], [2, 5, 8, 9], [3, 6], [0]], compare),
+    ]).to.deep.equal([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]);
+  });
+
+  it('should keep the order of equal values', () => {
+    const first = [{key: 1, from: 'first'}];
+    const second = [
+      {key: 0, from: 'second'},
+      {key: 1, from: 'second'},
+    ];
+    expect([
+      ...mergeSorted([second, first], (a, b) => a.key - b.key),
+    ]).to.deep.equal([
+      {key: 0, from: 'second'},
+      {key: 1, from: 'second'},
+      {key: 1, from: 'first'},
+    ]);
+  });
+
+  it('should be lazy', () => {
+    function* infinite(start: number) {
+      for (let i = start; ; i += 2) {
+        yield i;
+      }
+    }
+    const merged = mergeSorted([infinite(0), infinite(1)], compare);
+    const result = [];
+    for (const value of merged) {
+      if (value >= 5) {
+        break;
+      }
+      result.push(value);
+    }
+    expect(result).to.deep.equal([0, 1, 2, 3, 4]);
+  });
+
+  it('should yield at most the limit', () => {
+    expect([
+      ...mergeSorted([[1, 4, 7], [2, 5], [3, 6]], compare, 4),
+    ]).to.deep.equal([1, 2, 3, 4]);
+    expect([...mergeSorted([[1, 2]], compare, 5)]).to.deep.equal([1, 2]);
+    expect([...mergeSorted([[1, 2]], compare, 0)]).to.deep.equal([]);
+  });
+
+  it('should not advance the iterables past the limit', () => {
+    let advanced = 0;
+    function* counting(values: number[]) {
+      for (const value of values) {
+        advanced++;
+        yield value;
+      }
+    }
+    const merged = [
+      ...mergeSorted([counting([1, 3, 5]), counting([2, 4, 6])], compare, 2),
+    ];
+    expect(merged).to.deep.equal([1, 2]);
+    // The heads of both iterables, and the value following the first one.
+    expect(advanced).to.equal(3);
+  });
+
+  it('should compare logarithmic number of values per item', () => {
+    const iterables = [...Array(256).keys()].map((i) =>
+      [...Array(10).keys()].map((j) => j * 256 + i)
+    );
+    let comparisons = 0;
+    const result = [
+      ...mergeSorted(iterables, (a, b) => {
+        comparisons++;
+        return a - b;
+      }),
+    ];
+    expect(result).to.deep.equal([...Array(2560).keys()]);
+    // Two comparisons per level of the heap of 256 iterables, plus building
+    // the heap.
+    expect(comparisons).to.be.at.most(2560 * 2 * 8 + 2 * 256);
+  });
+});
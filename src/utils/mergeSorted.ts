@@ -0,0 +1,95 @@
+/**
+ * Copyright 2022 Google LLC.
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+type HeapEntry<T> = {
+  value: T;
+  iterator: Iterator<T>;
+  /** Position of the iterable, used to keep the merge stable. */
+  index: number;
+};
+
+/**
+ * Lazily merges the given sorted iterables into a single sorted sequence.
+ * Keeps the head of each iterable in a binary heap, so merging `n` values from
+ * `k` iterables takes O(n log k). Equal values are yielded in the order of
+ * their iterables. At most `limit` values are yielded, and the iterables are
+ * not advanced past them.
+ */
+export function* mergeSorted<T>(
+  iterables: Iterable<T>[],
+  compare: (a: T, b: T) => number,
+  limit = Infinity
+): IterableIterator<T> {
+  if (limit <= 0) {
+    return;
+  }
+  const heap: HeapEntry<T>[] = [];
+  const less = (a: HeapEntry<T>, b: HeapEntry<T>) => {
+    const result = compare(a.value, b.value);
+    return result < 0 || (result === 0 && a.index < b.index);
+  };
+  const siftDown = (position: number) => {
+    for (;;) {
+      const left = 2 * position + 1;
+      const right = left + 1;
+      let smallest = position;
+      if (left < heap.length && less(heap[left]!, heap[smallest]!)) {
+        smallest = left;
+      }
+      if (right < heap.length && less(heap[right]!, heap[smallest]!)) {
+        smallest = right;
+      }
+      if (smallest === position) {
+        return;
+      }
+      [heap[position], heap[smallest]] = [heap[smallest]!, heap[position]!];
+      position = smallest;
+    }
+  };
+
+  iterables.forEach((iterable, index) => {
+    const iterator = iterable[Symbol.iterator]();
+    const next = iterator.next();
+    if (!next.done) {
+      heap.push({value: next.value, iterator, index});
+    }
+  });
+  for (let position = (heap.length >>> 1) - 1; position >= 0; position--) {
+    siftDown(position);
+  }
+
+  let yielded = 0;
+  while (heap.length > 0) {
+    const top = heap[0]!;
+    yield top.value;
+    if (++yielded >= limit) {
+      return;
+    }
+
+    const next = top.iterator.next();
+    if (next.done) {
+      const last = heap.pop()!;
+      if (heap.length === 0) {
+        return;
+      }
+      heap[0] = last;
+    } else {
+      top.value = next.value;
+    }
+    siftDown(0);
+  }
+}
@@ -19,23 +19,23 @@ import {expect} from 'chai';
 import * as sinon from 'sinon';
 
 import {Deferred} from './deferred.js';
-import {ProcessingQueue} from './processingQueue.js';
+import {type EntryOptions, ProcessingQueue} from './processingQueue.js';
 import type {Result} from './result.js';
 
 describe('ProcessingQueue', () => {
-  it('should wait and call processor in order', async () => {
+  it('should wait and call processor in order for the same key', async () => {
     const processor = sinon.stub().returns(Promise.resolve());
     const queue = new ProcessingQueue<number>(processor);
     const deferred1 = new Deferred<Result<number>>();
     const deferred2 = new Deferred<Result<number>>();
     const deferred3 = new Deferred<Result<number>>();
 
-    queue.add(deferred1);
+    queue.add(deferred1, {orderingKey: 'key'});
     await wait(1);
     sinon.assert.notCalled(processor);
 
-    queue.add(deferred2);
-    queue.add(deferred3);
+    queue.add(deferred2, {orderingKey: 'key'});
+    queue.add(deferred3, {orderingKey: 'key'});
     await wait(1);
     sinon.assert.notCalled(processor);
 
@@ -60,6 +60,254 @@ describe('ProcessingQueue', () => {
     expect(processedValues).to.deep.equal([1, 2, 3]);
   });
 
+  it('should not wait for entries without key', async () => {
+    const processor = sinon.stub().returns(Promise.resolve());
+    const queue = new ProcessingQueue<number>(processor);
+    const deferred1 = new Deferred<Result<number>>();
+    const deferred2 = new Deferred<Result<number>>();
+
+    queue.add(deferred1, {orderingKey: 'key'});
+    queue.add(deferred2);
+    deferred2.resolve({
+      kind: 'success',
+      value: 2,
+    });
+    await wait(1);
+    sinon.assert.calledOnceWithExactly(processor, 2);
+
+    deferred1.resolve({
+      kind: 'success',
+      value: 1,
+    });
+    await wait(1);
+
+    const processedValues = processor.getCalls().map((c) => c.firstArg);
+    expect(processedValues).to.deep.equal([2, 1]);
+  });
+
+  it('should not wait for entries with another key', async () => {
+    const processor = sinon.stub().returns(Promise.resolve());
+    const queue = new ProcessingQueue<number>(processor);
+    const deferred1 = new Deferred<Result<number>>();
+    const deferred2 = new Deferred<Result<number>>();
+    const deferred3 = new Deferred<Result<number>>();
+
+    queue.add(deferred1, {orderingKey: 'key'});
+    queue.add(deferred2, {orderingKey: 'key'});
+    queue.add(deferred3, {orderingKey: 'another key'});
+    deferred2.resolve({
+      kind: 'success',
+      value: 2,
+    });
+    deferred3.resolve({
+      kind: 'success',
+      value: 3,
+    });
+    await wait(1);
+    sinon.assert.calledOnceWithExactly(processor, 3);
+
+    deferred1.resolve({
+      kind: 'success',
+      value: 1,
+    });
+    await wait(1);
+
+    const processedValues = processor.getCalls().map((c) => c.firstArg);
+    expect(processedValues).to.deep.equal([3, 1, 2]);
+  });
+
+  it('should wait for earlier entries of the scope without key', async () => {
+    const processor = sinon.stub().returns(Promise.resolve());
+    const queue = new ProcessingQueue<number>(processor);
+    const deferred1 = new Deferred<Result<number>>();
+    const deferred2 = new Deferred<Result<number>>();
+    const deferred3 = new Deferred<Result<number>>();
+    const deferred4 = new Deferred<Result<number>>();
+
+    queue.add(deferred1, {orderingKey: 'key', scope: 'scope'});
+    queue.add(deferred2, {orderingKey: 'key', scope: 'another scope'});
+    queue.add(deferred3, {scope: 'scope'});
+    queue.add(deferred4, {orderingKey: 'later key', scope: 'scope'});
+    deferred3.resolve({
+      kind: 'success',
+      value: 3,
+    });
+    deferred4.resolve({
+      kind: 'success',
+      value: 4,
+    });
+    await wait(1);
+    sinon.assert.calledOnceWithExactly(processor, 4);
+
+    deferred1.resolve({
+      kind: 'success',
+      value: 1,
+    });
+    await wait(1);
+
+    const processedValues = processor.getCalls().map((c) => c.firstArg);
+    expect(processedValues).to.deep.equal([4, 1, 3]);
+  });
+
+  it('should report metrics', async () => {
+    const processor = sinon.stub().returns(Promise.resolve());
+    const queue = new ProcessingQueue<number>(processor);
+    const deferred1 = new Deferred<Result<number>>();
+    const deferred2 = new Deferred<Result<number>>();
+
+    queue.add(deferred1, {orderingKey: 'key'});
+    queue.add(deferred2, {orderingKey: 'key'});
+    expect(queue.metrics).to.include({depth: 2, maxDepth: 2, processed: 0});
+
+    deferred1.resolve({
+      kind: 'success',
+      value: 1,
+    });
+    deferred2.resolve({
+      kind: 'success',
+      value: 2,
+    });
+    await wait(1);
+
+    expect(queue.metrics).to.include({depth: 0, maxDepth: 2, processed: 2});
+    expect(queue.metrics.maxWaitTime).to.be.greaterThan(0);
+    expect(queue.metrics.totalWaitTime).to.be.at.least(
+      queue.metrics.maxWaitTime
+    );
+  });
+
+  describe('drop policies', () => {
+    function createOverloadedQueue(onDropped?: sinon.SinonSpy) {
+      const processor = sinon.stub().returns(Promise.resolve());
+      const queue = new ProcessingQueue<number>(processor, undefined, onDropped);
+      queue.setWatermarks(2, 0);
+      const blocker = new Deferred<Result<number>>();
+      // Blocks the processing of the key, and makes the queue overloaded.
+      queue.add(blocker, {orderingKey: 'key'});
+      queue.add(blocker, {orderingKey: 'key'});
+      return {processor, queue, blocker};
+    }
+
+    function add(
+      queue: ProcessingQueue<number>,
+      value: number,
+      options: EntryOptions
+    ) {
+      queue.add(Promise.resolve({kind: 'success', value}), {
+        orderingKey: 'key',
+        group: 'group',
+        ...options,
+      });
+    }
+
+    async function processedValues(
+      processor: sinon.SinonStub,
+      blocker: Deferred<Result<number>>
+    ) {
+      blocker.resolve({kind: 'success', value: 0});
+      await wait(1);
+      return processor
+        .getCalls()
+        .map((c) => c.firstArg)
+        .filter((value) => value !== 0);
+    }
+
+    it('block keeps all the entries', async () => {
+      const {processor, queue, blocker} = createOverloadedQueue();
+      add(queue, 1, {dropPolicy: 'block'});
+      add(queue, 2, {dropPolicy: 'block'});
+
+      expect(await processedValues(processor, blocker)).to.deep.equal([1, 2]);
+      expect(queue.metrics.dropped).to.equal(0);
+    });
+
+    it('dropNewest drops new entries', async () => {
+      const {processor, queue, blocker} = createOverloadedQueue();
+      add(queue, 1, {dropPolicy: 'dropNewest'});
+      add(queue, 2, {dropPolicy: 'dropNewest'});
+
+      expect(await processedValues(processor, blocker)).to.deep.equal([]);
+      expect(queue.metrics.dropped).to.equal(2);
+    });
+
+    it('dropOldest drops the oldest entry of the group', async () => {
+      const {processor, queue, blocker} = createOverloadedQueue();
+      add(queue, 1, {dropPolicy: 'block'});
+      add(queue, 2, {dropPolicy: 'block', group: 'another group'});
+      add(queue, 3, {dropPolicy: 'dropOldest'});
+
+      expect(await processedValues(processor, blocker)).to.deep.equal([2, 3]);
+      expect(queue.metrics.dropped).to.equal(1);
+    });
+
+    it('dropOldest does not drop the entry being processed', async () => {
+      const {processor, queue, blocker} = createOverloadedQueue();
+      const processing = new Deferred<void>();
+      processor.withArgs(1).returns(processing);
+      add(queue, 1, {dropPolicy: 'block', orderingKey: undefined});
+      await wait(1);
+      sinon.assert.calledWith(processor, 1);
+
+      add(queue, 2, {dropPolicy: 'dropOldest'});
+      processing.resolve();
+
+      expect(await processedValues(processor, blocker)).to.deep.equal([1, 2]);
+      expect(queue.metrics.dropped).to.equal(0);
+    });
+
+    it('coalesce keeps the newest entry of the group and key', async () => {
+      const {processor, queue, blocker} = createOverloadedQueue();
+      add(queue, 1, {dropPolicy: 'coalesce'});
+      add(queue, 2, {dropPolicy: 'coalesce', orderingKey: 'another key'});
+      add(queue, 3, {dropPolicy: 'coalesce'});
+      add(queue, 4, {dropPolicy: 'coalesce'});
+
+      expect(await processedValues(processor, blocker)).to.deep.equal([2, 4]);
+      expect(queue.metrics.dropped).to.equal(2);
+    });
+
+    it('entries without group are never dropped', async () => {
+      const {processor, queue, blocker} = createOverloadedQueue();
+      queue.add(Promise.resolve({kind: 'success', value: 1}), {
+        orderingKey: 'key',
+        dropPolicy: 'dropNewest',
+      });
+
+      expect(await processedValues(processor, blocker)).to.deep.equal([1]);
+    });
+
+    it('does not drop under the high watermark', async () => {
+      const processor = sinon.stub().returns(Promise.resolve());
+      const queue = new ProcessingQueue<number>(processor);
+      queue.setWatermarks(10, 0);
+      add(queue, 1, {dropPolicy: 'dropNewest'});
+      await wait(1);
+
+      sinon.assert.calledOnceWithExactly(processor, 1);
+    });
+
+    it('reports dropped entries after falling to the low watermark', async () => {
+      const onDropped = sinon.spy();
+      const {queue, blocker} = createOverloadedQueue(onDropped);
+      add(queue, 1, {dropPolicy: 'dropNewest'});
+      add(queue, 2, {dropPolicy: 'dropNewest', group: 'another group'});
+      add(queue, 3, {dropPolicy: 'dropNewest'});
+      await wait(1);
+      sinon.assert.notCalled(onDropped);
+
+      blocker.resolve({kind: 'success', value: 0});
+      await wait(1);
+
+      sinon.assert.calledOnce(onDropped);
+      expect(onDropped.firstCall.args[0]).to.deep.equal(
+        new Map([
+          ['group', 2],
+          ['another group', 1],
+        ])
+      );
+    });
+  });
+
   it('rejects should not stop processing with rejects from processor', async () => {
     const error = new Error('Processor reject');
     const processor = sinon.stub().returns(Promise.reject(error));
@@ -15,54 +15,330 @@
  * limitations under the License.
  */
 
+import {Deferred} from './deferred.js';
 import {LogType, type LoggerFn} from './log.js';
 import type {Result} from './result.js';
 
+export type ProcessingQueueMetrics = {
+  /** Number of the entries waiting for their processing to start. */
+  depth: number;
+  /** Highest observed depth. */
+  maxDepth: number;
+  /** Number of the processed entries. */
+  processed: number;
+  /** Number of the entries dropped under load. */
+  dropped: number;
+  /** Sum of the times in milliseconds from adding to processing entries. */
+  totalWaitTime: number;
+  /** Longest time in milliseconds from adding to processing an entry. */
+  maxWaitTime: number;
+};
+
+/**
+ * What to do with a new entry of a group while the queue is over its high
+ * watermark:
+ * - `block`: keep the entry;
+ * - `dropOldest`: keep the entry, drop the oldest waiting entry of the group;
+ * - `dropNewest`: drop the entry;
+ * - `coalesce`: keep the entry, drop the waiting entries of the group with the
+ *   same ordering key.
+ */
+export type DropPolicy = 'block' | 'dropOldest' | 'dropNewest' | 'coalesce';
+
+export type EntryOptions = {
+  /**
+   * Entries with the same ordering key are processed in the order they were
+   * added.
+   */
+  orderingKey?: string;
+  /**
+   * Scope of the entry, e.g. channel. An entry without an ordering key is
+   * processed only after the entries of its scope added before it.
+   */
+  scope?: string;
+  /** Group of the entry, e.g. event name, to apply the drop policy to. */
+  group?: string;
+  dropPolicy?: DropPolicy;
+};
+
+type QueueEntry<T> = {
+  entry: Promise<Result<T>>;
+  addedAt: number;
+  orderingKey?: string;
+  scope?: string;
+  /** Resolved once the entry is processed or dropped, if it has a scope. */
+  done?: Deferred<void>;
+  group?: string;
+  dropped: boolean;
+  /** Whether the processing started, so that the entry cannot be dropped. */
+  started: boolean;
+};
+
+/**
+ * Processes entries once they are resolved. Entries with the same ordering key
+ * are processed in the order they were added, waiting for the previous ones.
+ * Entries with different keys do not wait for each other. An entry without an
+ * ordering key waits for all the entries of its scope added before it, but
+ * not for the later ones.
+ *
+ * Once the number of waiting entries reaches the high watermark, new entries
+ * are subject to the drop policy of their group, until the number falls to
+ * the low watermark.
+ */
 export class ProcessingQueue<T> {
   readonly #logger?: LoggerFn;
   readonly #processor: (arg: T) => Promise<void>;
-  readonly #queue: Promise<Result<T>>[] = [];
-
-  // Flag to keep only 1 active processor.
-  #isProcessing = false;
+  readonly #onDropped?: (droppedCounts: Map<string, number>) => void;
+  /**
+   * Maps ordering key to the entries waiting for processing. A key is present
+   * only while its entries are being processed.
+   */
+  readonly #queues = new Map<string, QueueEntry<T>[]>();
+  /** Maps scope to its entries not processed yet. */
+  readonly #scopes = new Map<string, Set<QueueEntry<T>>>();
+  /** Maps group to its waiting entries, from the oldest to the newest. */
+  readonly #groups = new Map<string, Set<QueueEntry<T>>>();
+  readonly #metrics: ProcessingQueueMetrics = {
+    depth: 0,
+    maxDepth: 0,
+    processed: 0,
+    dropped: 0,
+    totalWaitTime: 0,
+    maxWaitTime: 0,
+  };
+  #highWatermark = Infinity;
+  #lowWatermark = 0;
+  /** Whether the queue is over the high watermark and sheds its load. */
+  #overloaded = false;
+  /** Maps group to the number of entries dropped while overloaded. */
+  #droppedCounts = new Map<string, number>();
 
-  constructor(processor: (arg: T) => Promise<void>, logger?: LoggerFn) {
+  /**
+   * @param processor Processes the resolved entries.
+   * @param logger Logger.
+   * @param onDropped Called with the number of the dropped entries per group,
+   *   once the queue is not overloaded anymore.
+   */
+  constructor(
+    processor: (arg: T) => Promise<void>,
+    logger?: LoggerFn,
+    onDropped?: (droppedCounts: Map<string, number>) => void
+  ) {
     this.#processor = processor;
     this.#logger = logger;
+    this.#onDropped = onDropped;
+  }
+
+  get metrics(): Readonly<ProcessingQueueMetrics> {
+    return this.#metrics;
   }
 
-  add(entry: Promise<Result<T>>) {
-    this.#queue.push(entry);
-    // No need in waiting. Just initialise processor if needed.
-    void this.#processIfNeeded();
+  /**
+   * Sets the number of waiting entries from which the drop policies apply, and
+   * the number to which the entries have to fall for them to stop applying.
+   */
+  setWatermarks(highWatermark: number, lowWatermark: number) {
+    this.#highWatermark = highWatermark;
+    this.#lowWatermark = lowWatermark;
+    this.#updateOverloaded();
   }
 
-  async #processIfNeeded() {
-    if (this.#isProcessing) {
+  add(entry: Promise<Result<T>>, options: EntryOptions = {}) {
+    const {orderingKey, scope, group, dropPolicy = 'block'} = options;
+    if (this.#overloaded && group !== undefined) {
+      switch (dropPolicy) {
+        case 'block':
+          break;
+        case 'dropNewest':
+          this.#countDropped(group);
+          return;
+        case 'dropOldest': {
+          const oldest = this.#groups.get(group)?.values().next().value as
+            | QueueEntry<T>
+            | undefined;
+          if (oldest !== undefined) {
+            this.#drop(oldest);
+          }
+          break;
+        }
+        case 'coalesce':
+          for (const waiting of this.#groups.get(group) ?? []) {
+            if (waiting.orderingKey === orderingKey) {
+              this.#drop(waiting);
+            }
+          }
+          break;
+      }
+    }
+
+    const queueEntry: QueueEntry<T> = {
+      entry,
+      addedAt: performance.now(),
+      orderingKey,
+      scope,
+      group,
+      dropped: false,
+      started: false,
+    };
+    if (group !== undefined) {
+      if (!this.#groups.has(group)) {
+        this.#groups.set(group, new Set());
+      }
+      this.#groups.get(group)!.add(queueEntry);
+    }
+    this.#metrics.depth++;
+    this.#metrics.maxDepth = Math.max(
+      this.#metrics.maxDepth,
+      this.#metrics.depth
+    );
+    this.#updateOverloaded();
+
+    let earlierEntries: QueueEntry<T>[] = [];
+    if (scope !== undefined) {
+      queueEntry.done = new Deferred();
+      let scopeEntries = this.#scopes.get(scope);
+      if (scopeEntries === undefined) {
+        scopeEntries = new Set();
+        this.#scopes.set(scope, scopeEntries);
+      }
+      earlierEntries = [...scopeEntries];
+      scopeEntries.add(queueEntry);
+    }
+
+    if (orderingKey === undefined) {
+      if (earlierEntries.length === 0) {
+        // No need in waiting.
+        void this.#process(queueEntry);
+        return;
+      }
+      void Promise.all(earlierEntries.map(({done}) => done)).then(() =>
+        this.#process(queueEntry)
+      );
       return;
     }
-    this.#isProcessing = true;
-    while (this.#queue.length > 0) {
-      const entryPromise = this.#queue.shift();
-      if (entryPromise !== undefined) {
-        await entryPromise
-          .then((entry) => {
-            if (entry.kind === 'error') {
-              this.#logger?.(
-                LogType.debug,
-                'Event threw before sending:',
-                entry.error
-              );
-              return;
-            }
-            return this.#processor(entry.value);
-          })
-          .catch((e) => {
-            this.#logger?.(LogType.debug, 'Event was not processed:', e);
-          });
+    const queue = this.#queues.get(orderingKey);
+    if (queue !== undefined) {
+      // The entries of the key are being processed already.
+      queue.push(queueEntry);
+      return;
+    }
+    void this.#processQueue(orderingKey, [queueEntry]);
+  }
+
+  async #processQueue(orderingKey: string, queue: QueueEntry<T>[]) {
+    this.#queues.set(orderingKey, queue);
+    while (queue.length > 0) {
+      await this.#process(queue[0]!);
+      queue.shift();
+    }
+    this.#queues.delete(orderingKey);
+  }
+
+  async #process(queueEntry: QueueEntry<T>) {
+    try {
+      await this.#processEntry(queueEntry);
+    } finally {
+      this.#finish(queueEntry);
+    }
+  }
+
+  async #processEntry(queueEntry: QueueEntry<T>) {
+    if (queueEntry.dropped) {
+      return;
+    }
+    await queueEntry.entry
+      .then((entry) => {
+        if (queueEntry.dropped) {
+          return;
+        }
+        this.#start(queueEntry);
+        if (entry.kind === 'error') {
+          this.#logger?.(
+            LogType.debug,
+            'Event threw before sending:',
+            entry.error
+          );
+          return;
+        }
+        return this.#processor(entry.value);
+      })
+      .catch((e) => {
+        this.#logger?.(LogType.debug, 'Event was not processed:', e);
+      });
+    if (queueEntry.dropped) {
+      return;
+    }
+    if (!queueEntry.started) {
+      // The entry was rejected.
+      this.#start(queueEntry);
+    }
+    this.#metrics.processed++;
+  }
+
+  /**
+   * Removes the entry from the waiting entries once its processing starts, so
+   * that it is not dropped while being processed.
+   */
+  #start(queueEntry: QueueEntry<T>) {
+    queueEntry.started = true;
+    const waitTime = performance.now() - queueEntry.addedAt;
+    this.#remove(queueEntry);
+    this.#metrics.totalWaitTime += waitTime;
+    this.#metrics.maxWaitTime = Math.max(this.#metrics.maxWaitTime, waitTime);
+  }
+
+  /** Drops the waiting entry, so that it is not processed. */
+  #drop(queueEntry: QueueEntry<T>) {
+    queueEntry.dropped = true;
+    this.#remove(queueEntry);
+    this.#countDropped(queueEntry.group!);
+    this.#finish(queueEntry);
+  }
+
+  /** Lets the later entries of the scope be processed. */
+  #finish(queueEntry: QueueEntry<T>) {
+    if (queueEntry.scope === undefined) {
+      return;
+    }
+    const scopeEntries = this.#scopes.get(queueEntry.scope);
+    if (scopeEntries?.delete(queueEntry) && scopeEntries.size === 0) {
+      this.#scopes.delete(queueEntry.scope);
+    }
+    queueEntry.done!.resolve();
+  }
+
+  #countDropped(group: string) {
+    this.#metrics.dropped++;
+    this.#droppedCounts.set(group, (this.#droppedCounts.get(group) ?? 0) + 1);
+  }
+
+  /** Removes the entry from the waiting entries. */
+  #remove(queueEntry: QueueEntry<T>) {
+    this.#metrics.depth--;
+    if (queueEntry.group !== undefined) {
+      const groupEntries = this.#groups.get(queueEntry.group)!;
+      groupEntries.delete(queueEntry);
+      if (groupEntries.size === 0) {
+        this.#groups.delete(queueEntry.group);
       }
     }
+    this.#updateOverloaded();
+  }
 
-    this.#isProcessing = false;
+  #updateOverloaded() {
+    if (!this.#overloaded) {
+      this.#overloaded = this.#metrics.depth >= this.#highWatermark;
+      return;
+    }
+    if (this.#metrics.depth > this.#lowWatermark) {
+      return;
+    }
+    this.#overloaded = false;
+    if (this.#droppedCounts.size > 0) {
+      const droppedCounts = this.#droppedCounts;
+      this.#droppedCounts = new Map();
+      // Report asynchronously, as reporting might add entries.
+      queueMicrotask(() => this.#onDropped?.(droppedCounts));
+    }
   }
 }
@@ -13,10 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import base64
+import io
 from pathlib import Path
 
 import pytest
 from anys import ANY_STR
+from PIL import Image
 from test_helpers import (assert_images_equal, execute_command, get_tree,
                           goto_url, read_JSON_message, send_JSON_command)
 
@@ -116,3 +118,291 @@ async def test_screenshot_oopif(websocket, context_id, html, iframe,
         png_base64 = base64.b64encode(image_file.read()).decode('utf-8')
 
         assert_images_equal(resp["result"]["data"], png_base64)
+
+
+async def set_fixed_viewport(websocket, context_id, get_cdp_session_id):
+    session_id = await get_cdp_session_id(context_id)
+    await execute_command(
+        websocket, {
+            "method": "cdp.sendCommand",
+            "params": {
+                "method": "Emulation.setDeviceMetricsOverride",
+                "params": {
+                    "width": 200,
+                    "height": 200,
+                    "deviceScaleFactor": 1.0,
+                    "mobile": False,
+                },
+                "session": session_id
+            }
+        })
+
+
+def get_image(data):
+    return Image.open(io.BytesIO(base64.b64decode(data)))
+
+
+@pytest.mark.asyncio
+async def test_screenshot_clip_viewport(websocket, context_id, html,
+                                        get_cdp_session_id):
+    await goto_url(websocket, context_id, html())
+    await set_fixed_viewport(websocket, context_id, get_cdp_session_id)
+
+    result = await execute_command(
+        websocket, {
+            "method": "browsingContext.captureScreenshot",
+            "params": {
+                "context": context_id,
+                "clip": {
+                    "type": "viewport",
+                    "x": 10,
+                    "y": 20,
+                    "width": 50,
+                    "height": 30
+                }
+            }
+        })
+
+    assert get_image(result["data"]).size == (50, 30)
+
+
+@pytest.mark.asyncio
+async def test_screenshot_clip_viewport_partiallyOutside(
+        websocket, context_id, html, get_cdp_session_id):
+    await goto_url(websocket, context_id, html())
+    await set_fixed_viewport(websocket, context_id, get_cdp_session_id)
+
+    result = await execute_command(
+        websocket, {
+            "method": "browsingContext.captureScreenshot",
+            "params": {
+                "context": context_id,
+                "clip": {
+                    "type": "viewport",
+                    "x": 150,
+                    "y": 150,
+                    "width": 100,
+                    "height": 100
+                }
+            }
+        })
+
+    assert get_image(result["data"]).size == (50, 50)
+
+
+@pytest.mark.asyncio
+async def test_screenshot_clip_viewport_outside(websocket, context_id, html,
+                                                get_cdp_session_id):
+    await goto_url(websocket, context_id, html())
+    await set_fixed_viewport(websocket, context_id, get_cdp_session_id)
+
+    with pytest.raises(Exception) as exception_info:
+        await execute_command(
+            websocket, {
+                "method": "browsingContext.captureScreenshot",
+                "params": {
+                    "context": context_id,
+                    "clip": {
+                        "type": "viewport",
+                        "x": 300,
+                        "y": 300,
+                        "width": 10,
+                        "height": 10
+                    }
+                }
+            })
+
+    assert {
+        "error": "unable to capture screen",
+        "message": "Unable to capture screenshot with zero dimensions: width=0, height=0"
+    } == exception_info.value.args[0]
+
+
+@pytest.mark.asyncio
+async def test_screenshot_clip_element(websocket, context_id, html,
+                                       get_cdp_session_id):
+    await goto_url(
+        websocket, context_id,
+        html('<div style="position: absolute; left: 10px; top: 10px; '
+             'width: 40px; height: 60px; background: red"></div>'))
+    await set_fixed_viewport(websocket, context_id, get_cdp_session_id)
+
+    element = (await execute_command(
+        websocket, {
+            "method": "script.evaluate",
+            "params": {
+                "expression": "document.querySelector('div')",
+                "target": {
+                    "context": context_id
+                },
+                "awaitPromise": False
+            }
+        }))["result"]
+
+    result = await execute_command(
+        websocket, {
+            "method": "browsingContext.captureScreenshot",
+            "params": {
+                "context": context_id,
+                "clip": {
+                    "type": "element",
+                    "element": {
+                        "sharedId": element["sharedId"]
+                    }
+                }
+            }
+        })
+
+    image = get_image(result["data"])
+    assert image.size == (40, 60)
+    assert image.convert("RGB").getpixel((20, 30)) == (255, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_screenshot_clip_element_scrolledPage(websocket, context_id,
+                                                    html, get_cdp_session_id):
+    await goto_url(
+        websocket, context_id,
+        html('<div style="height: 2000px"></div>'
+             '<div id="target" style="position: absolute; left: 10px; '
+             'top: 500px; width: 40px; height: 60px; background: red"></div>'))
+    await set_fixed_viewport(websocket, context_id, get_cdp_session_id)
+
+    element = (await execute_command(
+        websocket, {
+            "method": "script.evaluate",
+            "params": {
+                "expression": "window.scrollTo(0, 450); "
+                              "document.getElementById('target')",
+                "target": {
+                    "context": context_id
+                },
+                "awaitPromise": False
+            }
+        }))["result"]
+
+    result = await execute_command(
+        websocket, {
+            "method": "browsingContext.captureScreenshot",
+            "params": {
+                "context": context_id,
+                "clip": {
+                    "type": "element",
+                    "element": {
+                        "sharedId": element["sharedId"]
+                    }
+                }
+            }
+        })
+
+    image = get_image(result["data"])
+    assert image.size == (40, 60)
+    assert image.convert("RGB").getpixel((20, 30)) == (255, 0, 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("image_type, image_format", [
+    ("image/jpeg", "JPEG"),
+    ("image/png", "PNG"),
+    ("image/webp", "WEBP"),
+])
+async def test_screenshot_format(websocket, context_id, html,
+                                 get_cdp_session_id, image_type, image_format):
+    await goto_url(websocket, context_id, html())
+    await set_fixed_viewport(websocket, context_id, get_cdp_session_id)
+
+    result = await execute_command(
+        websocket, {
+            "method": "browsingContext.captureScreenshot",
+            "params": {
+                "context": context_id,
+                "goog:format": {
+                    "type": image_type,
+                    "quality": 0.7
+                },
+                "goog:optimizeForSpeed": True
+            }
+        })
+
+    image = get_image(result["data"])
+    assert image.format == image_format
+    assert image.size == (200, 200)
+
+
+@pytest.mark.asyncio
+async def test_screenshot_inBatch(websocket, context_id, html):
+    await goto_url(websocket, context_id,
+                   html("<div style='background: red'>foo</div>"))
+
+    expected = await execute_command(
+        websocket, {
+            "method": "browsingContext.captureScreenshot",
+            "params": {
+                "context": context_id
+            }
+        })
+
+    result = await execute_command(
+        websocket, {
+            "method": "goog:batch",
+            "params": {
+                "commands": [{
+                    "id": 1,
+                    "method": "browsingContext.captureScreenshot",
+                    "params": {
+                        "context": context_id
+                    }
+                }],
+            }
+        })
+
+    assert result == {
+        "responses": [{
+            "type": "success",
+            "id": 1,
+            "result": {
+                "data": ANY_STR
+            }
+        }]
+    }
+    assert_images_equal(result["responses"][0]["result"]["data"],
+                        expected["data"])
+
+
+@pytest.mark.asyncio
+async def test_screenshot_pipelined_capturesPageBeforeNextCommands(
+        websocket, context_id, html):
+    await goto_url(websocket, context_id,
+                   html("<div style='background: red'>foo</div>"))
+
+    expected = await execute_command(
+        websocket, {
+            "method": "browsingContext.captureScreenshot",
+            "params": {
+                "context": context_id
+            }
+        })
+
+    screenshot_id = await send_JSON_command(
+        websocket, {
+            "method": "browsingContext.captureScreenshot",
+            "params": {
+                "context": context_id
+            }
+        })
+    # Sent before the screenshot is responded to.
+    await send_JSON_command(
+        websocket, {
+            "method": "script.evaluate",
+            "params": {
+                "expression": "document.body.innerHTML = ''",
+                "target": {
+                    "context": context_id
+                },
+                "awaitPromise": False
+            }
+        })
+
+    resp = await read_JSON_message(websocket)
+    assert resp["id"] == screenshot_id
+    assert_images_equal(resp["result"]["data"], expected["data"])
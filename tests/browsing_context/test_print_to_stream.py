@@ -0,0 +1,118 @@
+# Copyright 2023 Google LLC.
+# Copyright (c) Microsoft Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+
+import pytest
+from test_helpers import execute_command, goto_url
+
+
+@pytest.mark.asyncio
+async def test_print_to_stream(websocket, context_id, html):
+    await goto_url(websocket, context_id, html("<h1>" + "text " * 10000))
+
+    result = await execute_command(
+        websocket, {
+            "method": "goog:browsingContext.printToStream",
+            "params": {
+                "context": context_id
+            }
+        })
+    stream = result["stream"]
+
+    chunks = []
+    while True:
+        chunk = await execute_command(websocket, {
+            "method": "goog:io.read",
+            "params": {
+                "stream": stream,
+                "size": 1024
+            }
+        })
+        chunks.append(base64.b64decode(chunk["data"]))
+        if chunk["eof"]:
+            break
+
+    await execute_command(websocket, {
+        "method": "goog:io.close",
+        "params": {
+            "stream": stream
+        }
+    })
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 1024 for chunk in chunks)
+    assert b"".join(chunks).startswith(b"%PDF-")
+
+
+@pytest.mark.asyncio
+async def test_print_to_stream_closed(websocket, context_id):
+    result = await execute_command(
+        websocket, {
+            "method": "goog:browsingContext.printToStream",
+            "params": {
+                "context": context_id
+            }
+        })
+    await execute_command(websocket, {
+        "method": "goog:io.close",
+        "params": {
+            "stream": result["stream"]
+        }
+    })
+
+    with pytest.raises(Exception) as exception_info:
+        await execute_command(websocket, {
+            "method": "goog:io.read",
+            "params": {
+                "stream": result["stream"]
+            }
+        })
+
+    assert {
+        "error": "no such handle",
+        "message": f"Unknown stream '{result['stream']}'"
+    } == exception_info.value.args[0]
+
+
+@pytest.mark.asyncio
+async def test_print_to_stream_contextClosed(websocket, another_context_id):
+    result = await execute_command(
+        websocket, {
+            "method": "goog:browsingContext.printToStream",
+            "params": {
+                "context": another_context_id
+            }
+        })
+    await execute_command(
+        websocket, {
+            "method": "browsingContext.close",
+            "params": {
+                "context": another_context_id
+            }
+        })
+
+    with pytest.raises(Exception) as exception_info:
+        await execute_command(websocket, {
+            "method": "goog:io.read",
+            "params": {
+                "stream": result["stream"]
+            }
+        })
+
+    assert {
+        "error": "no such handle",
+        "message": f"Unknown stream '{result['stream']}'"
+    } == exception_info.value.args[0]
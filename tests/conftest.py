@@ -20,7 +20,8 @@ from uuid import uuid4
 import pytest
 import pytest_asyncio
 import websockets
-from test_helpers import execute_command, get_tree, goto_url, read_JSON_message
+from test_helpers import (BidiClient, execute_command, get_tree, goto_url,
+                          read_JSON_message)
 
 
 @pytest_asyncio.fixture
@@ -32,6 +33,15 @@ async def websocket():
         yield connection
 
 
+@pytest_asyncio.fixture
+async def bidi_client(websocket):
+    """Return a pipelined BiDi client owning the websocket reader."""
+    async with BidiClient(websocket) as client:
+        yield client
+        # Do not keep the events of the test alive.
+        client.journal.clear()
+
+
 @pytest_asyncio.fixture
 async def context_id(websocket):
     """Return the context id from the first browsing context."""
@@ -309,7 +309,6 @@ def compute_response_headers_size(headers) -> int:
 
 
 @pytest.mark.asyncio
-@pytest.mark.skip(reason="TODO: #1080")
 async def test_network_specific_context_subscription_does_not_enable_cdp_network_globally(
         websocket, context_id, create_context):
     await subscribe(websocket, ["network.beforeRequestSent"], [context_id])
@@ -337,3 +336,41 @@ async def test_network_specific_context_subscription_does_not_enable_cdp_network
         resp = await read_JSON_message(websocket)
 
     assert resp == AnyExtending({"type": "success", "id": command_id})
+
+
+@pytest.mark.asyncio
+async def test_network_resubscribe_enables_network_in_attached_context(
+        websocket, context_id):
+    await subscribe(websocket, ["network.beforeRequestSent"], [context_id])
+    await execute_command(
+        websocket, {
+            "method": "session.unsubscribe",
+            "params": {
+                "events": ["network.beforeRequestSent"],
+                "contexts": [context_id]
+            }
+        })
+    await subscribe(websocket, ["network.beforeRequestSent"], [context_id])
+
+    await send_JSON_command(
+        websocket, {
+            "method": "browsingContext.navigate",
+            "params": {
+                "url": "http://example.com",
+                "wait": "complete",
+                "context": context_id
+            }
+        })
+
+    resp = await read_JSON_message(websocket)
+
+    assert resp == AnyExtending({
+        'type': 'event',
+        "method": "network.beforeRequestSent",
+        "params": {
+            "context": context_id,
+            "request": {
+                "url": "http://example.com/",
+            },
+        }
+    })
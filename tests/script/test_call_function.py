@@ -514,3 +514,92 @@ async def test_script_callFunction_userActivation(websocket, context_id,
             "value": user_activation
         }
     } == result
+
+
+@pytest.mark.asyncio
+async def test_script_callFunction_sameDeclarationRepeated_resultsNotShared(
+        websocket, context_id):
+    # The declaration is evaluated for every call, even if it is cached.
+    for i in range(3):
+        result = await execute_command(
+            websocket, {
+                "method": "script.callFunction",
+                "params": {
+                    "functionDeclaration": "(() => { let count = 0; return (x) => [x, ++count]; })()",
+                    "arguments": [{
+                        "type": "number",
+                        "value": i
+                    }],
+                    "target": {
+                        "context": context_id
+                    },
+                    "awaitPromise": False
+                }
+            })
+
+        assert {
+            "type": "success",
+            "realm": ANY_STR,
+            "result": {
+                "type": "array",
+                "value": [{
+                    "type": "number",
+                    "value": i
+                }, {
+                    "type": "number",
+                    "value": 1
+                }]
+            }
+        } == result
+
+
+@pytest.mark.asyncio
+async def test_script_callFunction_syntaxErrorRepeated_exceptionReturned(
+        websocket, context_id):
+    for _ in range(2):
+        result = await execute_command(
+            websocket, {
+                "method": "script.callFunction",
+                "params": {
+                    "functionDeclaration": "() => {",
+                    "target": {
+                        "context": context_id
+                    },
+                    "awaitPromise": False
+                }
+            })
+
+        assert {
+            "type": "exception",
+            "exceptionDetails": ANY,
+            "realm": ANY_STR
+        } == result
+
+
+@pytest.mark.asyncio
+async def test_script_callFunction_throwingDeclarationRepeated_stackTraceStable(
+        websocket, context_id):
+    # The declaration is compiled and cached once it is seen again, which must
+    # not change the reported stack trace.
+    results = []
+    for _ in range(3):
+        results.append(await execute_command(
+            websocket, {
+                "method": "script.callFunction",
+                "params": {
+                    "functionDeclaration": """() => {
+                        function thrower() { throw new Error('foo'); }
+                        thrower();
+                    }""",
+                    "target": {
+                        "context": context_id
+                    },
+                    "awaitPromise": False
+                }
+            }))
+
+    call_frames = results[0]["exceptionDetails"]["stackTrace"]["callFrames"]
+    assert call_frames[0]["functionName"] == "thrower"
+    assert all(frame["lineNumber"] >= 0 for frame in call_frames)
+    for result in results[1:]:
+        assert results[0]["exceptionDetails"] == result["exceptionDetails"]
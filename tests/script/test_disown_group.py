@@ -0,0 +1,148 @@
+# Copyright 2023 Google LLC.
+# Copyright (c) Microsoft Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from anys import ANY_STR
+from test_helpers import execute_command
+
+
+async def evaluate_in_group(websocket, realm: str, group: str) -> str:
+    result = await execute_command(
+        websocket, {
+            "method": "script.evaluate",
+            "params": {
+                "expression": "({})",
+                "target": {
+                    "realm": realm
+                },
+                "awaitPromise": False,
+                "resultOwnership": "root",
+                "goog:objectGroup": group
+            }
+        })
+    return result["result"]["handle"]
+
+
+async def use_handle(websocket, realm: str, handle: str) -> dict:
+    return await execute_command(
+        websocket, {
+            "method": "script.callFunction",
+            "params": {
+                "functionDeclaration": "(obj)=>{return obj;}",
+                "arguments": [{
+                    "handle": handle
+                }],
+                "target": {
+                    "realm": realm
+                },
+                "awaitPromise": False,
+                "resultOwnership": "none"
+            }
+        })
+
+
+async def disown_group(websocket, realm: str, group: str) -> dict:
+    return await execute_command(
+        websocket, {
+            "method": "goog:script.disownGroup",
+            "params": {
+                "group": group,
+                "target": {
+                    "realm": realm
+                }
+            }
+        })
+
+
+@pytest.mark.asyncio
+async def test_disownGroup_releasesAllHandles(websocket, default_realm):
+    handles = [
+        await evaluate_in_group(websocket, default_realm, "group")
+        for _ in range(2)
+    ]
+
+    assert {} == await disown_group(websocket, default_realm, "group")
+
+    for handle in handles:
+        with pytest.raises(Exception) as exception_info:
+            await use_handle(websocket, default_realm, handle)
+
+        assert {
+            "error": "no such handle",
+            "message": "Handle was not found."
+        } == exception_info.value.args[0]
+
+
+@pytest.mark.asyncio
+async def test_disownGroup_otherGroupNotReleased(websocket, default_realm):
+    handle = await evaluate_in_group(websocket, default_realm, "kept")
+    await evaluate_in_group(websocket, default_realm, "released")
+
+    assert {} == await disown_group(websocket, default_realm, "released")
+
+    result = await use_handle(websocket, default_realm, handle)
+    assert {
+        "type": "success",
+        "result": {
+            "type": "object",
+            "value": []
+        },
+        "realm": ANY_STR
+    } == result
+
+
+@pytest.mark.asyncio
+async def test_disownGroup_unknownGroup_success(websocket, default_realm):
+    assert {} == await disown_group(websocket, default_realm, "unknown")
+
+
+@pytest.mark.asyncio
+async def test_disownGroup_noRetainedHandles_groupReleased(
+        websocket, default_realm):
+    # The thrown exception is created in the group, but not retained.
+    result = await execute_command(
+        websocket, {
+            "method": "script.evaluate",
+            "params": {
+                "expression": "throw {}",
+                "target": {
+                    "realm": default_realm
+                },
+                "awaitPromise": False,
+                "resultOwnership": "root",
+                "goog:objectGroup": "group"
+            }
+        })
+    assert result["type"] == "exception"
+
+    # Disown the only retained handle of the group individually.
+    handle = await evaluate_in_group(websocket, default_realm, "group")
+    assert {} == await execute_command(
+        websocket, {
+            "method": "script.disown",
+            "params": {
+                "handles": [handle],
+                "target": {
+                    "realm": default_realm
+                }
+            }
+        })
+
+    assert {} == await disown_group(websocket, default_realm, "group")
+
+    # The group can be used again.
+    handle = await evaluate_in_group(websocket, default_realm, "group")
+    result = await use_handle(websocket, default_realm, handle)
+    assert result["type"] == "success"
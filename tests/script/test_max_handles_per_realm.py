@@ -0,0 +1,88 @@
+# Copyright 2023 Google LLC.
+# Copyright (c) Microsoft Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+from test_helpers import execute_command
+
+# Must match the `--max-handles-per-realm` of the server. The CI runs these
+# tests against a dedicated server started with the same value.
+MAX_HANDLES_PER_REALM = int(os.getenv("MAX_HANDLES_PER_REALM", 0))
+
+pytestmark = pytest.mark.skipif(
+    MAX_HANDLES_PER_REALM == 0,
+    reason="The server does not cap the handles per realm")
+
+
+def evaluate_command(realm: str) -> dict:
+    return {
+        "method": "script.evaluate",
+        "params": {
+            "expression": "({})",
+            "target": {
+                "realm": realm
+            },
+            "awaitPromise": False,
+            "resultOwnership": "root"
+        }
+    }
+
+
+async def use_handle(websocket, realm: str, handle: str) -> dict:
+    return await execute_command(
+        websocket, {
+            "method": "script.callFunction",
+            "params": {
+                "functionDeclaration": "(obj)=>{return obj;}",
+                "arguments": [{
+                    "handle": handle
+                }],
+                "target": {
+                    "realm": realm
+                },
+                "awaitPromise": False,
+                "resultOwnership": "none"
+            }
+        })
+
+
+@pytest.mark.asyncio
+async def test_maxHandlesPerRealm_leastRecentlyUsedHandleEvicted(
+        websocket, default_realm):
+    first = await execute_command(websocket, evaluate_command(default_realm))
+    result = await execute_command(
+        websocket, {
+            "method": "goog:batch",
+            "params": {
+                "commands": [{
+                    "id": i,
+                    **evaluate_command(default_realm)
+                } for i in range(MAX_HANDLES_PER_REALM)],
+            }
+        })
+    last = result["responses"][-1]["result"]
+
+    with pytest.raises(Exception) as exception_info:
+        await use_handle(websocket, default_realm, first["result"]["handle"])
+
+    assert {
+        "error": "no such handle",
+        "message": "Handle was not found."
+    } == exception_info.value.args[0]
+
+    result = await use_handle(websocket, default_realm,
+                              last["result"]["handle"])
+    assert result["type"] == "success"
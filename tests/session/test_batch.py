@@ -0,0 +1,133 @@
+# Copyright 2023 Google LLC.
+# Copyright (c) Microsoft Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from anys import ANY_STR
+from test_helpers import execute_command
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sequential", [True, False])
+async def test_batch_responsesInOrder(websocket, context_id, sequential):
+    result = await execute_command(
+        websocket, {
+            "method": "goog:batch",
+            "params": {
+                "commands": [{
+                    "id": i,
+                    "method": "script.evaluate",
+                    "params": {
+                        "expression": f"{i}",
+                        "target": {
+                            "context": context_id
+                        },
+                        "awaitPromise": False
+                    }
+                } for i in range(10)],
+                "sequential": sequential
+            }
+        })
+
+    assert result == {
+        "responses": [{
+            "type": "success",
+            "id": i,
+            "result": {
+                "type": "success",
+                "result": {
+                    "type": "number",
+                    "value": i
+                },
+                "realm": ANY_STR
+            }
+        } for i in range(10)]
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_sequential_commandsSeeEachOthersEffects(
+        websocket, context_id):
+    result = await execute_command(
+        websocket, {
+            "method": "goog:batch",
+            "params": {
+                "commands": [{
+                    "id": 1,
+                    "method": "script.evaluate",
+                    "params": {
+                        "expression": "window.batched = 42",
+                        "target": {
+                            "context": context_id
+                        },
+                        "awaitPromise": False
+                    }
+                }, {
+                    "id": 2,
+                    "method": "script.evaluate",
+                    "params": {
+                        "expression": "window.batched",
+                        "target": {
+                            "context": context_id
+                        },
+                        "awaitPromise": False
+                    }
+                }],
+                "sequential": True
+            }
+        })
+
+    assert result["responses"][1]["result"]["result"] == {
+        "type": "number",
+        "value": 42
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_failingCommand_doesNotFailBatch(websocket):
+    result = await execute_command(
+        websocket, {
+            "method": "goog:batch",
+            "params": {
+                "commands": [{
+                    "id": 1,
+                    "method": "browsingContext.getTree",
+                    "params": {
+                        "root": "UNKNOWN_CONTEXT"
+                    }
+                }, {
+                    "id": 2,
+                    "method": "goog:batch",
+                    "params": {
+                        "commands": []
+                    }
+                }, {
+                    "id": 3,
+                    "method": "unknown.command",
+                    "params": {}
+                }, {
+                    "id": 4,
+                    "method": "browsingContext.getTree",
+                    "params": {}
+                }]
+            }
+        })
+
+    responses = result["responses"]
+    assert [r["type"]
+            for r in responses] == ["error", "error", "error", "success"]
+    assert [r["id"] for r in responses] == [1, 2, 3, 4]
+    assert responses[0]["error"] == "no such frame"
+    assert responses[1]["error"] == "invalid argument"
+    assert responses[2]["error"] == "unknown command"
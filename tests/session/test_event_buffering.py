@@ -0,0 +1,145 @@
+# Copyright 2023 Google LLC.
+# Copyright (c) Microsoft Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from anys import ANY, ANY_NUMBER
+from test_helpers import (AnyExtending, execute_command, goto_url,
+                          read_JSON_message, send_JSON_command, wait_for_event)
+
+
+async def set_event_buffering(websocket, params: dict):
+    await execute_command(websocket, {
+        "method": "goog:session.setEventBuffering",
+        "params": params
+    })
+
+
+async def get_event_buffering(websocket) -> dict:
+    return await execute_command(websocket, {
+        "method": "goog:session.getEventBuffering",
+        "params": {}
+    })
+
+
+async def evaluate(websocket, context_id: str, expression: str):
+    await execute_command(
+        websocket, {
+            "method": "script.evaluate",
+            "params": {
+                "expression": expression,
+                "target": {
+                    "context": context_id
+                },
+                "awaitPromise": False
+            }
+        })
+
+
+async def console_log(websocket, context_id: str, text: str):
+    await evaluate(websocket, context_id, f"console.log('{text}')")
+    # The log event is resolved after its arguments are serialized. Another
+    # round trip to the same target makes sure it is done.
+    await evaluate(websocket, context_id, "undefined")
+
+
+@pytest.mark.asyncio
+async def test_eventBuffering_defaults(websocket):
+    result = await get_event_buffering(websocket)
+
+    assert result == AnyExtending({
+        "events": {
+            "log.entryAdded": 100
+        },
+        "maxTotalSize": None,
+    })
+
+
+@pytest.mark.asyncio
+async def test_eventBuffering_occupancy(websocket, context_id):
+    await console_log(websocket, context_id, "some text")
+
+    result = await get_event_buffering(websocket)
+
+    assert result == {
+        "events": {
+            "log.entryAdded": 100
+        },
+        "maxTotalSize": None,
+        "totalSize": ANY_NUMBER,
+        "buffers": [{
+            "event": "log.entryAdded",
+            "context": context_id,
+            "count": 1,
+            "size": result["totalSize"]
+        }]
+    }
+    assert result["totalSize"] > 0
+
+
+@pytest.mark.asyncio
+async def test_eventBuffering_disabled_notReplayed(websocket, context_id):
+    await set_event_buffering(websocket, {"events": {"log.entryAdded": 0}})
+    await console_log(websocket, context_id, "not buffered")
+
+    command_id = await send_JSON_command(websocket, {
+        "method": "session.subscribe",
+        "params": {
+            "events": ["log.entryAdded"]
+        }
+    })
+
+    # Assert no events were buffered.
+    resp = await read_JSON_message(websocket)
+    assert {"type": "success", "id": command_id, 'result': ANY} == resp
+
+
+@pytest.mark.asyncio
+async def test_eventBuffering_networkEventsReplayed(websocket, context_id):
+    await set_event_buffering(websocket, {"events": {"network": 10}})
+
+    await goto_url(websocket, context_id, "http://example.com")
+
+    # Buffered events are sent before the subscription command result.
+    await send_JSON_command(
+        websocket, {
+            "method": "session.subscribe",
+            "params": {
+                "events": ["network.responseCompleted"],
+                "contexts": [context_id]
+            }
+        })
+
+    event = await wait_for_event(websocket, "network.responseCompleted")
+    assert event == AnyExtending({
+        "method": "network.responseCompleted",
+        "params": {
+            "context": context_id,
+            "request": {
+                "url": "http://example.com/"
+            }
+        }
+    })
+
+
+@pytest.mark.asyncio
+async def test_eventBuffering_maxTotalSize_dropsEvents(websocket, context_id):
+    await set_event_buffering(websocket, {"maxTotalSize": 500})
+    await console_log(websocket, context_id, "a" * 1000)
+
+    result = await get_event_buffering(websocket)
+
+    assert result["maxTotalSize"] == 500
+    assert result["totalSize"] <= 500
+    assert result["buffers"] == []
@@ -0,0 +1,97 @@
+# Copyright 2023 Google LLC.
+# Copyright (c) Microsoft Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from anys import ANY_NUMBER
+from test_helpers import AnyExtending, execute_command
+
+
+async def get_metrics(websocket) -> dict:
+    return await execute_command(websocket, {
+        "method": "goog:session.getMetrics",
+        "params": {}
+    })
+
+
+@pytest.mark.asyncio
+async def test_metrics_countsCommands(websocket, context_id):
+    before = await get_metrics(websocket)
+
+    await execute_command(
+        websocket, {
+            "method": "script.evaluate",
+            "params": {
+                "expression": "1",
+                "target": {
+                    "context": context_id
+                },
+                "awaitPromise": False
+            }
+        })
+    with pytest.raises(Exception):
+        await execute_command(
+            websocket, {
+                "method": "script.evaluate",
+                "params": {
+                    "expression": "1",
+                    "target": {
+                        "context": "UNKNOWN_CONTEXT"
+                    },
+                    "awaitPromise": False
+                }
+            })
+
+    after = await get_metrics(websocket)
+
+    evaluate_before = before["commands"].get("script.evaluate", {
+        "count": 0,
+        "errors": 0
+    })
+    evaluate_after = after["commands"]["script.evaluate"]
+    assert evaluate_after["count"] == evaluate_before["count"] + 2
+    assert evaluate_after["errors"] == evaluate_before["errors"] + 1
+    assert evaluate_after["cdpCommands"] > 0
+    assert evaluate_after["latency"] == AnyExtending({
+        "count": evaluate_after["count"],
+        "sum": ANY_NUMBER,
+        "max": ANY_NUMBER,
+    })
+    assert sum(evaluate_after["latency"]["counts"]) == evaluate_after["count"]
+
+
+@pytest.mark.asyncio
+async def test_metrics_reportsMapperState(websocket, context_id):
+    result = await get_metrics(websocket)
+
+    assert result == AnyExtending({
+        "cdp": {
+            "commands": ANY_NUMBER,
+            "errors": ANY_NUMBER,
+            "pending": ANY_NUMBER,
+            "events": ANY_NUMBER,
+        },
+        "events": {
+            "buffered": ANY_NUMBER,
+            "bufferedSize": ANY_NUMBER,
+        },
+        "outgoingMessages": {
+            "depth": ANY_NUMBER,
+            "sent": ANY_NUMBER,
+            "dropped": 0,
+        },
+    })
+    assert result["cdp"]["commands"] > 0
+    assert result["storage"]["contexts"] >= 1
+    assert result["storage"]["realms"] >= 1
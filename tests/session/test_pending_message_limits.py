@@ -0,0 +1,138 @@
+# Copyright 2023 Google LLC.
+# Copyright (c) Microsoft Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from anys import ANY_STR
+from test_helpers import (AnyExtending, execute_command, read_JSON_message,
+                          send_JSON_command, subscribe, wait_for_event)
+
+
+async def set_pending_message_limits(websocket, params: dict):
+    await execute_command(websocket, {
+        "method": "goog:session.setPendingMessageLimits",
+        "params": params
+    })
+
+
+@pytest.mark.asyncio
+async def test_pendingMessageLimits_lowWatermarkAboveHigh_invalidArgument(
+        websocket):
+    with pytest.raises(Exception) as exception_info:
+        await set_pending_message_limits(websocket, {
+            "highWatermark": 10,
+            "lowWatermark": 20
+        })
+
+    assert {
+        'error': 'invalid argument',
+        'message': ANY_STR
+    } == exception_info.value.args[0]
+
+
+@pytest.mark.asyncio
+async def test_pendingMessageLimits_unknownEvent_invalidArgument(websocket):
+    with pytest.raises(Exception) as exception_info:
+        await set_pending_message_limits(websocket, {
+            "highWatermark": 10,
+            "policies": {
+                "unknown.event": "dropNewest"
+            }
+        })
+
+    assert {
+        'error': 'invalid argument',
+        'message': 'Unknown event: unknown.event'
+    } == exception_info.value.args[0]
+
+
+@pytest.mark.asyncio
+async def test_pendingMessageLimits_underHighWatermark_eventsNotDropped(
+        websocket, context_id):
+    await set_pending_message_limits(websocket, {
+        "highWatermark": 1000,
+        "policies": {
+            "log": "dropNewest"
+        }
+    })
+    await subscribe(websocket, ["log.entryAdded"])
+
+    await send_JSON_command(
+        websocket, {
+            "method": "script.evaluate",
+            "params": {
+                "expression": "console.log('some text')",
+                "target": {
+                    "context": context_id
+                },
+                "awaitPromise": False
+            }
+        })
+
+    event = await wait_for_event(websocket, "log.entryAdded")
+    assert event == AnyExtending({
+        "method": "log.entryAdded",
+        "params": {
+            "text": "some text"
+        }
+    })
+
+
+@pytest.mark.asyncio
+async def test_pendingMessageLimits_overHighWatermark_eventsDroppedAndReported(
+        websocket, context_id):
+    await set_pending_message_limits(
+        websocket, {
+            "highWatermark": 1,
+            "lowWatermark": 0,
+            "policies": {
+                "log.entryAdded": "dropNewest"
+            }
+        })
+    await subscribe(websocket,
+                    ["log.entryAdded", "goog:session.messagesDropped"])
+
+    await send_JSON_command(
+        websocket, {
+            "method": "script.evaluate",
+            "params": {
+                "expression": "for (let i = 0; i < 100; i++) console.log(i)",
+                "target": {
+                    "context": context_id
+                },
+                "awaitPromise": False
+            }
+        })
+
+    async def read_all_events():
+        received = 0
+        dropped = 0
+        while received + dropped < 100:
+            message = await read_JSON_message(websocket)
+            if message.get("method") == "log.entryAdded":
+                received += 1
+            if message.get("method") == "goog:session.messagesDropped":
+                assert message["params"]["dropped"].keys() == {
+                    "log.entryAdded"
+                }
+                dropped += message["params"]["dropped"]["log.entryAdded"]
+        return received, dropped
+
+    # Every event is either received or reported as dropped.
+    received, dropped = await asyncio.wait_for(read_all_events(), timeout=5)
+    assert received + dropped == 100
+    assert received > 0
+    assert dropped > 0
@@ -0,0 +1,108 @@
+# Copyright 2023 Google LLC.
+# Copyright (c) Microsoft Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from test_helpers import get_tree, subscribe
+
+
+@pytest.mark.asyncio
+async def test_pipelining_executeMany_resultsInOrder(bidi_client):
+    context_id = (await get_tree(bidi_client))["contexts"][0]["context"]
+
+    results = await bidi_client.execute_many([{
+        "method": "script.evaluate",
+        "params": {
+            "expression": f"{i}",
+            "target": {
+                "context": context_id
+            },
+            "awaitPromise": False
+        }
+    } for i in range(50)])
+
+    assert [r["result"] for r in results] == [{
+        "type": "number",
+        "value": i
+    } for i in range(50)]
+
+
+@pytest.mark.asyncio
+async def test_pipelining_executeMany_returnExceptions(bidi_client):
+    results = await bidi_client.execute_many([{
+        "method": "browsingContext.getTree",
+        "params": {}
+    }, {
+        "method": "browsingContext.getTree",
+        "params": {
+            "root": "UNKNOWN_CONTEXT"
+        }
+    }],
+                                             return_exceptions=True)
+
+    assert "contexts" in results[0]
+    assert isinstance(results[1], Exception)
+    assert results[1].args[0]["error"] == "no such frame"
+
+
+@pytest.mark.asyncio
+async def test_pipelining_eventsAreNotDropped(bidi_client):
+    context_id = (await get_tree(bidi_client))["contexts"][0]["context"]
+    events = bidi_client.events_queue()
+
+    await subscribe(bidi_client, ["log.entryAdded"])
+    await bidi_client.execute_many([{
+        "method": "script.evaluate",
+        "params": {
+            "expression": f"console.log('{i}')",
+            "target": {
+                "context": context_id
+            },
+            "awaitPromise": False
+        }
+    } for i in range(10)])
+
+    texts = []
+    for _ in range(10):
+        event = await asyncio.wait_for(events.get(), timeout=1)
+        assert event["method"] == "log.entryAdded"
+        texts.append(event["params"]["text"])
+    assert texts == [f"{i}" for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_pipelining_waitFor_eventsInSequence(bidi_client):
+    context_id = (await get_tree(bidi_client))["contexts"][0]["context"]
+
+    await subscribe(bidi_client, ["log.entryAdded"])
+    await bidi_client.execute({
+        "method": "script.evaluate",
+        "params": {
+            "expression": "console.log('first'); console.log('second')",
+            "target": {
+                "context": context_id
+            },
+            "awaitPromise": False
+        }
+    })
+
+    # Events can be awaited in any order, whether already received or not.
+    second = await bidi_client.wait_for(
+        "log.entryAdded", lambda e: e["params"]["text"] == "second")
+    first = await bidi_client.wait_for("log.entryAdded", timeout=1)
+
+    assert first["params"]["text"] == "first"
+    assert second["params"]["text"] == "second"
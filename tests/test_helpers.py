@@ -14,11 +14,14 @@
 # limitations under the License.
 from __future__ import annotations
 
+import asyncio
 import base64
+import contextlib
 import io
 import itertools
 import json
-from typing import Literal
+from collections import defaultdict, deque
+from typing import Callable, Literal
 
 from anys import ANY_NUMBER, ANY_STR, AnyContains, AnyGT, AnyLT, AnyWithEntries
 from PIL import Image, ImageChops
@@ -65,7 +68,272 @@ async def read_JSON_message(websocket) -> dict:
     return json.loads(await websocket.recv())
 
 
+def _get_command_result(resp: dict) -> dict:
+    if "result" in resp:
+        return resp["result"]
+    raise Exception({"error": resp["error"], "message": resp["message"]})
+
+
+class _JournalEntry:
+    def __init__(self, event: dict, method: str, context: str | None):
+        self.event = event
+        self.method = method
+        self.context = context
+        self.consumed = False
+
+
+class EventJournal:
+    """
+    Buffer of the received events, indexed by method and by `params.context`.
+    `wait_for` consumes the oldest matching event, so waiting for several
+    events in sequence is race-free. Only the newest `max_size` events are
+    kept.
+
+    >>> journal = EventJournal()
+    >>> journal.add({"method": "log.entryAdded", "params": {"text": "a"}})
+    >>> journal.add({"method": "log.entryAdded", "params": {"text": "b"}})
+    >>> journal.add({"method": "browsingContext.load",
+    ...              "params": {"context": "A"}})
+    >>> asyncio.run(journal.wait_for("log.entryAdded"))["params"]["text"]
+    'a'
+    >>> asyncio.run(journal.wait_for("log.entryAdded"))["params"]["text"]
+    'b'
+    >>> asyncio.run(journal.wait_for("browsingContext.load", context="B",
+    ...                              timeout=0.01))
+    ... # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ...
+    TimeoutError
+    >>> asyncio.run(journal.wait_for("browsingContext.load", context="A"))
+    {'method': 'browsingContext.load', 'params': {'context': 'A'}}
+
+    >>> journal = EventJournal(max_size=2)
+    >>> for text in "abc":
+    ...     journal.add({"method": "log.entryAdded", "params": {"text": text}})
+    >>> [event["params"]["text"] for event in journal.events("log.entryAdded")]
+    ['b', 'c']
+    >>> journal.clear()
+    >>> journal.events("log.entryAdded")
+    []
+    """
+    def __init__(self, max_size: int = 10_000):
+        self._max_size = max_size
+        self._waiters: list[tuple[str, str | None, Callable[[dict], bool],
+                                  asyncio.Future]] = []
+        self.clear()
+
+    def clear(self) -> None:
+        """Drops all the buffered events. Pending `wait_for` calls go on."""
+        # All the entries, from the oldest to the newest.
+        self._entries: deque[_JournalEntry] = deque()
+        self._by_method: dict[str, list[_JournalEntry]] = defaultdict(list)
+        self._by_context: dict[tuple[str, str],
+                               list[_JournalEntry]] = defaultdict(list)
+        # Index of the first not consumed entry in each of the lists above.
+        self._first_unconsumed: dict[int, int] = defaultdict(int)
+
+    def add(self, event: dict) -> None:
+        method = event.get("method")
+        if method is None:
+            return
+        context = event.get("params", {}).get("context")
+
+        for waiter in self._waiters:
+            waiter_method, waiter_context, predicate, future = waiter
+            if (waiter_method == method and waiter_context in (None, context)
+                    and predicate(event) and not future.done()):
+                self._waiters.remove(waiter)
+                future.set_result(event)
+                # The event is consumed, no need to keep it.
+                return
+
+        entry = _JournalEntry(event, method, context)
+        self._entries.append(entry)
+        self._by_method[method].append(entry)
+        if context is not None:
+            self._by_context[(method, context)].append(entry)
+        if len(self._entries) > self._max_size:
+            self._drop_oldest()
+
+    def events(self, method: str, context: str | None = None) -> list[dict]:
+        """Returns all the not consumed events with the given method."""
+        return [
+            entry.event for entry in self._get_entries(method, context)
+            if not entry.consumed
+        ]
+
+    async def wait_for(self,
+                       method: str,
+                       predicate: Callable[[dict], bool] = lambda _: True,
+                       context: str | None = None,
+                       timeout: float | None = None) -> dict:
+        """
+        Returns and consumes the oldest event matching the method, context and
+        predicate. Waits for the new events if no such event was buffered.
+        """
+        entries = self._get_entries(method, context)
+        start = self._first_unconsumed[id(entries)]
+        # Skip the consumed prefix to keep the scan proportional to the
+        # number of matching events.
+        while start < len(entries) and entries[start].consumed:
+            start += 1
+        self._first_unconsumed[id(entries)] = start
+        for entry in entries[start:]:
+            if not entry.consumed and predicate(entry.event):
+                entry.consumed = True
+                return entry.event
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (method, context, predicate, future)
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _drop_oldest(self) -> None:
+        oldest = self._entries.popleft()
+        # The oldest entry is the first one of its lists.
+        lists = [self._by_method[oldest.method]]
+        if oldest.context is not None:
+            lists.append(self._by_context[(oldest.method, oldest.context)])
+        for entries in lists:
+            entries.pop(0)
+            if self._first_unconsumed[id(entries)] > 0:
+                self._first_unconsumed[id(entries)] -= 1
+
+    def _get_entries(self, method: str,
+                     context: str | None) -> list[_JournalEntry]:
+        if context is None:
+            return self._by_method[method]
+        return self._by_context[(method, context)]
+
+
+class BidiClient:
+    """
+    Pipelined BiDi client. Owns the websocket reader task, routes command
+    responses to per-id futures and fans events out to subscriber queues, so
+    that any number of commands can be in flight concurrently.
+
+    While the client is running, it is the only reader of the websocket:
+    use `execute`, `execute_many`, `wait_for` and `events_queue` instead of
+    `read_JSON_message`. All the events are kept in the `journal`.
+    """
+    def __init__(self, websocket):
+        self._websocket = websocket
+        self._pending_commands: dict[int, asyncio.Future] = {}
+        self._event_queues: list[asyncio.Queue] = []
+        self._reader_task: asyncio.Task | None = None
+        self.journal = EventJournal()
+
+    async def __aenter__(self) -> BidiClient:
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Starts the websocket reader task."""
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._read_messages())
+
+    async def close(self) -> None:
+        """Stops the reader task and fails all the pending commands."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader_task
+            self._reader_task = None
+        self._fail_pending_commands(Exception("BiDi client is closed"))
+
+    def events_queue(self) -> asyncio.Queue:
+        """Returns a new queue receiving all the events read from now on."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._event_queues.append(queue)
+        return queue
+
+    def remove_events_queue(self, queue: asyncio.Queue) -> None:
+        self._event_queues.remove(queue)
+
+    async def wait_for(self,
+                       method: str,
+                       predicate: Callable[[dict], bool] = lambda _: True,
+                       context: str | None = None,
+                       timeout: float | None = None) -> dict:
+        """See `EventJournal.wait_for`."""
+        return await self.journal.wait_for(method, predicate, context, timeout)
+
+    async def send_command(self, command: dict) -> asyncio.Future:
+        """Sends the command and returns the future of its raw response."""
+        if self._reader_task is None or self._reader_task.done():
+            raise Exception("BiDi client is not running")
+        if "id" not in command:
+            command["id"] = get_next_command_id()
+        future = asyncio.get_running_loop().create_future()
+        self._pending_commands[command["id"]] = future
+        try:
+            await send_JSON_command(self._websocket, command)
+        except Exception:
+            del self._pending_commands[command["id"]]
+            raise
+        return future
+
+    async def execute(self, command: dict) -> dict:
+        """Executes the command and returns its result."""
+        return _get_command_result(await (await self.send_command(command)))
+
+    async def execute_many(self,
+                           commands: list[dict],
+                           return_exceptions: bool = False) -> list:
+        """
+        Pipelines the given commands: all of them are sent before waiting for
+        the first response. Results are returned in the commands order.
+        """
+        futures = [await self.send_command(command) for command in commands]
+        results: list = []
+        for future in futures:
+            try:
+                results.append(_get_command_result(await future))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    async def _read_messages(self) -> None:
+        try:
+            async for message_str in self._websocket:
+                self._dispatch(json.loads(message_str))
+        except Exception as e:
+            self._fail_pending_commands(e)
+        else:
+            self._fail_pending_commands(Exception("Websocket is closed"))
+
+    def _dispatch(self, message: dict) -> None:
+        if message.get("type") != "event" and "id" in message:
+            future = self._pending_commands.pop(message["id"], None)
+            if future is not None:
+                if not future.done():
+                    future.set_result(message)
+                return
+        # Events and messages not matching any pending command.
+        self.journal.add(message)
+        for queue in self._event_queues:
+            queue.put_nowait(message)
+
+    def _fail_pending_commands(self, error: Exception) -> None:
+        for future in self._pending_commands.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending_commands.clear()
+
+
 async def execute_command(websocket, command: dict) -> dict:
+    if isinstance(websocket, BidiClient):
+        return await websocket.execute(command)
+
     if "id" not in command:
         command["id"] = get_next_command_id()
 
@@ -75,12 +343,7 @@ async def execute_command(websocket, command: dict) -> dict:
         # Wait for the command to be finished.
         resp = await read_JSON_message(websocket)
         if "id" in resp and resp["id"] == command["id"]:
-            if "result" in resp:
-                return resp["result"]
-            raise Exception({
-                "error": resp["error"],
-                "message": resp["message"]
-            })
+            return _get_command_result(resp)
 
 
 async def get_tree(websocket, context_id: str | None = None) -> dict:
@@ -128,6 +391,9 @@ async def set_html_content(websocket, context_id: str, html_content: str):
 
 async def wait_for_event(websocket, event_method: str) -> dict:
     """Wait and return a specific event from BiDi server."""
+    if isinstance(websocket, BidiClient):
+        return await websocket.wait_for(event_method)
+
     while True:
         event_response = await read_JSON_message(websocket)
         if "method" in event_response and event_response[